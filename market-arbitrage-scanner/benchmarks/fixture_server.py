@@ -0,0 +1,128 @@
+"""
+Local stand-in server replaying recorded upstream responses
+Serves SerpAPI JSON, Google SERP HTML, Trends timelines and competitor pages from benchmarks/fixtures
+"""
+import hashlib
+import html
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+
+def keyword_key(keyword: str) -> str:
+    """Stable short id for a keyword, so each query links to its own competitor pages"""
+    return hashlib.sha1(keyword.encode('utf-8')).hexdigest()[:10]
+
+
+def keyword_level(keyword: str) -> int:
+    """Deterministic 1-100 popularity for a keyword (Trends replay)"""
+    return int(keyword_key(keyword), 16) % 100 + 1
+
+
+class FixtureServer:
+    """Threaded HTTP server on 127.0.0.1 replaying the recorded fixtures"""
+
+    def __init__(self, fixtures_dir: Path = FIXTURES_DIR):
+        """
+        Load fixtures and bind to a free port
+
+        Args:
+            fixtures_dir: Directory holding the recorded responses
+        """
+        self.fixtures = {
+            name: (fixtures_dir / name).read_text(encoding='utf-8')
+            for name in ('serpapi_search.json', 'google_serp.html', 'competitor_page.html', 'trends_multiline.json')
+        }
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self) -> 'FixtureServer':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, route: str):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def render(self, path: str, query: Dict[str, list]) -> Tuple[int, str, bytes, Dict[str, str]]:
+        """
+        Build the response for one request
+
+        Returns:
+            (status, content type, body, extra headers)
+        """
+        q = query.get('q', [''])[0]
+
+        if path == '/search.json':
+            self._count('serpapi')
+            body = self.fixtures['serpapi_search.json']
+            body = body.replace('{query}', json.dumps(q)[1:-1])
+            return 200, 'application/json', self._fill(body, q), {}
+
+        if path == '/search':
+            self._count('google')
+            body = self.fixtures['google_serp.html'].replace('{query}', html.escape(q))
+            return 200, 'text/html; charset=UTF-8', self._fill(body, q), {}
+
+        if path == '/trends':
+            self._count('trends')
+            timeline = json.loads(self.fixtures['trends_multiline.json'])['default']['timelineData']
+            keywords = query.get('kw', [])
+            # Replay the recorded curve scaled per keyword; Trends peaks the payload's top term at 100
+            levels = [keyword_level(kw) for kw in keywords]
+            peak = max(levels, default=1) * max(point['value'][0] for point in timeline)
+            rows = [
+                {'time': point['time'], 'value': [round(point['value'][0] * level / peak * 100) for level in levels]}
+                for point in timeline
+            ]
+            return 200, 'application/json', json.dumps({'keywords': keywords, 'timelineData': rows}).encode(), {}
+
+        if path.startswith('/page/'):
+            self._count('page')
+            etag = f'"{keyword_key(path)}"'
+            return 200, 'text/html; charset=utf-8', self.fixtures['competitor_page.html'].encode(), {'ETag': etag}
+
+        return 404, 'text/plain', b'not found', {}
+
+    def _fill(self, body: str, query: str) -> bytes:
+        return body.replace('{base}', self.base_url).replace('{key}', keyword_key(query)).encode('utf-8')
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # Headers and body are separate writes
+
+            def do_GET(self):
+                parts = urlparse(self.path)
+                status, content_type, body, headers = server.render(parts.path, parse_qs(parts.query))
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
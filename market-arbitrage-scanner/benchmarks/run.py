@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Scanner pipeline benchmarks
+
+Replays recorded upstream responses from a local stand-in server and measures
+throughput and p50/p99 latency of the hot paths at several keyword scales.
+
+Usage:
+    python benchmarks/run.py                          # 10 and 1k keywords
+    python benchmarks/run.py --scales 10,1000,100000  # full run (network benches take minutes)
+    python benchmarks/run.py --baseline benchmarks/results/baseline.json
+"""
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlencode
+
+import click
+import numpy as np
+import pandas as pd
+import requests
+from tabulate import tabulate
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from main import MarketScanner
+from metrics import Metrics
+from models import GapAnalysis
+from output.markdown_generator import MarkdownGenerator
+from scoring.gap_scorer import GapScorer
+from services.http_client import build_session
+from services.quality_analyzer import QualityAnalyzer
+from services.rate_limiter import RateLimiter
+from services.search_volume import SearchVolumeService
+from services.serp_scraper import SerpScraper
+from services.serpapi_service import SerpApiService
+from services.translator import TranslationService
+
+from fixture_server import FixtureServer
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+# Benchmarks whose per-op cost is a local HTTP round trip; scales above this are slow
+NETWORK_BENCHES = ('scan_keyword', 'analyze_url', 'serp_get_top_urls')
+
+
+class ReplayTrends:
+    """Stand-in for TrendReq that reads interest timelines from the fixture server"""
+
+    def __init__(self, base_url: str, session: requests.Session):
+        self.base_url = base_url
+        self.session = session
+        self.keywords: List[str] = []
+
+    def build_payload(self, keywords, cat=0, timeframe='today 12-m', geo='', gprop=''):
+        self.keywords = list(keywords)
+        self.geo = geo
+
+    def interest_over_time(self) -> pd.DataFrame:
+        response = self.session.get(f'{self.base_url}/trends', params={'kw': self.keywords, 'geo': self.geo})
+        response.raise_for_status()
+        rows = response.json()['timelineData']
+        return pd.DataFrame(
+            {kw: [row['value'][i] for row in rows] for i, kw in enumerate(self.keywords)},
+            index=pd.to_datetime([int(row['time']) for row in rows], unit='s')
+        )
+
+
+class ReplayTranslator:
+    """Stand-in for GoogleTranslator (translation is not part of the recorded fixtures)"""
+
+    def translate(self, text: str) -> str:
+        return '\n'.join(f'{line} (pt)' for line in text.split('\n'))
+
+
+class ReplaySearchVolume(SearchVolumeService):
+    """SearchVolumeService without the live pytrends handshake"""
+
+    def _init_client(self):
+        self.pytrends = None
+
+
+def build_scanner(base_url: str) -> MarketScanner:
+    """Assemble a MarketScanner whose upstreams all point at the fixture server"""
+    metrics = Metrics()
+    limiter = RateLimiter(default_interval=0, metrics=metrics)
+    session = build_session()
+
+    scanner = MarketScanner.__new__(MarketScanner)
+    scanner.rate_limiter = limiter
+    scanner.metrics = metrics
+    scanner.translator = TranslationService(rate_limiter=limiter)
+    scanner.translator.translator = ReplayTranslator()
+    scanner.search_volume = ReplaySearchVolume(rate_limiter=limiter)
+    scanner.search_volume.pytrends = ReplayTrends(base_url, session)
+    scanner.serpapi = SerpApiService(api_key='benchmark', session=session)
+    scanner.serpapi.base_url = f'{base_url}/search.json'
+    scanner.serp_scraper = build_scraper(base_url, limiter, session)
+    scanner.use_serpapi = True
+    scanner.scrape_over_budget = True
+    scanner.account = {}
+    scanner.quality_analyzer = build_analyzer(limiter, session)
+    scanner.gap_scorer = GapScorer()
+    scanner.markdown_gen = MarkdownGenerator(output_dir=str(RESULTS_DIR))
+    scanner.results_store = None
+    return scanner
+
+
+def build_scraper(base_url: str, limiter: RateLimiter, session: Optional[requests.Session] = None) -> SerpScraper:
+    """SerpScraper that requests the replayed Google SERP instead of google.com"""
+    scraper = SerpScraper(rate_limiter=limiter, session=session)
+    scraper._build_google_url = lambda keyword, geo, num_results=10: (
+        f"{base_url}/search?{urlencode({'q': keyword, 'gl': geo, 'num': num_results})}"
+    )
+    return scraper
+
+
+def build_analyzer(limiter: RateLimiter, session: Optional[requests.Session] = None) -> QualityAnalyzer:
+    """QualityAnalyzer without caching so every call fetches and parses"""
+    # Every fixture URL is on 127.0.0.1, so allow the whole pool on one host
+    return QualityAnalyzer(
+        timeout=10, rate_limiter=limiter, max_concurrency=8, per_domain_concurrency=8, session=session
+    )
+
+
+def synthetic_keywords(count: int) -> List[str]:
+    """Distinct English keywords shaped like data/keywords.txt"""
+    tools = ['pdf to excel', 'invoice generator', 'image resizer', 'qr code maker', 'csv merger']
+    return [f'{tools[i % len(tools)]} {i}' for i in range(count)]
+
+
+def synthetic_rows(count: int) -> List[dict]:
+    """Report rows spread across every score tier"""
+    return [
+        GapAnalysis(
+            english_keyword=keyword,
+            brazilian_keyword=f'{keyword} (pt)',
+            us_volume_score=(i * 37) % 101,
+            br_volume_score=(i * 53) % 101,
+            us_top_urls=[f'https://us{i}.example.com/{n}' for n in range(3)],
+            br_top_urls=[f'https://br{i}.example.com/{n}' for n in range(3)],
+            br_avg_quality=float((i * 29) % 101),
+            gap_score=float((i * 7919) % 1001) / 10
+        ).to_row()
+        for i, keyword in enumerate(synthetic_keywords(count))
+    ]
+
+
+def measure(name: str, scale: int, ops: Iterable[Callable[[], object]], items_per_op: int = 1) -> dict:
+    """
+    Time each operation and summarize
+
+    Args:
+        name: Benchmark name
+        scale: Keyword scale the run belongs to
+        ops: Zero-argument callables, one per timed operation
+        items_per_op: Keywords handled by each operation (for throughput)
+
+    Returns:
+        Result record
+    """
+    latencies = []
+    start = time.perf_counter()
+    for op in ops:
+        op_start = time.perf_counter()
+        op()
+        latencies.append(time.perf_counter() - op_start)
+    total = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'name': name,
+        'scale': scale,
+        'ops': len(latencies),
+        'total_s': round(total, 4),
+        'throughput_per_s': round(len(latencies) * items_per_op / total, 2) if total else None,
+        'p50_ms': round(float(np.percentile(latencies_ms, 50)), 3),
+        'p99_ms': round(float(np.percentile(latencies_ms, 99)), 3),
+    }
+
+
+def bench_markdown(scale: int, base_url: str) -> dict:
+    rows = synthetic_rows(scale)
+    generator = MarkdownGenerator(output_dir=str(RESULTS_DIR))
+    # Repeat small reports so the percentiles mean something
+    repeats = max(1, min(20, 10_000 // scale))
+    return measure('build_markdown', scale, (lambda: generator._build_markdown(rows) for _ in range(repeats)), scale)
+
+
+def bench_serp(scale: int, base_url: str) -> dict:
+    scraper = build_scraper(base_url, RateLimiter(default_interval=0))
+    return measure(
+        'serp_get_top_urls', scale,
+        (lambda kw=kw: scraper.get_top_urls(kw, 'US', top_n=3) for kw in synthetic_keywords(scale))
+    )
+
+
+def bench_analyze_url(scale: int, base_url: str) -> dict:
+    analyzer = build_analyzer(RateLimiter(default_interval=0))
+    return measure(
+        'analyze_url', scale,
+        (lambda i=i: analyzer.analyze_url(f'{base_url}/page/bench-{i}') for i in range(scale))
+    )
+
+
+def bench_scan_keyword(scale: int, base_url: str) -> dict:
+    scanner = build_scanner(base_url)
+    return measure(
+        'scan_keyword', scale,
+        (lambda kw=kw: scanner.scan_keyword(kw) for kw in synthetic_keywords(scale))
+    )
+
+
+BENCHES: Dict[str, Callable[[int, str], dict]] = {
+    'build_markdown': bench_markdown,
+    'serp_get_top_urls': bench_serp,
+    'analyze_url': bench_analyze_url,
+    'scan_keyword': bench_scan_keyword,
+}
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """
+    Find benchmarks that got slower than the baseline
+
+    Returns:
+        One line per regression
+    """
+    previous = {(r['name'], r['scale']): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result['name'], result['scale']))
+        if before is None:
+            continue
+        for metric in ('p50_ms', 'p99_ms'):
+            if before[metric] and result[metric] > before[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{result['name']}@{result['scale']}: {metric} {before[metric]} → {result[metric]}"
+                )
+        if before['throughput_per_s'] and result['throughput_per_s'] < before['throughput_per_s'] * (1 - tolerance):
+            regressions.append(
+                f"{result['name']}@{result['scale']}: throughput "
+                f"{before['throughput_per_s']} → {result['throughput_per_s']}/s"
+            )
+    return regressions
+
+
+@click.command()
+@click.option('--scales', default='10,1000', show_default=True,
+              help='Comma-separated keyword counts (e.g. 10,1000,100000)')
+@click.option('--only', multiple=True, type=click.Choice(list(BENCHES)), help='Run only these benchmarks')
+@click.option('--max-network-scale', type=int, default=None,
+              help=f'Skip {", ".join(NETWORK_BENCHES)} above this scale')
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help='Results file (default: results/<timestamp>.json)')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False), help='Earlier results file to compare against')
+@click.option('--tolerance', type=float, default=0.2, show_default=True, help='Allowed slowdown before flagging')
+def main(scales: str, only, max_network_scale: Optional[int], output: Optional[str],
+         baseline: Optional[str], tolerance: float):
+    """Run the pipeline benchmarks against replayed fixtures."""
+    logging.basicConfig(level=logging.CRITICAL)
+
+    scale_list = [int(s) for s in scales.split(',') if s.strip()]
+    names = list(only) or list(BENCHES)
+    results = []
+
+    with FixtureServer() as server:
+        for name in names:
+            for scale in scale_list:
+                if name in NETWORK_BENCHES and max_network_scale is not None and scale > max_network_scale:
+                    continue
+                click.echo(f"⏱️  {name} @ {scale}...", err=True)
+                results.append(BENCHES[name](scale, server.base_url))
+        upstream_requests = dict(server.requests)
+
+    click.echo(tabulate(
+        [[r['name'], r['scale'], r['ops'], r['throughput_per_s'], r['p50_ms'], r['p99_ms']] for r in results],
+        headers=['benchmark', 'scale', 'ops', 'keywords/s', 'p50 ms', 'p99 ms']
+    ))
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'upstream_requests': upstream_requests,
+        'results': results,
+    }
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output_path = Path(output) if output else RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    click.echo(f"\n💾 Results saved to {output_path}")
+
+    if baseline:
+        regressions = compare(results, json.loads(Path(baseline).read_text(encoding='utf-8'))['results'], tolerance)
+        if regressions:
+            click.echo(f"\n❌ {len(regressions)} regression(s) over {tolerance:.0%} vs {baseline}:")
+            for line in regressions:
+                click.echo(f"   {line}")
+            sys.exit(1)
+        click.echo(f"\n✅ No regressions over {tolerance:.0%} vs {baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,30 +5,38 @@ Brazil Keyword Research Tool
 Researches keywords directly in the Brazilian market (no US comparison).
 Designed for Brazil-specific tools like Shopee/Mercado Livre calculators.
 
+Keywords are scanned concurrently on the same cached services as the main
+scanner: one Google Trends session, the SerpAPI response cache and the
+competitor quality cache.
+
 Usage:
     python src/br_keyword_research.py data/br_keywords.txt
     python src/br_keyword_research.py data/br_keywords.txt -o my_report.md
+    python src/br_keyword_research.py data/br_keywords.txt -w 8 -v
 """
 import click
 import logging
 import sys
-import time
 from pathlib import Path
-from dataclasses import dataclass
-from typing import List, Optional
-import os
+from dataclasses import dataclass, field
+from functools import partial
+from typing import List
 
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import Config
-from services.serpapi_service import SerpApiService
+from models import CompetitorAnalysis
+from pipeline import iter_ordered
+from services.credit_ledger import CreditLedger, LEDGER_TABLE
+from services.http_client import get_shared_http_session
+from services.serpapi_service import SerpApiService, SERP_CACHE_TABLE
 from services.quality_analyzer import QualityAnalyzer
-
-try:
-    from pytrends.request import TrendReq
-    PYTRENDS_AVAILABLE = True
-except ImportError:
-    PYTRENDS_AVAILABLE = False
+from services.quality_cache import get_shared_quality_cache
+from services.rate_limiter import get_shared_rate_limiter
+from services.retry import get_shared_retry_policy
+from services.search_volume import SearchVolumeService, TRENDS_CACHE_TABLE
+from cache.sqlite_cache import SqliteCache
+from output.results_store import ResultsStore, open_results_store
 
 logging.basicConfig(
     level=logging.INFO,
@@ -46,30 +54,49 @@ class BRKeywordResult:
     avg_competitor_quality: float  # 0-100 (higher = stronger competition)
     opportunity_score: float   # Our composite score (higher = better for us)
     verdict: str
+    competitors: List[CompetitorAnalysis] = field(default_factory=list)  # Per-URL metrics of the top 3
 
 
-def get_br_trends_interest(keyword: str) -> int:
-    """Get Google Trends interest score for a keyword in Brazil."""
-    if not PYTRENDS_AVAILABLE:
-        logger.warning("pytrends not available, skipping Trends data")
-        return 0
-
-    try:
-        pt = TrendReq(hl='pt-BR', tz=-180)
-        pt.build_payload([keyword], geo='BR', timeframe='today 12-m')
-        data = pt.interest_over_time()
-
-        if data.empty or keyword not in data.columns:
-            logger.warning(f"No Trends data for '{keyword}' in BR")
-            return 0
-
-        score = int(data[keyword].mean())
-        logger.info(f"  Trends BR interest for '{keyword}': {score}/100")
-        return score
+def build_services():
+    """
+    Create the Trends, SerpAPI and quality services shared by every worker.
 
-    except Exception as e:
-        logger.warning(f"  Trends error for '{keyword}': {e}")
-        return 0
+    They use the same caches, rate limiter, retry policy and pooled HTTP
+    session as MarketScanner, so keywords researched by either tool are not
+    fetched again.
+    """
+    rate_limiter = get_shared_rate_limiter(Config)
+    retry = get_shared_retry_policy(Config)
+    session = get_shared_http_session(Config)
+    volumes = SearchVolumeService(
+        timeframe=Config.TRENDS_TIMEFRAME,
+        rate_limiter=rate_limiter,
+        cache=SqliteCache(Config.CACHE_DB, TRENDS_CACHE_TABLE),
+        cache_ttl=Config.TRENDS_CACHE_TTL,
+        retry=retry,
+        hl='pt-BR',
+        tz=-180
+    )
+    serpapi = SerpApiService(
+        api_key=Config.SERPAPI_KEY,
+        cache=SqliteCache(Config.CACHE_DB, SERP_CACHE_TABLE),
+        cache_ttl=Config.SERP_CACHE_TTL,
+        ledger=CreditLedger(store=SqliteCache(Config.CACHE_DB, LEDGER_TABLE)),
+        retry=retry,
+        session=session
+    )
+    analyzer = QualityAnalyzer(
+        timeout=Config.REQUEST_TIMEOUT,
+        rate_limiter=rate_limiter,
+        max_concurrency=Config.QUALITY_MAX_CONCURRENCY,
+        per_domain_concurrency=Config.QUALITY_PER_DOMAIN_CONCURRENCY,
+        deadline=Config.QUALITY_DEADLINE,
+        max_parse_chars=Config.QUALITY_MAX_PARSE_CHARS,
+        max_body_bytes=Config.QUALITY_MAX_BODY_BYTES,
+        cache=get_shared_quality_cache(Config),
+        session=session
+    )
+    return volumes, serpapi, analyzer
 
 
 def calculate_opportunity_score(br_interest: int, avg_quality: float) -> float:
@@ -111,29 +138,38 @@ def get_verdict(score: float, br_interest: int, quality: float) -> str:
             return "❌ LOW VALUE — Low demand, not worth targeting"
 
 
-def scan_keyword(keyword: str, serpapi: SerpApiService, analyzer: QualityAnalyzer) -> BRKeywordResult:
+def scan_keyword(
+    keyword: str,
+    serpapi: SerpApiService,
+    analyzer: QualityAnalyzer,
+    volumes: SearchVolumeService
+) -> BRKeywordResult:
+    """
+    Research one keyword; safe to call from several threads at once.
+
+    Raises UpstreamError when Trends or SerpAPI keep failing, so the keyword
+    is skipped instead of being scored as having no demand or no competitors.
+    """
     logger.info(f"\n{'─'*60}")
     logger.info(f"🔍 Keyword: '{keyword}'")
 
-    # Step 1: Google Trends interest in Brazil
-    br_interest = get_br_trends_interest(keyword)
-    time.sleep(3)  # Rate limit respect
+    # Step 1: Google Trends interest in Brazil (cached, shared with MarketScanner)
+    br_interest = volumes.get_interest_score(keyword, 'BR')
+    logger.info(f"  Trends BR interest for '{keyword}': {br_interest}/100")
 
-    # Step 2: Top ranking URLs in Brazil via SerpAPI
+    # Step 2: Top ranking URLs in Brazil via SerpAPI (an UpstreamError skips the keyword)
     logger.info(f"  Fetching BR SERP results...")
-    try:
-        top_urls = serpapi.get_top_urls(keyword, 'BR', top_n=5)
-        logger.info(f"  Found {len(top_urls)} ranking URLs")
-    except Exception as e:
-        logger.warning(f"  SerpAPI error: {e}")
-        top_urls = []
+    top_urls = serpapi.get_top_urls(keyword, 'BR', top_n=5)
+    logger.info(f"  Found {len(top_urls)} ranking URLs")
 
     # Step 3: Analyze competitor quality
     avg_quality = 0.0
+    competitors = []
     if top_urls:
         logger.info(f"  Analyzing {len(top_urls)} competitors...")
         analysis = analyzer.analyze_competitors(top_urls[:3])
         avg_quality = analysis.get('average_quality', 0)
+        competitors = [CompetitorAnalysis.from_metrics(m) for m in analysis['analyses']]
         logger.info(f"  Avg competitor quality: {avg_quality:.0f}/100")
 
     # Step 4: Score
@@ -148,9 +184,18 @@ def scan_keyword(keyword: str, serpapi: SerpApiService, analyzer: QualityAnalyze
         avg_competitor_quality=avg_quality,
         opportunity_score=opportunity_score,
         verdict=verdict,
+        competitors=competitors,
     )
 
 
+def store_result(store: ResultsStore, result: BRKeywordResult):
+    """Record a result in the scan history without failing the run."""
+    try:
+        store.add_br_result(result)
+    except Exception as e:
+        logger.warning(f"  Could not store result for '{result.keyword}': {e}")
+
+
 def generate_report(results: List[BRKeywordResult], output_path: str):
     """Generate a markdown report sorted by opportunity score."""
     sorted_results = sorted(results, key=lambda r: r.opportunity_score, reverse=True)
@@ -220,8 +265,13 @@ def print_summary(results: List[BRKeywordResult]):
 @click.command()
 @click.argument('input_file', type=click.Path(exists=True))
 @click.option('-o', '--output', default=None, help='Output markdown filename')
-def main(input_file: str, output: str):
+@click.option('-w', '--workers', type=click.IntRange(min=1), default=Config.BR_RESEARCH_WORKERS, show_default=True,
+              help='Keywords researched in parallel (rate limits still apply per upstream)')
+@click.option('-v', '--verbose', is_flag=True, help='Log every step instead of only showing progress')
+def main(input_file: str, output: str, workers: int, verbose: bool):
     """Scan Brazilian keywords for SEO opportunity."""
+    if not verbose:
+        logging.getLogger().setLevel(logging.WARNING)
 
     # Load keywords
     with open(input_file, 'r', encoding='utf-8') as f:
@@ -236,28 +286,49 @@ def main(input_file: str, output: str):
 
     click.echo(f"📄 Loaded {len(keywords)} keywords\n")
 
-    # Init services
-    serpapi = SerpApiService(api_key=Config.SERPAPI_KEY)
-    analyzer = QualityAnalyzer(timeout=Config.REQUEST_TIMEOUT)
+    # Init services (one Trends session, shared caches)
+    volumes, serpapi, analyzer = build_services()
 
     if not serpapi.enabled:
         click.echo("⚠️  SerpAPI not configured — competitor URLs will be empty")
 
-    # Scan
+    store = open_results_store(Config.RESULTS_DB, Config.STORE_RESULTS)
+
+    # Scan across the worker pool; results arrive in input order
+    scan = partial(scan_keyword, serpapi=serpapi, analyzer=analyzer, volumes=volumes)
     results = []
-    for i, keyword in enumerate(keywords, 1):
-        click.echo(f"[{i}/{len(keywords)}] {keyword}")
-        try:
-            result = scan_keyword(keyword, serpapi, analyzer)
+    failed = []
+    with click.progressbar(
+        iter_ordered(scan, keywords, workers=workers),
+        length=len(keywords),
+        label=f"🔍 Researching ({workers} worker(s))",
+        show_eta=True,
+        show_pos=True,
+        item_show_func=lambda item: item[0] if item else None
+    ) as progress:
+        for keyword, result, error in progress:
+            if error is not None:
+                logger.error(f"Failed on '{keyword}': {error}")
+                failed.append(keyword)
+                continue
             results.append(result)
-        except Exception as e:
-            logger.error(f"Failed on '{keyword}': {e}")
-            continue
+            if store is not None:
+                store_result(store, result)
+
+    if store is not None:
+        store.close()
+
+    if failed:
+        click.echo(f"⚠️  Skipped {len(failed)} keyword(s) after upstream errors: {', '.join(failed)}")
 
     if not results:
         click.echo("❌ No results")
         return
 
+    click.echo(f"💾 {analyzer.cache.summary()}, {analyzer.not_modified} revalidated unchanged (304)")
+    if serpapi.enabled:
+        click.echo(f"💳 {serpapi.ledger.summary()}")
+
     # Output
     print_summary(results)
 
@@ -266,6 +337,7 @@ def main(input_file: str, output: str):
     )
     Path(Config.RESULTS_DIR).mkdir(parents=True, exist_ok=True)
     generate_report(results, output_path)
+    click.echo(f"📊 Report saved to: {output_path}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,6 @@
+"""Cache package"""
+
+
+
+
+
@@ -0,0 +1,162 @@
+"""
+Persistent key/value cache backed by SQLite
+Each cache lives in its own table so several caches can share one database file
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, List, Optional, Tuple
+
+from metrics import Metrics, get_shared_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a cache key from several parts
+    
+    Args:
+        parts: Values identifying the cached item (e.g. keyword, geo, timeframe)
+    
+    Returns:
+        Stable string key
+    """
+    return json.dumps(parts, ensure_ascii=False, separators=(',', ':'))
+
+
+class SqliteCache:
+    """Thread-safe JSON value cache with per-entry timestamps"""
+    
+    def __init__(self, db_path: str, table: str, metrics: Optional[Metrics] = None):
+        """
+        Open (or create) a cache table
+        
+        Args:
+            db_path: SQLite database file (parent directories are created)
+            table: Table name for this cache
+            metrics: Registry counting get() hits and misses (default: the process-wide registry)
+        """
+        if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', table):
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.db_path = db_path
+        self.table = table
+        self.metrics = metrics or get_shared_metrics()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)'
+            )
+    
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Get a cached value with the time it was stored, ignoring freshness
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            (value, stored_at epoch seconds) or None if missing
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT value, stored_at FROM {self.table} WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+    
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """
+        Get a cached value if present and fresh
+        
+        Args:
+            key: Cache key
+            max_age: Maximum age in seconds (None = never expires)
+        
+        Returns:
+            Cached value or None
+        """
+        entry = self.get_entry(key)
+        if entry is None or (max_age is not None and time.time() - entry[1] > max_age):
+            self.metrics.incr(f'cache.{self.table}.miss')
+            return None
+        
+        self.metrics.incr(f'cache.{self.table}.hit')
+        return entry[0]
+    
+    def set(self, key: str, value: Any):
+        """
+        Store a JSON-serializable value
+        
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, value, stored_at) VALUES (?, ?, ?)',
+                (key, payload, time.time())
+            )
+    
+    def items(self) -> List[Tuple[str, Any, float]]:
+        """
+        List every entry in this cache
+        
+        Returns:
+            (key, value, stored_at) tuples, oldest first
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT key, value, stored_at FROM {self.table} ORDER BY stored_at'
+            ).fetchall()
+        return [(key, json.loads(value), stored_at) for key, value, stored_at in rows]
+    
+    def delete(self, key: str):
+        """Remove a single entry"""
+        with self._lock, self._conn:
+            self._conn.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+    
+    def clear(self):
+        """Remove every entry in this cache"""
+        with self._lock, self._conn:
+            self._conn.execute(f'DELETE FROM {self.table}')
+        logger.info(f"Cache '{self.table}' cleared")
+    
+    def count(self, key_prefix: str = '') -> int:
+        """
+        Count entries whose key starts with a prefix
+        
+        Args:
+            key_prefix: Leading part of the key (default: every entry)
+        
+        Returns:
+            Number of matching entries
+        """
+        with self._lock:
+            return self._conn.execute(
+                f'SELECT COUNT(*) FROM {self.table} WHERE substr(key, 1, ?) = ?',
+                (len(key_prefix), key_prefix)
+            ).fetchone()[0]
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+    
+    def close(self):
+        """Close the underlying connection"""
+        with self._lock:
+            self._conn.close()
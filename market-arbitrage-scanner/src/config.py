@@ -12,28 +12,96 @@ class Config:
     # Directories
     DATA_DIR = 'data'
     RESULTS_DIR = os.path.join(DATA_DIR, 'results')
+    CHECKPOINT_DIR = os.path.join(DATA_DIR, 'checkpoints')
     
-    # Rate limiting (seconds)
+    # Persistent caches (SQLite, one table per cache)
+    CACHE_DB = os.path.join(DATA_DIR, 'cache.sqlite3')
+    TRENDS_CACHE_TTL = float(os.getenv('TRENDS_CACHE_TTL', 7 * 24 * 3600))  # seconds
+    TRANSLATE_CHUNK_SIZE = 50  # Keywords per batch translation request
+    SERP_CACHE_TTL = float(os.getenv('SERP_CACHE_TTL', 3 * 24 * 3600))  # seconds
+    QUALITY_CACHE_TTL = float(os.getenv('QUALITY_CACHE_TTL', 7 * 24 * 3600))  # seconds
+    QUALITY_CACHE_DOMAIN_FALLBACK = os.getenv('QUALITY_CACHE_DOMAIN_FALLBACK', 'false').lower() == 'true'
+    
+    # Scan history (DuckDB, queried by the history command)
+    RESULTS_DB = os.getenv('RESULTS_DB', os.path.join(DATA_DIR, 'results.duckdb'))
+    STORE_RESULTS = os.getenv('STORE_RESULTS', 'true').lower() == 'true'
+    
+    # Rate limiting (seconds per request, enforced per upstream host)
     SERP_RATE_LIMIT = 3.0  # Delay between Google searches
     TRENDS_RATE_LIMIT = 2.0  # Delay between Trends requests
-    QUALITY_RATE_LIMIT = 1.0  # Delay between quality checks
+    QUALITY_RATE_LIMIT = 1.0  # Delay between quality checks (per competitor host)
+    TRANSLATE_RATE_LIMIT = 0.5  # Delay between translation requests
+    
+    # Burst allowance (requests allowed back-to-back after an idle period)
+    SERP_RATE_BURST = 1
+    TRENDS_RATE_BURST = 1
+    QUALITY_RATE_BURST = 2
+    TRANSLATE_RATE_BURST = 5
+    
+    # Concurrency
+    BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '1'))  # Keywords scanned in parallel
+    BR_RESEARCH_WORKERS = int(os.getenv('BR_RESEARCH_WORKERS', '4'))  # Keywords researched in parallel (br_keyword_research)
+    
+    # HTTP client (one pooled keep-alive session shared by SerpAPI, the SERP scraper and quality checks)
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '64'))  # Hosts with a kept pool (competitor sites are many)
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '16'))  # Idle keep-alive connections per host
+    DNS_CACHE_TTL = float(os.getenv('DNS_CACHE_TTL', '300'))  # Seconds a DNS answer is reused (0 = off)
     
     # Timeouts
     REQUEST_TIMEOUT = 10  # seconds
     
+    # Competitor quality fetching
+    QUALITY_MAX_CONCURRENCY = 8  # Pages fetched at once, across all keywords
+    QUALITY_PER_DOMAIN_CONCURRENCY = 1  # Pages fetched at once from one host
+    QUALITY_DEADLINE = 60.0  # Total seconds per keyword's competitor analysis
+    QUALITY_MAX_PARSE_CHARS = 500_000  # Stop parsing a competitor page after this much HTML
+    QUALITY_MAX_BODY_BYTES = int(os.getenv('QUALITY_MAX_BODY_BYTES', 256 * 1024))  # Stop downloading after this many bytes
+    
     # Google Trends
     TRENDS_TIMEFRAME = 'today 12-m'  # Last 12 months
     US_GEO = 'US'
     BR_GEO = 'BR'
     
+    # Batched Trends payloads (up to 4 keywords + 1 shared anchor term per request)
+    TRENDS_BATCHING = os.getenv('TRENDS_BATCHING', 'true').lower() == 'true'
+    TRENDS_ANCHOR_TERMS = {
+        'US': os.getenv('TRENDS_ANCHOR_US', 'pdf converter'),
+        'BR': os.getenv('TRENDS_ANCHOR_BR', 'conversor de pdf'),
+    }
+    # Score each market's anchor is pinned to. Anchored scores are capped at 100, so keywords
+    # more than 100/score times as popular as the anchor all tie at 100; lower the score
+    # (or pick a more popular anchor) if the top of the ranking flattens out
+    TRENDS_ANCHOR_SCORES = {
+        'US': int(os.getenv('TRENDS_ANCHOR_SCORE_US', '50')),
+        'BR': int(os.getenv('TRENDS_ANCHOR_SCORE_BR', '50')),
+    }
+    TRENDS_PREFETCH_CHUNK = 40  # Keywords whose volumes are fetched together in batch mode
+    
+    # Keyword discovery (`discover`: breadth-first over Trends related queries, cached like scores)
+    DISCOVERY_MAX_DEPTH = int(os.getenv('DISCOVERY_MAX_DEPTH', '2'))  # Expansion levels below the seeds
+    DISCOVERY_MAX_KEYWORDS = int(os.getenv('DISCOVERY_MAX_KEYWORDS', '200'))  # Distinct keywords kept, seeds included
+    DISCOVERY_MAX_REQUESTS = int(os.getenv('DISCOVERY_MAX_REQUESTS', '50'))  # Uncached Trends requests per run
+    DISCOVERY_PER_KEYWORD = 10  # Related queries followed from each top/rising list
+    
+    # Near-duplicate keyword collapsing (batch --dedupe)
+    DEDUPE_THRESHOLD = float(os.getenv('DEDUPE_THRESHOLD', '0.75'))  # Min token-trigram Jaccard similarity
+    
     # SERP settings
     TOP_N_RESULTS = 3  # Number of top URLs to analyze
     USE_SERPAPI = os.getenv('USE_SERPAPI', 'true').lower() == 'true'  # Use SerpAPI if available
     SERPAPI_KEY = os.getenv('SERPAPI_KEY')  # Get from https://serpapi.com
     
-    # Retry settings
-    MAX_RETRIES = 3
-    RETRY_DELAY = 5  # seconds
+    # Batch budget planning (`batch`: credit ceiling, expected-value ordering)
+    SERP_CREDIT_CEILING = int(os.getenv('SERP_CREDIT_CEILING', '0'))  # Paid searches per batch (0 = credits left on the plan)
+    SERP_OVER_BUDGET = os.getenv('SERP_OVER_BUDGET', 'scrape')  # Past the ceiling: 'scrape' (free scraper) or 'stop'
+    MIN_US_INTEREST = int(os.getenv('MIN_US_INTEREST', '0'))  # Skip keywords below this US Trends score before SERP
+    
+    # Retry settings (Trends, SerpAPI and Google SERP requests)
+    MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))  # Retries after the first attempt
+    RETRY_DELAY = float(os.getenv('RETRY_DELAY', '5'))  # Base backoff in seconds, doubled per retry with jitter
+    RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '60'))  # Longer Retry-After opens the circuit instead
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))  # Consecutive failures per upstream
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '120'))  # Seconds before a trial call
     
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
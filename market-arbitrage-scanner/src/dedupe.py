@@ -0,0 +1,235 @@
+"""
+Near-duplicate keyword collapsing
+Normalizes keywords (case, accents, stopwords, plurals, word order) and clusters
+the remaining near-duplicates with MinHash LSH, so each cluster is scanned once
+"""
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Function words dropped before comparing keywords (English and Portuguese)
+STOPWORDS = frozenset({
+    'a', 'an', 'the', 'for', 'of', 'and', 'in', 'on', 'with', 'my', 'your', 'by',
+    'o', 'os', 'as', 'um', 'uma', 'de', 'da', 'do', 'das', 'dos', 'e', 'no', 'na',
+    'nos', 'nas', 'com', 'por', 'pelo', 'pela', 'seu', 'sua',
+})
+
+# Words that give a keyword a direction ("pdf to excel" is not "excel to pdf")
+DIRECTION_WORDS = frozenset({'to', 'into', 'para', 'em', 'vs', 'versus'})
+
+# Words ending in "s" that are not plurals, or whose stripped form is another
+# word ("news" is not "new", "canvas" is not "canva"); _singular leaves them alone
+SINGULAR_EXCEPTIONS = frozenset({
+    'news', 'canvas', 'atlas', 'alias', 'lens', 'chaos', 'macos', 'windows', 'always',
+    'series', 'species', 'physics', 'ethics', 'mathematics', 'economics', 'analytics',
+    'shoes', 'heroes', 'mais', 'menos', 'pires', 'simples', 'portugues', 'ingles',
+})
+
+_WORD = re.compile(r"[^\W_]+")
+
+# Large prime above 2**32 for the MinHash permutations
+_PRIME = np.uint64(4294967311)
+
+
+def _strip_accents(text: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+def _singular(word: str) -> str:
+    """Light plural stripping shared by English and Portuguese ('calculadoras' -> 'calculadora')"""
+    if word in SINGULAR_EXCEPTIONS:
+        return word
+    if len(word) > 4 and word.endswith('oes'):
+        return word[:-3] + 'ao'     # conversões -> conversao
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def keyword_tokens(keyword: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """
+    Split a keyword into comparable tokens
+    
+    Words are case-folded, stripped of accents and plurals, and stopwords are
+    dropped. Each direction word is replaced by a 'left>right' token linking
+    the content words around it, so reordering keeps the meaning only when
+    the direction is the same.
+    
+    Args:
+        keyword: Raw keyword
+    
+    Returns:
+        (content tokens, direction tokens)
+    """
+    words = [_singular(w) for w in _WORD.findall(_strip_accents(keyword.casefold()))]
+    content = [w for w in words if w not in STOPWORDS and w not in DIRECTION_WORDS]
+    
+    directions = set()
+    for i, word in enumerate(words):
+        if word not in DIRECTION_WORDS:
+            continue
+        left = next((w for w in reversed(words[:i]) if w in content), None)
+        right = next((w for w in words[i + 1:] if w in content), None)
+        if left and right:
+            directions.add(f'{left}>{right}')
+    return frozenset(content), frozenset(directions)
+
+
+def keyword_signature(keyword: str) -> str:
+    """
+    Exact-duplicate key: keywords with the same signature are the same search
+    
+    Example:
+        "Calculadoras de Lucro", "calculadora lucro" and "lucro calculadora"
+        all give 'calculadora lucro'
+    """
+    content, directions = keyword_tokens(keyword)
+    return ' '.join(sorted(content) + sorted(directions))
+
+
+def _shingles(content: FrozenSet[str]) -> FrozenSet[str]:
+    """Character trigrams of each token, so typos and joined words still overlap"""
+    grams = set()
+    for token in content:
+        padded = f'#{token}#'
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash signatures over string sets (num_perm random linear hash permutations)"""
+    
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+    
+    def signature(self, items: Iterable[str]) -> np.ndarray:
+        """
+        MinHash signature of a set
+        
+        Returns:
+            uint64 array of length num_perm (all max values for an empty set)
+        """
+        hashes = np.fromiter((zlib.crc32(item.encode('utf-8')) for item in items), dtype=np.uint64)
+        if not hashes.size:
+            return np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        # (a * x + b) mod p for every permutation and item; a, b < 2**31 and x < 2**32 cannot overflow
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+    
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+    
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            # Keep the earliest index as root, so the first keyword in input order represents the cluster
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+@dataclass(frozen=True)
+class KeywordCluster:
+    """Keywords judged to be the same search; only the representative is scanned"""
+    representative: str
+    members: Tuple[str, ...] = ()   # Other spellings, in input order
+    
+    @property
+    def size(self) -> int:
+        return 1 + len(self.members)
+
+
+def cluster_keywords(
+    keywords: Iterable[str],
+    threshold: float = 0.75,
+    num_perm: int = 64,
+    bands: int = 16,
+    hasher: Optional[MinHasher] = None
+) -> List[KeywordCluster]:
+    """
+    Group near-duplicate keywords
+    
+    Keywords with the same keyword_signature() are merged outright. The
+    remaining distinct signatures go through MinHash LSH (bands × rows =
+    num_perm) over token trigrams; candidate pairs that share a band are
+    merged when their trigram Jaccard similarity reaches threshold and their
+    direction tokens match. Merges are transitive (union-find).
+    
+    Args:
+        keywords: Keywords in input order (exact repeats are kept once)
+        threshold: Minimum trigram Jaccard similarity for a near-duplicate
+        num_perm: MinHash permutations
+        bands: LSH bands (more bands find lower similarities, with more candidates)
+        hasher: MinHasher to reuse (default: one built from num_perm)
+    
+    Returns:
+        Clusters in input order of their representative (the first keyword seen)
+    """
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+    
+    # Exact duplicates first: one slot per signature, in order of first appearance
+    slots: Dict[str, int] = {}
+    groups: List[List[str]] = []
+    tokens: List[Tuple[FrozenSet[str], FrozenSet[str]]] = []
+    seen = set()
+    for keyword in keywords:
+        keyword = keyword.strip()
+        if not keyword or keyword in seen:
+            continue
+        seen.add(keyword)
+        signature = keyword_signature(keyword)
+        slot = slots.get(signature)
+        if slot is None:
+            slot = slots[signature] = len(groups)
+            groups.append([])
+            tokens.append(keyword_tokens(keyword))
+        groups[slot].append(keyword)
+    
+    # Near duplicates: LSH buckets propose pairs, the exact similarity decides
+    union = _UnionFind(len(groups))
+    hasher = hasher or MinHasher(num_perm)
+    shingles = [_shingles(content) for content, _ in tokens]
+    rows = num_perm // bands
+    buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+    for slot, grams in enumerate(shingles):
+        if not grams:
+            continue
+        signature = hasher.signature(grams)
+        for band in range(bands):
+            buckets[(band, signature[band * rows:(band + 1) * rows].tobytes())].append(slot)
+    
+    checked = set()
+    for slots_in_bucket in buckets.values():
+        for i, first in enumerate(slots_in_bucket):
+            for second in slots_in_bucket[i + 1:]:
+                if (first, second) in checked:
+                    continue
+                checked.add((first, second))
+                if tokens[first][1] == tokens[second][1] and jaccard(shingles[first], shingles[second]) >= threshold:
+                    union.union(first, second)
+    
+    merged: Dict[int, List[str]] = {}
+    for slot, group in enumerate(groups):
+        merged.setdefault(union.find(slot), []).extend(group)
+    return [KeywordCluster(representative=group[0], members=tuple(group[1:])) for group in merged.values()]
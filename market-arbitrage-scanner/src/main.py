@@ -8,22 +8,38 @@ import click
 import logging
 import sys
 import os
+import time
 from pathlib import Path
-from typing import List
-from dataclasses import asdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from collections import Counter
+from dataclasses import replace
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import Config
-from models import GapAnalysis
-from services.translator import TranslationService
-from services.search_volume import SearchVolumeService
+from models import CompetitorAnalysis, GapAnalysis
+from services.translator import TranslationService, TRANSLATION_CACHE_TABLE
+from services.search_volume import SearchVolumeService, TRENDS_CACHE_TABLE
+from services.keyword_discovery import KeywordDiscovery, RELATED_CACHE_TABLE
 from services.serp_scraper import SerpScraper
-from services.serpapi_service import SerpApiService
+from services.serpapi_service import SerpApiService, SERP_CACHE_TABLE
+from services.credit_ledger import CreditBudget, CreditCeilingReached, CreditLedger, LEDGER_TABLE
+from services.budget_planner import BudgetPlanner, OVER_BUDGET_MODES, ScanPlan
 from services.quality_analyzer import QualityAnalyzer
-from scoring.gap_scorer import GapScorer
+from services.quality_cache import get_shared_quality_cache
+from services.http_client import get_shared_http_session
+from services.rate_limiter import get_shared_rate_limiter
+from services.retry import UpstreamError, get_shared_retry_policy
+from cache.sqlite_cache import SqliteCache
+from scoring.gap_scorer import GapScorer, DEFAULT_WEIGHTS
 from output.markdown_generator import MarkdownGenerator
+from output.checkpoint import CheckpointJournal, default_journal_path
+from output.streaming_report import StreamingReport
+from output.results_store import ResultsStore, open_results_store
+from pipeline import iter_ordered
+from dedupe import cluster_keywords
+from metrics import get_shared_metrics
 
 
 # Configure logging
@@ -44,23 +60,68 @@ def setup_logging(verbose: bool = False):
 logger = logging.getLogger(__name__)
 
 
+def build_serpapi_service() -> SerpApiService:
+    """Create a SerpAPI client backed by the shared response cache and credit ledger"""
+    return SerpApiService(
+        api_key=Config.SERPAPI_KEY,
+        cache=SqliteCache(Config.CACHE_DB, SERP_CACHE_TABLE),
+        cache_ttl=Config.SERP_CACHE_TTL,
+        ledger=CreditLedger(store=SqliteCache(Config.CACHE_DB, LEDGER_TABLE)),
+        retry=get_shared_retry_policy(Config),
+        session=get_shared_http_session(Config)
+    )
+
+
+# Timers recorded per keyword by MarketScanner.scan_keyword, in pipeline order
+SCAN_STAGES = ('stage.translate', 'stage.volumes', 'stage.serp', 'stage.quality', 'stage.scoring', 'stage.store')
+
+
 class MarketScanner:
     """Main scanner orchestrator"""
     
     def __init__(self):
         """Initialize all services"""
-        self.translator = TranslationService()
-        self.search_volume = SearchVolumeService(timeframe=Config.TRENDS_TIMEFRAME)
+        # One limiter for every service so budgets are shared per upstream host
+        self.rate_limiter = get_shared_rate_limiter(Config)
+        self.metrics = get_shared_metrics()
+        # One retry policy too, so a failing upstream trips a single circuit breaker
+        self.retry = get_shared_retry_policy(Config)
+        # And one pooled keep-alive session for SerpAPI, Google and competitor pages
+        self.http = get_shared_http_session(Config)
+        
+        self.translator = TranslationService(
+            rate_limiter=self.rate_limiter,
+            cache=SqliteCache(Config.CACHE_DB, TRANSLATION_CACHE_TABLE),
+            chunk_size=Config.TRANSLATE_CHUNK_SIZE
+        )
+        self.search_volume = SearchVolumeService(
+            timeframe=Config.TRENDS_TIMEFRAME,
+            rate_limiter=self.rate_limiter,
+            cache=SqliteCache(Config.CACHE_DB, TRENDS_CACHE_TABLE),
+            cache_ttl=Config.TRENDS_CACHE_TTL,
+            batching=Config.TRENDS_BATCHING,
+            anchor_terms=Config.TRENDS_ANCHOR_TERMS,
+            anchor_score=Config.TRENDS_ANCHOR_SCORES,
+            retry=self.retry
+        )
         
         # Try SerpAPI first, fall back to free scraper
-        self.serpapi = SerpApiService(api_key=Config.SERPAPI_KEY)
-        self.serp_scraper = SerpScraper(rate_limit=Config.SERP_RATE_LIMIT)
+        self.serpapi = build_serpapi_service()
+        self.serp_scraper = SerpScraper(
+            rate_limit=Config.SERP_RATE_LIMIT,
+            rate_limiter=self.rate_limiter,
+            retry=self.retry,
+            session=self.http
+        )
         self.use_serpapi = Config.USE_SERPAPI and self.serpapi.enabled
+        # Past a planned credit ceiling, searches go to the free scraper unless the plan says stop
+        self.scrape_over_budget = True
+        self.account = {}
         
         if self.use_serpapi:
             logger.info("🚀 Using SerpAPI for reliable SERP data")
             # Show account info
-            account = self.serpapi.get_account_info()
+            self.account = account = self.serpapi.get_account_info()
             if 'plan' in account:
                 logger.info(
                     f"   Plan: {account['plan']} | "
@@ -69,9 +130,20 @@ class MarketScanner:
         else:
             logger.info("🔧 Using free scraper (SerpAPI not configured)")
         
-        self.quality_analyzer = QualityAnalyzer(timeout=Config.REQUEST_TIMEOUT)
+        self.quality_analyzer = QualityAnalyzer(
+            timeout=Config.REQUEST_TIMEOUT,
+            rate_limiter=self.rate_limiter,
+            max_concurrency=Config.QUALITY_MAX_CONCURRENCY,
+            per_domain_concurrency=Config.QUALITY_PER_DOMAIN_CONCURRENCY,
+            deadline=Config.QUALITY_DEADLINE,
+            max_parse_chars=Config.QUALITY_MAX_PARSE_CHARS,
+            max_body_bytes=Config.QUALITY_MAX_BODY_BYTES,
+            cache=get_shared_quality_cache(Config),
+            session=self.http
+        )
         self.gap_scorer = GapScorer()
         self.markdown_gen = MarkdownGenerator(output_dir=Config.RESULTS_DIR)
+        self.results_store = open_results_store(Config.RESULTS_DB, Config.STORE_RESULTS)
     
     def scan_keyword(self, keyword: str) -> GapAnalysis:
         """
@@ -85,37 +157,39 @@ class MarketScanner:
         """
         logger.info(f"📊 Scanning: {keyword}")
         
+        timer = self.metrics.timer
+        
         # Step 1: Translate to Portuguese
-        pt_keyword = self.translator.translate_to_portuguese(keyword)
+        with timer('stage.translate'):
+            pt_keyword = self.translator.translate_to_portuguese(keyword)
         logger.info(f"   Translated: {keyword} → {pt_keyword}")
         
         # Step 2: Get search volumes (interest scores)
         logger.info("   Fetching search volumes...")
-        volumes = self.search_volume.compare_markets(keyword, pt_keyword)
+        with timer('stage.volumes'):
+            volumes = self.search_volume.compare_markets(keyword, pt_keyword)
         us_volume = volumes['US']
         br_volume = volumes['BR']
         
         # Step 3: Get top URLs for both markets
         logger.info("   Fetching top URLs...")
-        if self.use_serpapi:
-            urls = self.serpapi.get_urls_for_both_markets(keyword, pt_keyword, top_n=Config.TOP_N_RESULTS)
-        else:
-            urls = self.serp_scraper.get_urls_for_both_markets(keyword, pt_keyword, top_n=Config.TOP_N_RESULTS)
-        
-        us_urls = urls['US']
-        br_urls = urls['BR']
+        with timer('stage.serp'):
+            us_urls = self._top_urls(keyword, 'US')
+            br_urls = self._top_urls(pt_keyword, 'BR')
         
         # Step 4: Analyze BR competitor quality
         logger.info("   Analyzing BR competitors...")
-        br_analysis = self.quality_analyzer.analyze_competitors(br_urls)
+        with timer('stage.quality'):
+            br_analysis = self.quality_analyzer.analyze_competitors(br_urls)
         br_avg_quality = br_analysis['average_quality']
         
         # Step 5: Calculate gap score
-        gap_score = self.gap_scorer.calculate_gap_score(
-            us_volume_score=us_volume,
-            br_volume_score=br_volume,
-            br_avg_quality=br_avg_quality
-        )
+        with timer('stage.scoring'):
+            gap_score = self.gap_scorer.calculate_gap_score(
+                us_volume_score=us_volume,
+                br_volume_score=br_volume,
+                br_avg_quality=br_avg_quality
+            )
         
         # Create result
         result = GapAnalysis(
@@ -126,44 +200,191 @@ class MarketScanner:
             us_top_urls=us_urls,
             br_top_urls=br_urls,
             br_avg_quality=br_avg_quality,
-            gap_score=gap_score
+            gap_score=gap_score,
+            br_competitors=[CompetitorAnalysis.from_metrics(m) for m in br_analysis['analyses']]
         )
         
         # Log insights
         insights = self.gap_scorer.get_insights(us_volume, br_volume, br_avg_quality, gap_score)
         logger.info(f"   {insights}\n")
         
+        with timer('stage.store'):
+            self._store(result)
+        self.metrics.incr('keywords.scanned')
         return result
     
-    def scan_keywords(self, keywords: List[str]) -> List[GapAnalysis]:
+    def _top_urls(self, keyword: str, geo: str) -> List[str]:
+        """
+        Top URLs from SerpAPI, or the free scraper when SerpAPI is off or its credit ceiling is reached
+        
+        Raises:
+            CreditCeilingReached: Ceiling reached and the plan says stop rather than scrape
+        """
+        if self.use_serpapi:
+            try:
+                return self.serpapi.get_top_urls(keyword, geo, top_n=Config.TOP_N_RESULTS)
+            except CreditCeilingReached:
+                if not self.scrape_over_budget:
+                    raise
+                self.metrics.incr('serp.scraper_fallback')
+                logger.info(f"   SerpAPI credit ceiling reached, scraping '{keyword}' in {geo}")
+        return self.serp_scraper.get_top_urls(keyword, geo, top_n=Config.TOP_N_RESULTS)
+    
+    def plan(self, keywords: List[str], max_credits: int = 0, min_us_interest: int = 0,
+             over_budget: str = 'scrape') -> ScanPlan:
+        """
+        Forecast a batch against the SerpAPI credit ceiling and arm the ceiling for the scan
+        
+        Args:
+            keywords: English keywords
+            max_credits: Paid searches allowed this run (0 = credits left on the plan)
+            min_us_interest: Keywords with a lower US interest score are skipped
+            over_budget: 'scrape' or 'stop' for searches past the ceiling
+        
+        Returns:
+            ScanPlan; scan plan.keywords in that order
+        """
+        planner = BudgetPlanner(
+            search_volume=self.search_volume,
+            translator=self.translator,
+            serpapi=self.serpapi if self.use_serpapi else None,
+            max_credits=max_credits,
+            min_us_interest=min_us_interest,
+            over_budget=over_budget,
+            top_n=Config.TOP_N_RESULTS,
+            account=self.account
+        )
+        plan = planner.plan(keywords)
+        if plan.credits_available is not None:
+            self.serpapi.budget = CreditBudget(plan.credits_available)
+        self.scrape_over_budget = over_budget == 'scrape'
+        return plan
+    
+    def close(self):
+        """Close the results store so its file lock and WAL are released"""
+        if self.results_store is not None:
+            self.results_store.close()
+            self.results_store = None
+    
+    def _store(self, result: GapAnalysis):
+        """Record a result in the scan history (a storage error never fails the scan)"""
+        if self.results_store is None:
+            return
+        try:
+            self.results_store.add_gap_result(result)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not store result for '{result.english_keyword}': {e}")
+    
+    def prefetch(self, keywords: List[str]):
+        """
+        Translate and fetch search volumes for many keywords in batched requests
+        
+        Results land in the translation memory and Trends cache, so the
+        following scan_keyword calls are served without touching the network.
+        
+        Args:
+            keywords: English keywords
+        """
+        if len(keywords) < 2:
+            return
+        
+        try:
+            translations = self.translator.translate_batch(keywords)
+            if self.search_volume.batching:
+                pairs = [(kw, translations[kw]) for kw in keywords]
+                logger.info(f"📦 Prefetching search volumes for {len(pairs)} keywords...")
+                self.search_volume.compare_markets_batch(pairs)
+        except Exception as e:
+            logger.warning(f"Prefetch failed, falling back to per-keyword lookups: {e}")
+    
+    def _prefetched(self, keywords: Iterable[str]) -> Iterator[str]:
+        """Yield keywords, prefetching translations and volumes one chunk ahead of the scan"""
+        chunk = []
+        for keyword in keywords:
+            chunk.append(keyword)
+            if len(chunk) >= Config.TRENDS_PREFETCH_CHUNK:
+                self.prefetch(chunk)
+                yield from chunk
+                chunk = []
+        if chunk:
+            self.prefetch(chunk)
+            yield from chunk
+    
+    def iter_scan_keywords(self, keywords: Iterable[str], workers: int = 1) -> Iterator[GapAnalysis]:
+        """
+        Scan keywords across a bounded worker pool, yielding results in input order
+        
+        Failed keywords are logged and skipped, so one bad keyword never aborts the batch.
+        Per-upstream rate limits are enforced inside the services and hold across workers.
+        
+        Args:
+            keywords: English keywords
+            workers: Number of keywords scanned concurrently
+            
+        Yields:
+            GapAnalysis results, in the same order as the input keywords
+        """
+        for keyword, result, error in iter_ordered(self.scan_keyword, self._prefetched(keywords), workers=workers):
+            if error is not None:
+                logger.error(f"❌ Failed to scan '{keyword}': {error}")
+                self.metrics.incr('keywords.failed')
+                continue
+            yield result
+    
+    def scan_keywords(
+        self,
+        keywords: List[str],
+        workers: int = 1,
+        on_result: Optional[Callable[[GapAnalysis], None]] = None,
+        collect: bool = True
+    ) -> List[GapAnalysis]:
         """
         Scan multiple keywords
         
         Args:
             keywords: List of English keywords
+            workers: Number of keywords scanned concurrently (default: sequential)
+            on_result: Called with each result as soon as it completes
+            collect: Keep results in the returned list (False for streaming runs)
             
         Returns:
-            List of GapAnalysis results
+            List of GapAnalysis results (empty when collect is False)
         """
         results = []
+        completed = 0
         total = len(keywords)
         
-        logger.info(f"🚀 Starting scan of {total} keywords...\n")
+        logger.info(f"🚀 Starting scan of {total} keywords with {workers} worker(s)...\n")
         
-        for i, keyword in enumerate(keywords, 1):
-            try:
-                logger.info(f"[{i}/{total}] Processing: {keyword}")
-                result = self.scan_keyword(keyword)
+        for result in self.iter_scan_keywords(keywords, workers=workers):
+            completed += 1
+            logger.info(f"[{completed}/{total}] Completed: {result.english_keyword}")
+            if on_result is not None:
+                on_result(result)
+            if collect:
                 results.append(result)
-            except Exception as e:
-                logger.error(f"❌ Failed to scan '{keyword}': {e}")
-                continue
         
-        logger.info(f"\n✅ Scan complete! Analyzed {len(results)}/{total} keywords successfully")
+        logger.info(f"\n✅ Scan complete! Analyzed {completed}/{total} keywords successfully")
+        if self.use_serpapi:
+            logger.info(f"💳 {self.serpapi.ledger.summary()}")
+            if self.serpapi.budget is not None:
+                logger.info(f"💳 Credit ceiling: {self.serpapi.budget.spent}/{self.serpapi.budget.ceiling} used")
+        if self.quality_analyzer.cache is not None:
+            logger.info(
+                f"🗂️  {self.quality_analyzer.cache.summary()}, "
+                f"{self.quality_analyzer.not_modified} revalidated unchanged (304)"
+            )
         
         return results
 
 
+def open_scanner() -> MarketScanner:
+    """Create a MarketScanner that is closed when the current command ends, even on errors"""
+    scanner = MarketScanner()
+    click.get_current_context().call_on_close(scanner.close)
+    return scanner
+
+
 @click.group()
 def cli():
     """Market Arbitrage Scanner - Find utility tool market gaps"""
@@ -177,8 +398,11 @@ def scan(keyword: str, verbose: bool):
     """Scan a single keyword"""
     setup_logging(verbose)
     
-    scanner = MarketScanner()
-    result = scanner.scan_keyword(keyword)
+    scanner = open_scanner()
+    try:
+        result = scanner.scan_keyword(keyword)
+    except UpstreamError as e:
+        raise click.ClickException(f"Could not scan '{keyword}': {e}")
     
     # Print result
     click.echo(f"\n{'='*80}")
@@ -195,11 +419,35 @@ def scan(keyword: str, verbose: bool):
 @cli.command()
 @click.argument('input_file', type=click.Path(exists=True))
 @click.option('-o', '--output', help='Output filename (optional)')
+@click.option('-w', '--workers', type=click.IntRange(min=1), default=Config.BATCH_WORKERS,
+              show_default=True, help='Number of keywords to scan concurrently')
+@click.option('--resume', is_flag=True, help='Skip keywords already in the checkpoint journal')
+@click.option('--fresh', is_flag=True,
+              help='Archive an existing checkpoint journal and start over')
+@click.option('--journal', type=click.Path(dir_okay=False),
+              help='Checkpoint journal path (default: data/checkpoints/<input name>-<path hash>.jsonl)')
+@click.option('--stream', is_flag=True,
+              help='Write rows as keywords complete and keep only the top results in memory')
+@click.option('--profile', is_flag=True, help='Add a per-stage timing breakdown to the report footer')
+@click.option('--dedupe', is_flag=True,
+              help='Scan one keyword per group of near-duplicates and copy its result to the others')
+@click.option('--max-credits', type=click.IntRange(min=0), default=Config.SERP_CREDIT_CEILING, show_default=True,
+              help='SerpAPI credits this run may spend (0 = no ceiling; a planned run still stops at the credits left)')
+@click.option('--min-us-interest', type=click.IntRange(0, 100), default=Config.MIN_US_INTEREST, show_default=True,
+              help='Skip keywords whose US Trends interest is below this, before paying for SERP')
+@click.option('--over-budget', type=click.Choice(OVER_BUDGET_MODES), default=Config.SERP_OVER_BUDGET,
+              show_default=True, help='Past the credit ceiling: use the free scraper, or stop and leave keywords for later')
+@click.option('--dry-run', is_flag=True, help='Print the budget plan and exit without scanning')
 @click.option('-v', '--verbose', is_flag=True, help='Enable verbose logging')
-def batch(input_file: str, output: str, verbose: bool):
+def batch(input_file: str, output: str, workers: int, resume: bool, fresh: bool, journal: str,
+          stream: bool, profile: bool, dedupe: bool, max_credits: int, min_us_interest: int,
+          over_budget: str, dry_run: bool, verbose: bool):
     """Scan keywords from a text file (one per line)"""
     setup_logging(verbose)
     
+    if resume and fresh:
+        raise click.UsageError("--resume and --fresh cannot be used together")
+    
     # Read keywords
     with open(input_file, 'r', encoding='utf-8') as f:
         keywords = [line.strip() for line in f if line.strip() and not line.startswith('#')]
@@ -210,24 +458,323 @@ def batch(input_file: str, output: str, verbose: bool):
     
     click.echo(f"📄 Loaded {len(keywords)} keywords from {input_file}\n")
     
+    # Every completed keyword is journaled so a crashed run can be resumed
+    journal_path = journal or default_journal_path(Config.CHECKPOINT_DIR, input_file)
+    checkpoint = CheckpointJournal(journal_path)
+    
+    if not resume and not fresh and not dry_run and checkpoint.exists():
+        # Never throw away progress implicitly: that is what the journal is for
+        raise click.ClickException(
+            f"Checkpoint journal {journal_path} already has results. "
+            "Use --resume to continue that run or --fresh to archive it and start over."
+        )
+    
+    done = set()
+    if resume:
+        done = checkpoint.completed_keywords() & set(keywords)
+        keywords = [kw for kw in keywords if kw not in done]
+        click.echo(f"♻️  Resuming from {journal_path}: {len(done)} done, {len(keywords)} remaining\n")
+    
+    duplicates: Dict[str, Tuple[str, ...]] = {}
+    if dedupe:
+        clusters = cluster_keywords(keywords, threshold=Config.DEDUPE_THRESHOLD)
+        duplicates = {cluster.representative: cluster.members for cluster in clusters if cluster.members}
+        click.echo(
+            f"🧹 Collapsed {len(keywords)} keywords into {len(clusters)} scans "
+            f"({len(keywords) - len(clusters)} near-duplicates share a result)\n"
+        )
+        keywords = [cluster.representative for cluster in clusters]
+    
+    scanner = open_scanner()
+    
+    # With a credit ceiling or interest floor, order by US interest and arm the ceiling
+    # before any paid search; otherwise scan in input order without the planning lookups
+    if max_credits or min_us_interest or dry_run:
+        plan = scanner.plan(keywords, max_credits=max_credits, min_us_interest=min_us_interest, over_budget=over_budget)
+        click.echo('\n'.join(plan.summary()) + '\n')
+        if dry_run:
+            return
+        keywords = plan.keywords
+    
+    if not resume:
+        checkpoint.rotate()
+    
+    if stream:
+        _batch_streaming(scanner, keywords, done, checkpoint, output, workers, profile, duplicates)
+        return
+    
     # Scan
-    scanner = MarketScanner()
-    results = scanner.scan_keywords(keywords)
+    results = [r for r in checkpoint.load() if r.english_keyword in done] if done else []
+    
+    def record(result: GapAnalysis):
+        checkpoint.append(result)
+        results.append(result)
+    
+    scanner.scan_keywords(keywords, workers=workers, on_result=_with_duplicates(record, duplicates), collect=False)
     
     if not results:
         click.echo("❌ No results to report")
         return
     
+    _write_report(scanner, results, output, profile)
+
+
+def _write_report(scanner: MarketScanner, results: List[GapAnalysis], output: Optional[str], profile: bool = False):
+    """Write the markdown report and run metrics for finished results, and print the summary"""
     # Convert to dicts for markdown generator
-    results_dicts = [asdict(r) for r in results]
+    results_dicts = [r.to_row() for r in results]
     
     # Generate report
-    report_path = scanner.markdown_gen.generate_report(results_dicts, filename=output)
+    report_path = scanner.markdown_gen.generate_report(
+        results_dicts, filename=output, appendix=_profile_appendix(scanner, profile)
+    )
     
     # Print summary
     scanner.markdown_gen.print_summary(results_dicts)
     
     click.echo(f"\n📊 Full report saved to: {report_path}")
+    _write_metrics(scanner, report_path)
+
+
+def _with_duplicates(
+    on_result: Callable[[GapAnalysis], None],
+    duplicates: Dict[str, Tuple[str, ...]]
+) -> Callable[[GapAnalysis], None]:
+    """
+    Wrap a result callback so each scanned result is also delivered for its near-duplicates
+    
+    Args:
+        on_result: Callback receiving every result
+        duplicates: Scanned keyword -> near-duplicate keywords sharing its result
+    
+    Returns:
+        Callback to pass to scan_keywords
+    """
+    def deliver(result: GapAnalysis):
+        on_result(result)
+        for member in duplicates.get(result.english_keyword, ()):
+            on_result(replace(result, english_keyword=member, duplicate_of=result.english_keyword))
+    
+    return deliver
+
+
+def _profile_appendix(scanner: MarketScanner, profile: bool) -> Optional[str]:
+    """Per-stage breakdown for the report footer when --profile is set"""
+    return scanner.metrics.stage_breakdown(SCAN_STAGES) if profile else None
+
+
+def _write_metrics(scanner: MarketScanner, report_path: str):
+    """Write the run's metrics next to the report (<report>.metrics.json)"""
+    metrics_path = scanner.metrics.write_json(os.path.splitext(report_path)[0] + '.metrics.json')
+    click.echo(f"⏱️  Run metrics saved to: {metrics_path}")
+
+
+def _batch_streaming(
+    scanner: MarketScanner,
+    keywords: List[str],
+    resumed: Set[str],
+    checkpoint: CheckpointJournal,
+    output: Optional[str],
+    workers: int,
+    profile: bool = False,
+    duplicates: Optional[Dict[str, Tuple[str, ...]]] = None
+):
+    """
+    Run a batch scan that writes the report incrementally
+    
+    Journaled results for resumed keywords are streamed from the journal
+    one record at a time (first record per keyword), so memory stays
+    constant on resumed runs too. Results are copied to near-duplicates
+    listed in duplicates as they complete.
+    """
+    report = StreamingReport(scanner.markdown_gen, filename=output)
+    pending = set(resumed)
+    for result in checkpoint.iter_results():
+        if result.english_keyword in pending:
+            pending.discard(result.english_keyword)
+            report.add(result.to_row())
+    
+    def record(result: GapAnalysis):
+        checkpoint.append(result)
+        report.add(result.to_row())
+    
+    scanner.scan_keywords(keywords, workers=workers, on_result=_with_duplicates(record, duplicates or {}), collect=False)
+    report_path = report.close(appendix=_profile_appendix(scanner, profile))
+    
+    if not report_path:
+        click.echo("❌ No results to report")
+        return
+    
+    scanner.markdown_gen.print_top(report.top_results(), total=report.count)
+    click.echo(f"\n📊 Full report saved to: {report_path}")
+    _write_metrics(scanner, report_path)
+
+
+@cli.command()
+@click.argument('seeds', nargs=-1)
+@click.option('-f', '--from-file', 'seed_file', type=click.Path(exists=True, dir_okay=False),
+              help='Read seed keywords from a file (one per line)')
+@click.option('--depth', type=click.IntRange(min=0), default=Config.DISCOVERY_MAX_DEPTH, show_default=True,
+              help='Expansion levels below the seeds')
+@click.option('--max-keywords', type=click.IntRange(min=1), default=Config.DISCOVERY_MAX_KEYWORDS, show_default=True,
+              help='Stop after this many distinct keywords (seeds included)')
+@click.option('--max-requests', type=click.IntRange(min=0), default=Config.DISCOVERY_MAX_REQUESTS, show_default=True,
+              help='Uncached Trends requests allowed (cached expansions are free)')
+@click.option('--no-rising', is_flag=True, help='Follow only top related queries, not rising ones')
+@click.option('--save', type=click.Path(dir_okay=False), help='Write the discovered keywords to this file')
+@click.option('--scan/--no-scan', default=True, show_default=True, help='Scan the discovered keywords')
+@click.option('-o', '--output', help='Report filename (optional)')
+@click.option('-w', '--workers', type=click.IntRange(min=1), default=Config.BATCH_WORKERS,
+              help='Keywords scanned concurrently')
+@click.option('-v', '--verbose', is_flag=True, help='Enable verbose logging')
+def discover(seeds, seed_file: Optional[str], depth: int, max_keywords: int, max_requests: int, no_rising: bool,
+             save: Optional[str], scan: bool, output: Optional[str], workers: int, verbose: bool):
+    """Expand seed keywords through Google Trends related queries, then scan them"""
+    setup_logging(verbose)
+    
+    seeds = [s.strip() for s in seeds if s.strip()]
+    if seed_file:
+        with open(seed_file, 'r', encoding='utf-8') as f:
+            seeds += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not seeds:
+        raise click.UsageError("Give seed keywords as arguments or with --from-file")
+    
+    scanner = open_scanner()
+    discovery = KeywordDiscovery(
+        scanner.search_volume,
+        geo='US',
+        cache=SqliteCache(Config.CACHE_DB, RELATED_CACHE_TABLE),
+        cache_ttl=Config.TRENDS_CACHE_TTL,
+        max_depth=depth,
+        max_keywords=max_keywords,
+        max_requests=max_requests,
+        per_keyword=Config.DISCOVERY_PER_KEYWORD,
+        include_rising=not no_rising
+    )
+    
+    click.echo(f"🧭 Expanding {len(seeds)} seed(s), depth {depth}...")
+    found = list(discovery.discover(seeds))
+    by_depth = Counter(item.depth for item in found)
+    click.echo(
+        f"🧭 {len(found)} distinct keywords "
+        f"({', '.join(f'depth {d}: {n}' for d, n in sorted(by_depth.items()))}; "
+        f"{discovery.requests} Trends requests, {discovery.cache_hits} cached expansions)\n"
+    )
+    
+    if save:
+        with open(save, 'w', encoding='utf-8') as f:
+            f.write(f"# Discovered from {len(seeds)} seed(s), depth {depth}\n")
+            f.writelines(f"{item.keyword}\n" for item in found)
+        click.echo(f"💾 Keywords saved to: {save}")
+    
+    if not scan:
+        for item in found:
+            origin = f"{item.kind} of '{item.parent}'" if item.parent else 'seed'
+            click.echo(f"  [{item.depth}] {item.keyword}  ({origin})")
+        return
+    
+    results = scanner.scan_keywords([item.keyword for item in found], workers=workers)
+    if not results:
+        click.echo("❌ No results to report")
+        return
+    _write_report(scanner, results, output)
+
+
+@cli.command()
+@click.argument('source', type=click.Path(exists=True, dir_okay=False))
+@click.option('--us-demand', type=float, default=DEFAULT_WEIGHTS['us_demand'], show_default=True,
+              help='Weight of US demand')
+@click.option('--br-saturation', type=float, default=DEFAULT_WEIGHTS['br_saturation'], show_default=True,
+              help='Weight of BR market saturation (inverse of BR interest)')
+@click.option('--br-quality', type=float, default=DEFAULT_WEIGHTS['br_quality'], show_default=True,
+              help='Weight of the BR competitor quality gap')
+@click.option('-o', '--output', help='Output filename (optional)')
+def rescore(source: str, us_demand: float, br_saturation: float, br_quality: float, output: str):
+    """Re-weight a finished batch without any network calls
+
+    SOURCE is a checkpoint journal (.jsonl) or the keyword file a batch was run on.
+    """
+    setup_logging(verbose=False)
+    
+    journal_path = source if source.endswith('.jsonl') else default_journal_path(Config.CHECKPOINT_DIR, source)
+    results = CheckpointJournal(journal_path).load()
+    if not results:
+        click.echo(f"❌ No journaled results in {journal_path}")
+        return
+    
+    scorer = GapScorer(weights={
+        'us_demand': us_demand,
+        'br_saturation': br_saturation,
+        'br_quality': br_quality
+    })
+    
+    start = time.perf_counter()
+    scores = scorer.score_batch(
+        [r.us_volume_score for r in results],
+        [r.br_volume_score for r in results],
+        [r.br_avg_quality for r in results]
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    results_dicts = [
+        replace(r, gap_score=float(score)).to_row()
+        for r, score in zip(results, scores['gap_score'])
+    ]
+    
+    generator = MarkdownGenerator(output_dir=Config.RESULTS_DIR)
+    report_path = generator.generate_report(results_dicts, filename=output)
+    generator.print_summary(results_dicts)
+    
+    click.echo(
+        f"\n⚖️  Rescored {len(results)} keywords in {elapsed_ms:.1f} ms "
+        f"(US demand {us_demand}, BR saturation {br_saturation}, BR quality {br_quality})"
+    )
+    click.echo(f"📊 Full report saved to: {report_path}")
+
+
+@cli.command()
+@click.argument('keyword', required=False)
+@click.option('-n', '--limit', type=click.IntRange(min=1), default=20, show_default=True,
+              help='Keywords listed when no KEYWORD is given')
+@click.option('--export', 'export_dir', type=click.Path(file_okay=False),
+              help='Also export every table as Parquet partitioned by scan date')
+def history(keyword: Optional[str], limit: int, export_dir: Optional[str]):
+    """Show stored scan history
+
+    With KEYWORD, list every recorded scan of it; otherwise list the best
+    keywords by their latest gap score.
+    """
+    setup_logging(verbose=False)
+    
+    if not os.path.exists(Config.RESULTS_DB):
+        click.echo(f"❌ No scan history yet ({Config.RESULTS_DB})")
+        return
+    store = open_results_store(Config.RESULTS_DB)
+    if store is None:
+        click.echo(f"❌ Could not open {Config.RESULTS_DB} (is duckdb installed and no scan running?)")
+        return
+    
+    try:
+        if keyword:
+            rows = store.keyword_history(keyword)
+            if not rows:
+                click.echo(f"No recorded scans of '{keyword}'")
+            else:
+                click.echo(f"\n📈 History for '{keyword}':\n")
+                click.echo(f"   {'Scanned':<20} {'US':>4} {'BR':>4} {'Quality':>8} {'Gap':>6}")
+                for scanned_at, us, br, quality, gap in rows:
+                    click.echo(f"   {scanned_at:%Y-%m-%d %H:%M}     {us:>4} {br:>4} {quality:>8.1f} {gap:>6.1f}")
+        else:
+            rows = store.latest_top(limit)
+            click.echo(f"\n🏆 Top {len(rows)} keywords by latest gap score:\n")
+            for i, (name, gap, scanned_at, scans) in enumerate(rows, 1):
+                click.echo(f"   {i:2}. {name:<40} {gap:>6.1f}  (last {scanned_at:%Y-%m-%d}, {scans} scan(s))")
+        
+        if export_dir:
+            paths = store.export_parquet(export_dir)
+            click.echo(f"\n📦 Exported {len(paths)} tables to {export_dir}")
+    finally:
+        store.close()
 
 
 @cli.command()
@@ -257,7 +804,7 @@ def interactive():
     click.echo(f"\n📊 Scanning {len(keywords)} keywords...\n")
     
     # Scan
-    scanner = MarketScanner()
+    scanner = open_scanner()
     results = scanner.scan_keywords(keywords)
     
     if not results:
@@ -265,7 +812,7 @@ def interactive():
         return
     
     # Convert to dicts
-    results_dicts = [asdict(r) for r in results]
+    results_dicts = [r.to_row() for r in results]
     
     # Generate report
     report_path = scanner.markdown_gen.generate_report(results_dicts)
@@ -288,7 +835,7 @@ def status():
     """Check SerpAPI status and remaining credits"""
     setup_logging(verbose=False)
     
-    serpapi = SerpApiService()
+    serpapi = build_serpapi_service()
     
     if not serpapi.enabled:
         click.echo("❌ SerpAPI is not configured")
@@ -316,8 +863,21 @@ def status():
     
     remaining = account.get('total_searches_left', 0)
     if remaining:
-        keywords_remaining = remaining // 2
-        click.echo(f"\n💡 You can scan ~{keywords_remaining} more keywords this month")
+        ceiling = min(remaining, Config.SERP_CREDIT_CEILING) if Config.SERP_CREDIT_CEILING else remaining
+        click.echo(f"\n💡 A batch may spend {ceiling} credits: ~{ceiling // 2} uncached keywords (cached searches are free)")
+        click.echo("   Run `batch --dry-run` for a forecast that counts cache hits")
+    
+    history = serpapi.ledger.history_totals()
+    click.echo(f"\n💾 Response Cache:")
+    click.echo(f"   Cached Searches: {len(serpapi.cache)}")
+    click.echo(f"   Runs Recorded: {history['runs']}")
+    click.echo(f"   Paid Searches: {history['paid_calls']}")
+    click.echo(f"   Credits Avoided: {history['cache_hits']}")
+    click.echo(f"   Hit Rate: {history['hit_rate']:.0%}")
+    quality_cache = get_shared_quality_cache(Config)
+    click.echo(f"   Cached Competitor Pages: {quality_cache.count('url')}")
+    if quality_cache.domain_fallback:
+        click.echo(f"   Cached Competitor Hosts: {quality_cache.count('host')}")
     
     click.echo(f"\n🔗 Manage your account: https://serpapi.com/account")
 
@@ -0,0 +1,200 @@
+"""
+Lightweight run instrumentation
+Per-stage timers, counters and latency histograms, shared by every service in a run
+"""
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (constant memory however many observations)"""
+    
+    def __init__(self, bounds_ms: Sequence[float] = BUCKET_BOUNDS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.buckets = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def observe(self, seconds: float):
+        """Record one duration"""
+        self.buckets[bisect.bisect_left(self.bounds_ms, seconds * 1000)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+    
+    def percentile(self, q: float) -> float:
+        """
+        Estimate a percentile from the buckets
+        
+        Args:
+            q: Percentile, 0-100
+        
+        Returns:
+            Upper bound of the bucket holding the percentile, in milliseconds
+            (the observed maximum for the open-ended bucket)
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                bound = self.bounds_ms[i] if i < len(self.bounds_ms) else self.max * 1000
+                return min(bound, self.max * 1000)
+        return self.max * 1000
+    
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'total_s': round(self.total, 4),
+            'mean_ms': round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50), 2),
+            'p99_ms': round(self.percentile(99), 2),
+            'max_ms': round(self.max * 1000, 2),
+            'buckets_ms': {
+                (f'<={bound}' if i < len(self.bounds_ms) else f'>{self.bounds_ms[-1]}'): n
+                for i, (bound, n) in enumerate(zip(self.bounds_ms + (None,), self.buckets)) if n
+            },
+        }
+
+
+class Metrics:
+    """Thread-safe registry of named timers (histograms) and counters"""
+    
+    def __init__(self):
+        self._timers: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+    
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """
+        Time a block and record it under name
+        
+        Example:
+            with metrics.timer('serp'):
+                urls = serpapi.get_top_urls(...)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+    
+    def observe(self, name: str, seconds: float):
+        """Record a duration under a timer name"""
+        with self._lock:
+            histogram = self._timers.get(name)
+            if histogram is None:
+                histogram = self._timers[name] = Histogram()
+            histogram.observe(seconds)
+    
+    def incr(self, name: str, n: int = 1):
+        """Add to a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+    
+    def count(self, name: str) -> int:
+        """Current value of a counter"""
+        with self._lock:
+            return self._counters.get(name, 0)
+    
+    def reset(self):
+        """Drop everything recorded so far"""
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+            self.started = time.time()
+    
+    def snapshot(self) -> dict:
+        """
+        Run totals
+        
+        Returns:
+            Dict with wall time, per-timer histograms and sorted counters
+        """
+        with self._lock:
+            return {
+                'wall_time_s': round(time.time() - self.started, 3),
+                'timers': {name: h.to_dict() for name, h in sorted(self._timers.items())},
+                'counters': dict(sorted(self._counters.items())),
+            }
+    
+    def write_json(self, path: str) -> str:
+        """
+        Write snapshot() to a JSON file
+        
+        Returns:
+            The path written
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
+    
+    def stage_breakdown(self, stages: Sequence[str]) -> str:
+        """
+        Markdown table of where the time went, one row per stage timer
+        
+        Args:
+            stages: Timer names in pipeline order
+        
+        Returns:
+            Markdown section (empty string if no stage was timed)
+        """
+        snapshot = self.snapshot()
+        timers = snapshot['timers']
+        rows = [(stage, timers[stage]) for stage in stages if stage in timers]
+        if not rows:
+            return ''
+        
+        total = sum(t['total_s'] for _, t in rows) or 1.0
+        lines = [
+            "\n## ⏱️ Stage Breakdown\n",
+            "| Stage | Calls | Total (s) | Share | Mean (ms) | p50 (ms) | p99 (ms) |",
+            "|-------|-------|-----------|-------|-----------|----------|----------|",
+        ]
+        for stage, t in rows:
+            lines.append(
+                f"| {stage.rsplit('.', 1)[-1]} | {t['count']} | {t['total_s']:.2f} | {t['total_s'] / total:.0%} | "
+                f"{t['mean_ms']:.1f} | {t['p50_ms']:.0f} | {t['p99_ms']:.0f} |"
+            )
+        
+        waits = [(name.split('.', 1)[1], t['total_s']) for name, t in timers.items() if name.startswith('rate_wait.')]
+        if waits:
+            lines.append("\n**Rate-limit waits (s):** " + ", ".join(
+                f"{host}: {seconds:.2f}" for host, seconds in sorted(waits, key=lambda w: -w[1])
+            ))
+        
+        counters = _grouped_counters(snapshot['counters'])
+        if counters:
+            lines.append("\n**Counters:** " + ", ".join(f"{name}: {value}" for name, value in counters))
+        return '\n'.join(lines) + '\n'
+
+
+def _grouped_counters(counters: Dict[str, int]) -> List[tuple]:
+    """Counters in display order (network calls first, then caches, then the rest)"""
+    order = {'network': 0, 'cache': 1}
+    return sorted(counters.items(), key=lambda item: (order.get(item[0].split('.')[0], 2), item[0]))
+
+
+_shared_metrics: Optional[Metrics] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_metrics() -> Metrics:
+    """Get the process-wide metrics registry"""
+    global _shared_metrics
+    with _shared_lock:
+        if _shared_metrics is None:
+            _shared_metrics = Metrics()
+        return _shared_metrics
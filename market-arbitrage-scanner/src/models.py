@@ -1,23 +1,56 @@
 """
 Data models for Market Arbitrage Scanner
 """
+import sys
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Iterable, Optional, Tuple
 from datetime import datetime
 
+# Result models are slotted (no per-instance __dict__) where the interpreter supports it
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
-class SearchResult:
+
+def intern_market(market: str) -> str:
+    """Upper-case and intern a market code so every result shares one 'US'/'BR' string"""
+    return sys.intern(market.upper())
+
+
+def _freeze(instance, name: str, value: Iterable):
+    """Store a sequence field as a tuple on a frozen dataclass"""
+    if not isinstance(value, tuple):
+        object.__setattr__(instance, name, tuple(value))
+
+
+class _Row:
+    """Shallow dict view of a dataclass, used by the report and storage writers"""
+    __slots__ = ()
+    
+    def to_row(self) -> dict:
+        """
+        Field values as a dict without the deep copy done by dataclasses.asdict
+        
+        Returns:
+            Dict keyed by field name (sequences stay tuples, nested models stay objects)
+        """
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
+
+
+@dataclass(frozen=True, **_SLOTS)
+class SearchResult(_Row):
     """Search result data for a keyword in a specific market"""
     keyword: str
     market: str  # 'US' or 'BR'
     volume_score: int  # 0-100 relative score from Google Trends
-    top_urls: List[str] = field(default_factory=list)
+    top_urls: Tuple[str, ...] = ()
     timestamp: datetime = field(default_factory=datetime.now)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'market', intern_market(self.market))
+        _freeze(self, 'top_urls', self.top_urls)
 
 
-@dataclass
-class CompetitorAnalysis:
+@dataclass(frozen=True, **_SLOTS)
+class CompetitorAnalysis(_Row):
     """Quality analysis of a competitor website"""
     url: str
     quality_score: float  # 0-100
@@ -27,20 +60,65 @@ class CompetitorAnalysis:
     is_recent: bool = False  # Updated within last 2 years
     page_load_success: bool = True
     error_message: Optional[str] = None
+    
+    @classmethod
+    def from_metrics(cls, metrics: dict) -> 'CompetitorAnalysis':
+        """Build from a QualityAnalyzer.analyze_url metrics dict"""
+        return cls(
+            url=metrics['url'],
+            quality_score=metrics.get('quality_score', 0.0),
+            is_web_app=metrics.get('is_web_app', False),
+            is_responsive=metrics.get('is_responsive', False),
+            has_https=metrics.get('has_https', False),
+            is_recent=metrics.get('is_recent', False),
+            page_load_success=metrics.get('page_load_success', False)
+        )
 
 
-@dataclass
-class GapAnalysis:
-    """Complete gap analysis for a keyword pair"""
+@dataclass(frozen=True, **_SLOTS)
+class GapAnalysis(_Row):
+    """Complete gap analysis for a keyword pair (immutable; use dataclasses.replace)"""
     english_keyword: str
     brazilian_keyword: str
     us_volume_score: int  # 0-100 from Google Trends
     br_volume_score: int  # 0-100 from Google Trends
-    us_top_urls: List[str] = field(default_factory=list)
-    br_top_urls: List[str] = field(default_factory=list)
+    us_top_urls: Tuple[str, ...] = ()
+    br_top_urls: Tuple[str, ...] = ()
     br_avg_quality: float = 0.0  # Average quality of BR top 3
     gap_score: float = 0.0  # Final gap score 0-100
     timestamp: datetime = field(default_factory=datetime.now)
+    br_competitors: Tuple[CompetitorAnalysis, ...] = ()  # Per-URL BR metrics
+    duplicate_of: Optional[str] = None  # Scanned keyword this result was copied from (near-duplicate)
+    
+    def __post_init__(self):
+        # Callers may pass lists; store tuples so results can't be mutated after scoring
+        _freeze(self, 'us_top_urls', self.us_top_urls)
+        _freeze(self, 'br_top_urls', self.br_top_urls)
+        _freeze(self, 'br_competitors', self.br_competitors)
+    
+    def to_record(self) -> dict:
+        """
+        JSON-ready row for the checkpoint journal
+        
+        Returns:
+            to_row() with an ISO timestamp and competitors as dicts
+        """
+        record = self.to_row()
+        record['timestamp'] = self.timestamp.isoformat()
+        record['br_competitors'] = [c.to_row() for c in self.br_competitors]
+        return record
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'GapAnalysis':
+        """Rebuild a GapAnalysis from to_record()/asdict() output (timestamp may be an ISO string)"""
+        data = dict(data)
+        if isinstance(data.get('timestamp'), str):
+            data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+        data['br_competitors'] = [
+            c if isinstance(c, CompetitorAnalysis) else CompetitorAnalysis(**c)
+            for c in data.get('br_competitors', [])
+        ]
+        return cls(**data)
     
     def __str__(self):
         return (
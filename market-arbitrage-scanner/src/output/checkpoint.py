@@ -0,0 +1,147 @@
+"""
+Checkpoint journal for batch scans
+Appends each completed GapAnalysis to a JSONL file so crashed runs can resume
+"""
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set
+import hashlib
+import json
+import os
+import threading
+import logging
+
+from models import GapAnalysis
+
+logger = logging.getLogger(__name__)
+
+
+def default_journal_path(checkpoint_dir: str, input_file: str) -> str:
+    """
+    Journal path for an input file
+    
+    The name combines the file's stem with a hash of its absolute path, so
+    same-named keyword files in different folders get separate journals.
+    
+    Args:
+        checkpoint_dir: Directory holding journals
+        input_file: Keyword file being scanned
+    
+    Returns:
+        Journal file path
+    """
+    path = os.path.abspath(input_file)
+    digest = hashlib.sha1(path.encode('utf-8')).hexdigest()[:8]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(checkpoint_dir, f'{stem}-{digest}.jsonl')
+
+
+class CheckpointJournal:
+    """Append-only JSONL journal of completed keyword scans"""
+    
+    def __init__(self, path: str):
+        """
+        Initialize checkpoint journal
+        
+        Args:
+            path: Journal file (parent directories are created)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def exists(self) -> bool:
+        """Check whether the journal holds any records"""
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+    
+    def reset(self):
+        """Discard all records and start an empty journal"""
+        with self._lock:
+            open(self.path, 'w', encoding='utf-8').close()
+    
+    def rotate(self) -> Optional[str]:
+        """
+        Move existing records aside and start an empty journal
+        
+        Returns:
+            Path the old journal was moved to, or None if it was empty
+        """
+        with self._lock:
+            if not self.exists():
+                return None
+            root, ext = os.path.splitext(self.path)
+            archived = f"{root}.{datetime.now().strftime('%Y%m%d_%H%M%S')}{ext}"
+            os.replace(self.path, archived)
+            logger.info(f"Archived previous journal to {archived}")
+            return archived
+    
+    def append(self, result: GapAnalysis):
+        """
+        Record one completed scan, flushed to disk before returning
+        
+        Args:
+            result: Completed GapAnalysis
+        """
+        line = json.dumps(result.to_record(), ensure_ascii=False)
+        
+        with self._lock:
+            # Terminate a line left half-written by a crash so this record stays intact
+            if not self._ends_with_newline():
+                line = '\n' + line
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def _ends_with_newline(self) -> bool:
+        """Check that the journal is empty or its last line is complete"""
+        if not self.exists():
+            return True
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+    
+    def iter_results(self) -> Iterator[GapAnalysis]:
+        """
+        Stream every record in the journal, one line at a time
+        
+        A partially written last line (from a crash mid-write) is skipped.
+        
+        Yields:
+            GapAnalysis results in the order they were recorded (repeats included)
+        """
+        if not os.path.exists(self.path):
+            return
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield GapAnalysis.from_dict(json.loads(line))
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Skipping unreadable journal line {line_no} in {self.path}: {e}")
+    
+    def completed_keywords(self) -> Set[str]:
+        """
+        Keywords with at least one recorded scan
+        
+        Returns:
+            Set of English keywords (only the keywords are held in memory)
+        """
+        return {result.english_keyword for result in self.iter_results()}
+    
+    def load(self) -> List[GapAnalysis]:
+        """
+        Read every completed scan, keeping the latest record per keyword
+        
+        Returns:
+            GapAnalysis results in the order they were first recorded
+        """
+        results: Dict[str, GapAnalysis] = {}
+        for result in self.iter_results():
+            results[result.english_keyword] = result
+        
+        return list(results.values())
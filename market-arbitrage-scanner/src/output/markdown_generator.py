@@ -2,11 +2,15 @@
 Markdown report generator
 Creates formatted markdown tables with scan results
 """
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 import os
 import logging
 
+from scoring.gap_scorer import (
+    EXCELLENT_THRESHOLD, MODERATE_THRESHOLD, STRONG_THRESHOLD, WEAK_THRESHOLD, category_label
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,7 +31,8 @@ class MarkdownGenerator:
         self,
         results: List[dict],
         filename: str = None,
-        sort_by_score: bool = True
+        sort_by_score: bool = True,
+        appendix: Optional[str] = None
     ) -> str:
         """
         Generate markdown report from scan results
@@ -36,6 +41,7 @@ class MarkdownGenerator:
             results: List of GapAnalysis results (as dicts)
             filename: Optional output filename (auto-generated if None)
             sort_by_score: Sort results by gap score descending
+            appendix: Extra markdown placed before the footer (e.g. a profiling breakdown)
             
         Returns:
             Path to generated report file
@@ -56,7 +62,7 @@ class MarkdownGenerator:
         filepath = os.path.join(self.output_dir, filename)
         
         # Build markdown content
-        content = self._build_markdown(results)
+        content = self._build_markdown(results, appendix)
         
         # Write to file
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -65,25 +71,18 @@ class MarkdownGenerator:
         logger.info(f"Report saved to: {filepath}")
         return filepath
     
-    def _build_markdown(self, results: List[dict]) -> str:
+    def _build_markdown(self, results: List[dict], appendix: Optional[str] = None) -> str:
         """Build markdown content from results"""
         lines = []
         
         # Title and metadata
-        lines.append("# 🔍 Market Arbitrage Scanner - Gap Analysis Report\n")
-        lines.append(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        lines.append(f"**Total Keywords Analyzed:** {len(results)}\n")
+        lines.append(self._report_header(len(results)))
         
         # Summary statistics
         avg_gap = sum(r.get('gap_score', 0) for r in results) / len(results)
-        excellent = sum(1 for r in results if r.get('gap_score', 0) >= 80)
-        strong = sum(1 for r in results if 65 <= r.get('gap_score', 0) < 80)
+        tiers = [self._tier(r.get('gap_score', 0)) for r in results]
         
-        lines.append("## 📊 Summary\n")
-        lines.append(f"- **Average Gap Score:** {avg_gap:.1f}/100\n")
-        lines.append(f"- **Excellent Opportunities (≥80):** {excellent}\n")
-        lines.append(f"- **Strong Opportunities (65-79):** {strong}\n")
-        lines.append("\n---\n")
+        lines.append(self._summary_section(avg_gap, tiers.count('excellent'), tiers.count('strong')))
         
         # Main results table
         lines.append("## 🎯 Top Opportunities\n")
@@ -97,53 +96,92 @@ class MarkdownGenerator:
             lines.append(self._create_detailed_section(i, result))
         
         # Footer
-        lines.append("\n---\n")
-        lines.append("*Generated by Market Arbitrage Scanner*\n")
+        lines.append(self._footer(appendix))
         
         return '\n'.join(lines)
     
+    def _report_header(self, total: int) -> str:
+        """Title, generation time and keyword count"""
+        return '\n'.join([
+            "# 🔍 Market Arbitrage Scanner - Gap Analysis Report\n",
+            f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            f"**Total Keywords Analyzed:** {total}\n",
+        ])
+    
+    def _summary_section(self, avg_gap: float, excellent: int, strong: int) -> str:
+        """Summary statistics block, followed by a divider"""
+        return '\n'.join([
+            "## 📊 Summary\n",
+            f"- **Average Gap Score:** {avg_gap:.1f}/100\n",
+            f"- **Excellent Opportunities (≥{EXCELLENT_THRESHOLD}):** {excellent}\n",
+            f"- **Strong Opportunities ({STRONG_THRESHOLD}-{EXCELLENT_THRESHOLD - 1}):** {strong}\n",
+            "\n---\n",
+        ])
+    
+    def _footer(self, appendix: Optional[str] = None) -> str:
+        """Optional appendix, closing divider and attribution line"""
+        return f"{appendix or ''}\n---\n\n*Generated by Market Arbitrage Scanner*\n"
+    
     def _create_table(self, results: List[dict]) -> str:
         """Create the main comparison table"""
-        lines = []
-        
-        # Table header
-        lines.append("| # | English Tool | PT-BR Translation | US Vol | BR Vol | BR Quality | Gap Score | Category |")
-        lines.append("|---|-------------|------------------|--------|--------|------------|-----------|----------|")
+        lines = [self._table_header()]
         
         # Table rows
         for i, result in enumerate(results, 1):
-            english = result.get('english_keyword', 'N/A')
-            portuguese = result.get('brazilian_keyword', 'N/A')
-            us_vol = result.get('us_volume_score', 0)
-            br_vol = result.get('br_volume_score', 0)
-            br_quality = result.get('br_avg_quality', 0)
-            gap_score = result.get('gap_score', 0)
-            
-            # Categorize
-            if gap_score >= 80:
-                category = "🔥 EXCELLENT"
-            elif gap_score >= 65:
-                category = "✅ STRONG"
-            elif gap_score >= 50:
-                category = "⚠️ MODERATE"
-            elif gap_score >= 35:
-                category = "⚡ WEAK"
-            else:
-                category = "❌ POOR"
-            
-            lines.append(
-                f"| {i} | {english} | {portuguese} | "
-                f"{us_vol} | {br_vol} | {br_quality:.1f} | "
-                f"**{gap_score:.1f}** | {category} |"
-            )
+            lines.append(self._table_row(i, result))
         
         return '\n'.join(lines)
     
+    def _table_header(self) -> str:
+        """Header and separator lines of the comparison table"""
+        return (
+            "| # | English Tool | PT-BR Translation | US Vol | BR Vol | BR Quality | Gap Score | Category |\n"
+            "|---|-------------|------------------|--------|--------|------------|-----------|----------|"
+        )
+    
+    def _keyword_label(self, result: dict) -> str:
+        """English keyword, noting the scanned keyword when the result was copied from a near-duplicate"""
+        english = result.get('english_keyword', 'N/A')
+        duplicate_of = result.get('duplicate_of')
+        return f"{english} (≈ {duplicate_of})" if duplicate_of else english
+    
+    def _table_row(self, rank: int, result: dict) -> str:
+        """Single row of the comparison table"""
+        english = self._keyword_label(result)
+        portuguese = result.get('brazilian_keyword', 'N/A')
+        us_vol = result.get('us_volume_score', 0)
+        br_vol = result.get('br_volume_score', 0)
+        br_quality = result.get('br_avg_quality', 0)
+        gap_score = result.get('gap_score', 0)
+        
+        return (
+            f"| {rank} | {english} | {portuguese} | "
+            f"{us_vol} | {br_vol} | {br_quality:.1f} | "
+            f"**{gap_score:.1f}** | {self._category(gap_score)} |"
+        )
+    
+    def _tier(self, gap_score: float) -> str:
+        """Tier name for a gap score: excellent, strong, moderate, weak or poor"""
+        if gap_score >= EXCELLENT_THRESHOLD:
+            return 'excellent'
+        elif gap_score >= STRONG_THRESHOLD:
+            return 'strong'
+        elif gap_score >= MODERATE_THRESHOLD:
+            return 'moderate'
+        elif gap_score >= WEAK_THRESHOLD:
+            return 'weak'
+        else:
+            return 'poor'
+    
+    def _category(self, gap_score: float) -> str:
+        """Category label for a gap score"""
+        return category_label(gap_score)
+    
     def _create_detailed_section(self, rank: int, result: dict) -> str:
         """Create detailed breakdown for a single result"""
         lines = []
         
-        english = result.get('english_keyword', 'N/A')
+        english = self._keyword_label(result)
         portuguese = result.get('brazilian_keyword', 'N/A')
         gap_score = result.get('gap_score', 0)
         
@@ -182,24 +220,34 @@ class MarkdownGenerator:
             print("No results to display")
             return
         
+        # Sort by score
+        sorted_results = sorted(results, key=lambda x: x.get('gap_score', 0), reverse=True)
+        self.print_top(sorted_results[:5], total=len(results))
+    
+    def print_top(self, top_results: List[dict], total: int):
+        """
+        Print the top opportunities to console
+        
+        Args:
+            top_results: Best results, already sorted by gap score
+            total: Number of keywords analyzed
+        """
         print("\n" + "="*80)
         print("🔍 MARKET ARBITRAGE SCANNER - RESULTS SUMMARY")
         print("="*80 + "\n")
         
-        # Sort by score
-        sorted_results = sorted(results, key=lambda x: x.get('gap_score', 0), reverse=True)
-        
-        print(f"Total Keywords Analyzed: {len(results)}\n")
+        print(f"Total Keywords Analyzed: {total}\n")
         
         # Top 5
         print("🏆 TOP 5 OPPORTUNITIES:\n")
-        for i, result in enumerate(sorted_results[:5], 1):
+        for i, result in enumerate(top_results[:5], 1):
             english = result.get('english_keyword', 'N/A')
             gap_score = result.get('gap_score', 0)
             
-            if gap_score >= 80:
+            tier = self._tier(gap_score)
+            if tier == 'excellent':
                 emoji = "🔥"
-            elif gap_score >= 65:
+            elif tier == 'strong':
                 emoji = "✅"
             else:
                 emoji = "⚠️"
@@ -211,8 +259,3 @@ class MarkdownGenerator:
                   f"Quality: {result.get('br_avg_quality', 0):.1f}\n")
         
         print("="*80)
-
-
-
-
-
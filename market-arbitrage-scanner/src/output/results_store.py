@@ -0,0 +1,256 @@
+"""
+Columnar results store for scan history
+Persists every scan result to a local DuckDB database so past scans can be queried
+"""
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+import os
+import threading
+import logging
+
+from models import GapAnalysis
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS gap_results (
+        scan_id VARCHAR,
+        scanned_at TIMESTAMP,
+        scan_date DATE,
+        english_keyword VARCHAR,
+        brazilian_keyword VARCHAR,
+        us_volume_score INTEGER,
+        br_volume_score INTEGER,
+        br_avg_quality DOUBLE,
+        gap_score DOUBLE,
+        us_top_urls VARCHAR[],
+        br_top_urls VARCHAR[]
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS br_keyword_results (
+        scan_id VARCHAR,
+        scanned_at TIMESTAMP,
+        scan_date DATE,
+        keyword VARCHAR,
+        br_interest INTEGER,
+        top_urls VARCHAR[],
+        avg_competitor_quality DOUBLE,
+        opportunity_score DOUBLE,
+        verdict VARCHAR
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS competitor_metrics (
+        scan_id VARCHAR,
+        scanned_at TIMESTAMP,
+        scan_date DATE,
+        source VARCHAR,
+        keyword VARCHAR,
+        rank INTEGER,
+        url VARCHAR,
+        quality_score DOUBLE,
+        has_https BOOLEAN,
+        is_responsive BOOLEAN,
+        is_web_app BOOLEAN,
+        is_recent BOOLEAN,
+        page_load_success BOOLEAN
+    )
+    """,
+]
+
+# Tables that can be exported as date-partitioned Parquet
+TABLES = ('gap_results', 'br_keyword_results', 'competitor_metrics')
+
+
+class ResultsStore:
+    """Append-only DuckDB store of scan results and per-URL competitor metrics"""
+    
+    def __init__(self, db_path: str, scan_id: Optional[str] = None):
+        """
+        Open (or create) the results database
+        
+        Args:
+            db_path: DuckDB database file (parent directories are created)
+            scan_id: Identifier for this run (default: start timestamp)
+        """
+        if not DUCKDB_AVAILABLE:
+            raise RuntimeError("duckdb is not installed (pip install duckdb)")
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.db_path = db_path
+        self.scan_id = scan_id or datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        self._lock = threading.Lock()
+        self._conn = duckdb.connect(db_path)
+        with self._lock:
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+    
+    def add_gap_result(self, result: GapAnalysis):
+        """
+        Record one MarketScanner result with its per-URL BR competitor metrics
+        
+        Args:
+            result: Completed GapAnalysis
+        """
+        scanned_at = result.timestamp
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO gap_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    self.scan_id, scanned_at, scanned_at.date(),
+                    result.english_keyword, result.brazilian_keyword,
+                    result.us_volume_score, result.br_volume_score,
+                    result.br_avg_quality, result.gap_score,
+                    list(result.us_top_urls), list(result.br_top_urls),
+                ]
+            )
+            self._insert_competitors('gap', result.english_keyword, scanned_at, result.br_competitors)
+    
+    def add_br_result(self, result: Any, scanned_at: Optional[datetime] = None):
+        """
+        Record one br_keyword_research result with its competitor metrics
+        
+        Args:
+            result: BRKeywordResult
+            scanned_at: Scan time (default: now)
+        """
+        scanned_at = scanned_at or datetime.now()
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO br_keyword_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    self.scan_id, scanned_at, scanned_at.date(),
+                    result.keyword, result.br_interest, list(result.top_urls),
+                    result.avg_competitor_quality, result.opportunity_score, result.verdict,
+                ]
+            )
+            self._insert_competitors('br_research', result.keyword, scanned_at, result.competitors)
+    
+    def _insert_competitors(self, source: str, keyword: str, scanned_at: datetime, competitors: Sequence):
+        """Insert per-URL metrics rows (caller holds the lock)"""
+        rows = [
+            [
+                self.scan_id, scanned_at, scanned_at.date(), source, keyword, rank,
+                c.url, c.quality_score, c.has_https, c.is_responsive,
+                c.is_web_app, c.is_recent, c.page_load_success,
+            ]
+            for rank, c in enumerate(competitors, 1)
+        ]
+        if rows:
+            self._conn.executemany(
+                'INSERT INTO competitor_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+    
+    def query(self, sql: str, params: Optional[list] = None) -> List[tuple]:
+        """
+        Run a read query against the store
+        
+        Args:
+            sql: SQL statement (tables: gap_results, br_keyword_results, competitor_metrics)
+            params: Positional parameters
+        
+        Returns:
+            Result rows
+        """
+        with self._lock:
+            return self._conn.execute(sql, params or []).fetchall()
+    
+    def keyword_history(self, keyword: str) -> List[tuple]:
+        """
+        Every recorded scan of an English keyword, oldest first
+        
+        Returns:
+            (scanned_at, us_volume_score, br_volume_score, br_avg_quality, gap_score) rows
+        """
+        return self.query(
+            'SELECT scanned_at, us_volume_score, br_volume_score, br_avg_quality, gap_score '
+            'FROM gap_results WHERE lower(english_keyword) = lower(?) ORDER BY scanned_at',
+            [keyword]
+        )
+    
+    def latest_top(self, limit: int = 20) -> List[tuple]:
+        """
+        Best keywords by their most recent gap score
+        
+        Returns:
+            (english_keyword, gap_score, scanned_at, scans) rows, best first
+        """
+        return self.query(
+            'SELECT english_keyword, arg_max(gap_score, scanned_at), max(scanned_at), count(*) '
+            'FROM gap_results GROUP BY english_keyword '
+            'ORDER BY 2 DESC LIMIT ?',
+            [limit]
+        )
+    
+    def export_parquet(self, directory: str) -> List[str]:
+        """
+        Export every table as Parquet, partitioned by scan date
+        
+        Args:
+            directory: Output directory (one sub-directory per table)
+        
+        Returns:
+            Paths written
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        with self._lock:
+            for table in TABLES:
+                target = os.path.join(directory, table)
+                # COPY takes no bound parameters, so quotes in the path are escaped as a SQL literal
+                literal = target.replace("'", "''")
+                self._conn.execute(
+                    f"COPY {table} TO '{literal}' "
+                    "(FORMAT PARQUET, PARTITION_BY (scan_date), OVERWRITE_OR_IGNORE)"
+                )
+                paths.append(target)
+        return paths
+    
+    def close(self):
+        """Close the database connection, releasing the file lock and WAL"""
+        with self._lock:
+            self._conn.close()
+    
+    def __enter__(self) -> 'ResultsStore':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_results_store(db_path: str, enabled: bool = True) -> Optional[ResultsStore]:
+    """
+    Open the results store if it is enabled and duckdb is installed
+    
+    A database locked by another running scan is skipped with a warning
+    rather than failing the scan.
+    
+    Args:
+        db_path: DuckDB database file
+        enabled: Config switch
+    
+    Returns:
+        ResultsStore or None
+    """
+    if not enabled:
+        return None
+    if not DUCKDB_AVAILABLE:
+        logger.info("duckdb not installed, scan history will not be stored")
+        return None
+    try:
+        return ResultsStore(db_path)
+    except Exception as e:
+        logger.warning(f"⚠️  Could not open results store {db_path}: {e}")
+        return None
@@ -0,0 +1,126 @@
+"""
+Streaming markdown report writer
+Appends rows as keywords complete and keeps only the top results in memory
+"""
+from typing import List, Optional
+from datetime import datetime
+from collections import Counter
+import heapq
+import itertools
+import os
+import logging
+
+from output.markdown_generator import MarkdownGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingReport:
+    """Incrementally written gap analysis report with constant memory use"""
+    
+    def __init__(self, generator: MarkdownGenerator, filename: Optional[str] = None, top_k: int = 10):
+        """
+        Start a streaming report
+        
+        Rows are appended to a live `<report>.live.md` file as results arrive,
+        so progress is visible while the scan runs. close() assembles the final
+        report and removes the live file.
+        
+        Args:
+            generator: MarkdownGenerator used for table and section formatting
+            filename: Output filename (auto-generated if None)
+            top_k: Number of best results kept for the ranked sections
+        """
+        if not filename:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f'gap_analysis_{timestamp}.md'
+        
+        self.generator = generator
+        self.top_k = top_k
+        self.filepath = os.path.join(generator.output_dir, filename)
+        self.live_path = self.filepath[:-3] + '.live.md' if self.filepath.endswith('.md') else self.filepath + '.live'
+        
+        # Running summary statistics
+        self.count = 0
+        self.gap_sum = 0.0
+        self.tiers: Counter = Counter()
+        
+        # Min-heap of (gap_score, sequence, result); the sequence breaks ties
+        self._top: List[tuple] = []
+        self._sequence = itertools.count()
+        
+        self._live = open(self.live_path, 'w', encoding='utf-8')
+        self._live.write(self.generator._table_header() + '\n')
+        self._live.flush()
+        logger.info(f"Streaming results to: {self.live_path}")
+    
+    def add(self, result: dict):
+        """
+        Append one result to the live file and update the running summary
+        
+        Args:
+            result: GapAnalysis result (as dict)
+        """
+        gap_score = result.get('gap_score', 0)
+        
+        self.count += 1
+        self.gap_sum += gap_score
+        self.tiers[self.generator._tier(gap_score)] += 1
+        
+        entry = (gap_score, next(self._sequence), result)
+        if len(self._top) < self.top_k:
+            heapq.heappush(self._top, entry)
+        elif gap_score > self._top[0][0]:
+            heapq.heapreplace(self._top, entry)
+        
+        self._live.write(self.generator._table_row(self.count, result) + '\n')
+        self._live.flush()
+    
+    def top_results(self) -> List[dict]:
+        """Best results seen so far, highest gap score first"""
+        return [result for _, _, result in sorted(self._top, key=lambda e: (-e[0], e[1]))]
+    
+    def close(self, appendix: Optional[str] = None) -> Optional[str]:
+        """
+        Write the final report and remove the live file
+        
+        Args:
+            appendix: Extra markdown placed before the footer
+        
+        Returns:
+            Path to the report, or None if no results were added
+        """
+        self._live.close()
+        
+        if self.count == 0:
+            os.remove(self.live_path)
+            logger.warning("No results to generate report")
+            return None
+        
+        top = self.top_results()
+        generator = self.generator
+        with open(self.filepath, 'w', encoding='utf-8') as out:
+            out.write(generator._report_header(self.count) + '\n')
+            out.write(generator._summary_section(
+                self.gap_sum / self.count, self.tiers['excellent'], self.tiers['strong']
+            ) + '\n')
+            
+            out.write(f"## 🎯 Top Opportunities (Top {len(top)})\n\n")
+            out.write(generator._create_table(top) + '\n')
+            
+            out.write("\n---\n\n")
+            out.write("## 📄 All Results (scan order)\n\n")
+            with open(self.live_path, 'r', encoding='utf-8') as live:
+                for line in live:
+                    out.write(line)
+            
+            out.write("\n---\n\n")
+            out.write(f"## 📋 Detailed Analysis (Top {len(top)})\n\n")
+            for i, result in enumerate(top, 1):
+                out.write(generator._create_detailed_section(i, result) + '\n')
+            
+            out.write(generator._footer(appendix))
+        
+        os.remove(self.live_path)
+        logger.info(f"Report saved to: {self.filepath}")
+        return self.filepath
@@ -0,0 +1,60 @@
+"""
+Concurrent pipeline helpers
+Runs per-item work across a bounded thread pool while preserving input order
+"""
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import logging
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def iter_ordered(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    workers: int = 1
+) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+    """
+    Apply fn to every item using up to `workers` threads
+    
+    Results are yielded in input order as (item, result, error) tuples.
+    Exceptions raised by fn are captured per item instead of aborting the run.
+    At most `workers * 2` items are in flight at any time, so memory stays
+    bounded regardless of how many items are fed in.
+    
+    Args:
+        fn: Callable applied to each item
+        items: Iterable of inputs
+        workers: Number of worker threads (1 = run inline)
+    
+    Yields:
+        (item, result, error) where exactly one of result/error is meaningful
+    """
+    if workers <= 1:
+        for item in items:
+            try:
+                yield item, fn(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+    
+    window = workers * 2
+    pending = deque()
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for item in items:
+            pending.append((item, executor.submit(fn, item)))
+            if len(pending) >= window:
+                yield _resolve(*pending.popleft())
+        
+        while pending:
+            yield _resolve(*pending.popleft())
+
+
+def _resolve(item: Any, future) -> Tuple[Any, Any, Optional[Exception]]:
+    """Wait for a future and unpack it into an (item, result, error) tuple"""
+    try:
+        return item, future.result(), None
+    except Exception as e:
+        return item, None, e
@@ -3,10 +3,48 @@ Gap scoring algorithm
 Calculates opportunity score (0-100) based on market demand and competition quality
 """
 import logging
-from typing import Dict
+from typing import Dict, Optional
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Default component weights (US demand, BR saturation, BR quality gap)
+DEFAULT_WEIGHTS = {
+    'us_demand': 0.40,      # 40% - US market demand (interest score)
+    'br_saturation': 0.30,  # 30% - BR market saturation (inverse of BR interest)
+    'br_quality': 0.30      # 30% - BR competitor quality gap (inverse of quality)
+}
+
+# Minimum gap score per category, shared by the scorer and every report format
+EXCELLENT_THRESHOLD = 80
+STRONG_THRESHOLD = 65
+MODERATE_THRESHOLD = 50
+WEAK_THRESHOLD = 35
+
+# Category labels with the minimum gap score for each, best first
+CATEGORY_THRESHOLDS = [
+    (EXCELLENT_THRESHOLD, '🔥 EXCELLENT'),
+    (STRONG_THRESHOLD, '✅ STRONG'),
+    (MODERATE_THRESHOLD, '⚠️ MODERATE'),
+    (WEAK_THRESHOLD, '⚡ WEAK'),
+    (float('-inf'), '❌ POOR'),
+]
+
+# What each category means for the keyword
+CATEGORY_DESCRIPTIONS = {
+    '🔥 EXCELLENT': 'High US demand, weak BR competition - top priority',
+    '✅ STRONG': 'Good opportunity with favorable conditions',
+    '⚠️ MODERATE': 'Moderate opportunity, requires validation',
+    '⚡ WEAK': 'Low opportunity, high competition or low demand',
+    '❌ POOR': 'Not recommended - saturated or low demand',
+}
+
+
+def category_label(gap_score: float) -> str:
+    """Category label for a gap score (first CATEGORY_THRESHOLDS entry it reaches)"""
+    return next(label for minimum, label in CATEGORY_THRESHOLDS if gap_score >= minimum)
+
 
 class GapScorer:
     """
@@ -15,13 +53,14 @@ class GapScorer:
     High score = High US demand + Low BR competition quality + Low BR saturation
     """
     
-    def __init__(self):
-        """Initialize gap scorer with configurable weights"""
-        self.weights = {
-            'us_demand': 0.40,      # 40% - US market demand (interest score)
-            'br_saturation': 0.30,  # 30% - BR market saturation (inverse of BR interest)
-            'br_quality': 0.30      # 30% - BR competitor quality gap (inverse of quality)
-        }
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        """
+        Initialize gap scorer with configurable weights
+        
+        Args:
+            weights: Overrides for 'us_demand', 'br_saturation' and 'br_quality'
+        """
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
     
     def calculate_gap_score(
         self,
@@ -78,7 +117,70 @@ class GapScorer:
             f"Total={gap_score:.1f}"
         )
         
-        return round(gap_score, 1)
+        # Same rounding as score_batch, so single and batch scores always agree
+        return float(np.round(gap_score, 1))
+    
+    def score_batch(self, us_volume, br_volume, br_quality) -> Dict[str, np.ndarray]:
+        """
+        Score a whole batch at once
+        
+        Same formula, bonuses and clamping as calculate_gap_score, computed with
+        array arithmetic and without per-keyword logging.
+        
+        Args:
+            us_volume: US interest scores (array-like, 0-100)
+            br_volume: BR interest scores (array-like, 0-100)
+            br_quality: Average BR competitor quality (array-like, 0-100)
+            
+        Returns:
+            Dict of arrays: 'gap_score' (rounded to 0.1), 'bonus' and 'category'
+        """
+        us = np.asarray(us_volume, dtype=float)
+        br = np.asarray(br_volume, dtype=float)
+        quality = np.asarray(br_quality, dtype=float)
+        
+        base = (
+            us * self.weights['us_demand'] +
+            (100 - br) * self.weights['br_saturation'] +
+            (100 - quality) * self.weights['br_quality']
+        )
+        bonus = self._bonus_array(us, br, quality)
+        gap_score = np.round(np.clip(base + bonus, 0.0, 100.0), 1)
+        
+        return {
+            'gap_score': gap_score,
+            'bonus': bonus,
+            'category': self._category_array(gap_score),
+        }
+    
+    def score_frame(self, frame):
+        """
+        Score a DataFrame of results in one call
+        
+        Args:
+            frame: DataFrame with us_volume_score, br_volume_score and br_avg_quality columns
+            
+        Returns:
+            Copy of the frame with gap_score, bonus and category columns set
+        """
+        scores = self.score_batch(
+            frame['us_volume_score'].to_numpy(),
+            frame['br_volume_score'].to_numpy(),
+            frame['br_avg_quality'].to_numpy()
+        )
+        return frame.assign(**scores)
+    
+    def _bonus_array(self, us: np.ndarray, br: np.ndarray, quality: np.ndarray) -> np.ndarray:
+        """Vectorized _apply_bonus: the bonus alone for each row"""
+        golden = (us >= 70) & (br <= 30) & (quality <= 40)
+        strong = ~golden & (us >= 60) & (quality <= 30)
+        return np.select([golden, strong], [10.0, 5.0], default=0.0)
+    
+    def _category_array(self, gap_score: np.ndarray) -> np.ndarray:
+        """Vectorized categorize_opportunity: the category label for each row"""
+        conditions = [gap_score >= minimum for minimum, _ in CATEGORY_THRESHOLDS]
+        labels = [label for _, label in CATEGORY_THRESHOLDS]
+        return np.select(conditions, labels, default=labels[-1])
     
     def _apply_bonus(
         self,
@@ -98,12 +200,12 @@ class GapScorer:
         # "Golden opportunity" bonus
         if us_volume >= 70 and br_volume <= 30 and br_quality <= 40:
             bonus = 10.0
-            logger.info("🎯 GOLDEN OPPORTUNITY detected! (+10 bonus)")
+            logger.debug("🎯 GOLDEN OPPORTUNITY detected! (+10 bonus)")
         
         # "High demand, weak competition" bonus
         elif us_volume >= 60 and br_quality <= 30:
             bonus = 5.0
-            logger.info("⭐ Strong opportunity detected! (+5 bonus)")
+            logger.debug("⭐ Strong opportunity detected! (+5 bonus)")
         
         return base_score + bonus
     
@@ -117,31 +219,8 @@ class GapScorer:
         Returns:
             Dict with category and description
         """
-        if gap_score >= 80:
-            return {
-                'category': '🔥 EXCELLENT',
-                'description': 'High US demand, weak BR competition - top priority'
-            }
-        elif gap_score >= 65:
-            return {
-                'category': '✅ STRONG',
-                'description': 'Good opportunity with favorable conditions'
-            }
-        elif gap_score >= 50:
-            return {
-                'category': '⚠️ MODERATE',
-                'description': 'Moderate opportunity, requires validation'
-            }
-        elif gap_score >= 35:
-            return {
-                'category': '⚡ WEAK',
-                'description': 'Low opportunity, high competition or low demand'
-            }
-        else:
-            return {
-                'category': '❌ POOR',
-                'description': 'Not recommended - saturated or low demand'
-            }
+        label = category_label(gap_score)
+        return {'category': label, 'description': CATEGORY_DESCRIPTIONS[label]}
     
     def get_insights(
         self,
@@ -0,0 +1,240 @@
+"""
+Scan budget planning
+Forecasts SerpAPI credits and Trends requests before a batch starts, orders keywords
+by US interest and decides which ones fit under the run's credit ceiling
+"""
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.search_volume import SearchVolumeService
+from services.serpapi_service import SerpApiService
+from services.translator import TranslationService
+from services.retry import UpstreamError
+
+logger = logging.getLogger(__name__)
+
+# How a planned keyword gets its SERP data
+ROUTE_SERPAPI = 'serpapi'   # Paid (or cached) SerpAPI searches
+ROUTE_SCRAPER = 'scraper'   # Free scraper: over the credit ceiling, or SerpAPI not in use
+ROUTE_SKIP = 'skip'         # Below the minimum US interest, not scanned
+ROUTE_DEFER = 'defer'       # Over the credit ceiling with --over-budget stop, left for a later run
+
+# What to do with keywords past the credit ceiling
+OVER_BUDGET_MODES = ('scrape', 'stop')
+
+# SerpAPI searches per scanned keyword (US and BR)
+SEARCHES_PER_KEYWORD = 2
+
+
+@dataclass(frozen=True)
+class PlannedKeyword:
+    """One keyword's place in the scan plan"""
+    keyword: str
+    us_interest: Optional[int]  # None when Trends could not score it before the scan
+    credits: int                # Paid SerpAPI searches forecast (cached searches are free)
+    route: str                  # ROUTE_SERPAPI, ROUTE_SCRAPER, ROUTE_SKIP or ROUTE_DEFER
+
+
+@dataclass(frozen=True)
+class ScanPlan:
+    """Forecast and order for one batch"""
+    items: Tuple[PlannedKeyword, ...]   # Highest US interest first
+    credits_available: Optional[int]    # Credit ceiling for the run (None = SerpAPI not in use)
+    trends_cached: int                  # Interest scores already cached
+    trends_requests: int                # Trends requests forecast (planning included)
+    min_us_interest: int = 0
+    
+    @property
+    def keywords(self) -> List[str]:
+        """Keywords to scan, in order"""
+        return [item.keyword for item in self.items if item.route in (ROUTE_SERPAPI, ROUTE_SCRAPER)]
+    
+    def count(self, route: str) -> int:
+        """Number of keywords planned on a route"""
+        return sum(1 for item in self.items if item.route == route)
+    
+    @property
+    def credits_forecast(self) -> int:
+        """Paid SerpAPI searches the planned keywords need"""
+        return sum(item.credits for item in self.items if item.route == ROUTE_SERPAPI)
+    
+    @property
+    def cached_searches(self) -> int:
+        """SerpAPI searches the planned keywords get from the cache"""
+        return sum(SEARCHES_PER_KEYWORD - item.credits for item in self.items if item.route == ROUTE_SERPAPI)
+    
+    def summary(self) -> List[str]:
+        """Plan description for the console, one line per entry"""
+        lines = [f"💳 Budget plan: {len(self.keywords)} of {len(self.items)} keywords will be scanned"]
+        if self.credits_available is not None:
+            lines.append(
+                f"   SerpAPI credits: {self.credits_forecast} forecast of {self.credits_available} available "
+                f"({self.cached_searches} searches cached)"
+            )
+        lines.append(f"   Trends requests: ~{self.trends_requests} ({self.trends_cached} scores cached)")
+        if self.credits_available is not None and self.count(ROUTE_SCRAPER):
+            lines.append(f"   Free scraper: {self.count(ROUTE_SCRAPER)} keywords past the credit ceiling")
+        if self.count(ROUTE_DEFER):
+            lines.append(f"   Deferred: {self.count(ROUTE_DEFER)} keywords past the credit ceiling")
+        if self.count(ROUTE_SKIP):
+            lines.append(f"   Skipped: {self.count(ROUTE_SKIP)} keywords below US interest {self.min_us_interest}")
+        return lines
+
+
+class BudgetPlanner:
+    """Plans a batch against the SerpAPI credit ceiling before any paid search"""
+    
+    def __init__(
+        self,
+        search_volume: SearchVolumeService,
+        translator: TranslationService,
+        serpapi: Optional[SerpApiService] = None,
+        max_credits: int = 0,
+        min_us_interest: int = 0,
+        over_budget: str = 'scrape',
+        top_n: int = 3,
+        account: Optional[dict] = None
+    ):
+        """
+        Initialize budget planner
+        
+        Args:
+            search_volume: Trends client (US scores fetched here are cached for the scan)
+            translator: Translator (translations fetched here are cached for the scan)
+            serpapi: SerpAPI client whose cache and account are forecast (None = scraper only)
+            max_credits: Paid searches allowed this run (0 = credits left on the plan)
+            min_us_interest: Keywords with a lower US interest score are skipped
+            over_budget: 'scrape' routes keywords past the ceiling to the free scraper, 'stop' defers them
+            top_n: Results per search, as the scan will request them
+            account: get_account_info() result to reuse (default: fetched when needed)
+        """
+        if over_budget not in OVER_BUDGET_MODES:
+            raise ValueError(f"over_budget must be one of {OVER_BUDGET_MODES}, got {over_budget!r}")
+        self.search_volume = search_volume
+        self.translator = translator
+        self.serpapi = serpapi if serpapi is not None and serpapi.enabled else None
+        self.max_credits = max_credits
+        self.min_us_interest = min_us_interest
+        self.over_budget = over_budget
+        self.top_n = top_n
+        self.account = account
+    
+    def credits_available(self) -> Optional[int]:
+        """
+        Credit ceiling for the run: max_credits, capped by the searches left on the plan
+        
+        Returns:
+            Credits, or None when SerpAPI is not in use
+        """
+        if self.serpapi is None:
+            return None
+        account = self.account or self.serpapi.get_account_info()
+        limits = [self.max_credits] if self.max_credits else []
+        if 'error' in account:
+            logger.warning(f"⚠️  Could not read SerpAPI credits left ({account['error']}); only the set ceiling applies")
+        else:
+            limits.append(int(account.get('total_searches_left', 0)))
+        if not limits:
+            logger.warning("⚠️  No SerpAPI credit ceiling: set SERP_CREDIT_CEILING to cap paid searches")
+            return None
+        return min(limits)
+    
+    def plan(self, keywords: Iterable[str]) -> ScanPlan:
+        """
+        Forecast and order a batch
+        
+        US interest scores and translations are fetched (batched, through the
+        caches) so the ordering is known before any paid search; the scan then
+        finds them cached. SerpAPI searches are only checked against the cache.
+        
+        Args:
+            keywords: English keywords
+        
+        Returns:
+            ScanPlan with keywords ordered by US interest
+        """
+        keywords = list(dict.fromkeys(k for k in keywords if k))
+        us_cached, us_requests = self.search_volume.forecast_requests(keywords, 'US')
+        translations = self._translations(keywords)
+        interest = self._us_interest(keywords)
+        
+        # Highest US interest first; sorted() is stable, so ties keep input order
+        ordered = sorted(keywords, key=lambda k: -(interest.get(k) or 0))
+        ceiling = self.credits_available()
+        spent = 0
+        items = []
+        for keyword in ordered:
+            score = interest.get(keyword)
+            if score is not None and score < self.min_us_interest:
+                items.append(PlannedKeyword(keyword, score, 0, ROUTE_SKIP))
+                continue
+            if self.serpapi is None:
+                items.append(PlannedKeyword(keyword, score, 0, ROUTE_SCRAPER))
+                continue
+            
+            credits = self._credits(keyword, translations.get(keyword))
+            if ceiling is None or spent + credits <= ceiling:
+                spent += credits
+                items.append(PlannedKeyword(keyword, score, credits, ROUTE_SERPAPI))
+            else:
+                route = ROUTE_SCRAPER if self.over_budget == 'scrape' else ROUTE_DEFER
+                items.append(PlannedKeyword(keyword, score, credits, route))
+        
+        scanned = {item.keyword for item in items if item.route in (ROUTE_SERPAPI, ROUTE_SCRAPER)}
+        br_cached, br_requests = self.search_volume.forecast_requests(
+            [translations.get(k, k) for k in keywords if k in scanned], 'BR'
+        )
+        
+        for item in items:
+            if item.route == ROUTE_SKIP:
+                logger.info(f"⏭️  Skipping '{item.keyword}' (US interest {item.us_interest} < {self.min_us_interest})")
+        
+        return ScanPlan(
+            items=tuple(items),
+            credits_available=ceiling,
+            trends_cached=us_cached + br_cached,
+            trends_requests=us_requests + br_requests,
+            min_us_interest=self.min_us_interest
+        )
+    
+    def _translations(self, keywords: List[str]) -> Dict[str, str]:
+        """Portuguese keywords for the BR forecasts ({} if translation failed)"""
+        try:
+            return self.translator.translate_batch(keywords)
+        except Exception as e:
+            logger.warning(f"⚠️  Translation failed while planning, BR searches counted as paid: {e}")
+            return {}
+    
+    def _us_interest(self, keywords: List[str]) -> Dict[str, int]:
+        """
+        US interest per keyword
+        
+        Keywords Trends failed to score are left out, so they keep their input
+        order after the scored ones and are never skipped.
+        """
+        if self.search_volume.batching:
+            try:
+                return self.search_volume.get_interest_scores(keywords, 'US')
+            except UpstreamError as e:
+                logger.warning(f"⚠️  Trends unavailable while planning, keeping input order: {e}")
+                return {}
+        
+        interest = {}
+        failed = 0
+        for keyword in keywords:
+            try:
+                interest[keyword] = self.search_volume.get_interest_score(keyword, 'US')
+            except UpstreamError as e:
+                failed += 1
+                logger.debug(f"Trends failed for '{keyword}' while planning: {e}")
+        if failed:
+            logger.warning(f"⚠️  Trends failed for {failed} of {len(keywords)} keywords while planning; they keep input order")
+        return interest
+    
+    def _credits(self, keyword: str, pt_keyword: Optional[str]) -> int:
+        """Paid searches one keyword needs (an untranslated BR search counts as paid)"""
+        credits = 0 if self.serpapi.is_cached(keyword, 'US', self.top_n) else 1
+        if pt_keyword is None or not self.serpapi.is_cached(pt_keyword, 'BR', self.top_n):
+            credits += 1
+        return credits
@@ -0,0 +1,132 @@
+"""
+SerpAPI credit ledger
+Records paid calls and cache hits per run so avoided spend is visible
+"""
+import threading
+import logging
+from datetime import datetime
+from typing import Optional
+
+from cache.sqlite_cache import SqliteCache
+from services.rate_limiter import SERPAPI_HOST
+from services.retry import UpstreamError
+
+logger = logging.getLogger(__name__)
+
+# Table holding one ledger row per run
+LEDGER_TABLE = 'serp_credit_ledger'
+
+
+class CreditCeilingReached(UpstreamError):
+    """The run's SerpAPI credit ceiling is spent, so the search was not sent"""
+    
+    def __init__(self, ceiling: int):
+        super().__init__(SERPAPI_HOST, f"credit ceiling of {ceiling} reached")
+        self.ceiling = ceiling
+
+
+class CreditBudget:
+    """Hard ceiling on paid SerpAPI searches for one run (shared by every worker)"""
+    
+    def __init__(self, ceiling: int):
+        """
+        Initialize credit budget
+        
+        Args:
+            ceiling: Paid searches allowed this run
+        """
+        self.ceiling = max(0, ceiling)
+        self.spent = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def remaining(self) -> int:
+        return self.ceiling - self.spent
+    
+    def reserve(self):
+        """
+        Claim one credit before a paid search
+        
+        Raises:
+            CreditCeilingReached: No credits left
+        """
+        with self._lock:
+            if self.spent >= self.ceiling:
+                raise CreditCeilingReached(self.ceiling)
+            self.spent += 1
+    
+    def release(self):
+        """Return a reserved credit whose search failed (failed searches are not billed)"""
+        with self._lock:
+            self.spent = max(0, self.spent - 1)
+
+
+class CreditLedger:
+    """Counts paid SerpAPI calls and cache hits for the current run"""
+    
+    def __init__(self, store: Optional[SqliteCache] = None, run_id: Optional[str] = None):
+        """
+        Initialize credit ledger
+        
+        Args:
+            store: Persistent table for run totals (default: in-memory only)
+            run_id: Identifier for this run (default: start timestamp)
+        """
+        self.store = store
+        self.started_at = datetime.now()
+        self.run_id = run_id or self.started_at.strftime('%Y%m%d_%H%M%S_%f')
+        self.paid_calls = 0
+        self.cache_hits = 0
+        self._lock = threading.Lock()
+    
+    def record_paid_call(self):
+        """Record one SerpAPI search that spent a credit"""
+        with self._lock:
+            self.paid_calls += 1
+            self._flush()
+    
+    def record_cache_hit(self):
+        """Record one search served from the cache (a credit avoided)"""
+        with self._lock:
+            self.cache_hits += 1
+            self._flush()
+    
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of searches in this run served from the cache"""
+        total = self.paid_calls + self.cache_hits
+        return self.cache_hits / total if total else 0.0
+    
+    def _flush(self):
+        """Write this run's totals to the persistent store"""
+        if self.store is None:
+            return
+        self.store.set(self.run_id, {
+            'started_at': self.started_at.isoformat(),
+            'paid_calls': self.paid_calls,
+            'cache_hits': self.cache_hits,
+        })
+    
+    def history_totals(self) -> dict:
+        """
+        Sum paid calls and cache hits across every recorded run
+        
+        Returns:
+            Dict with runs, paid_calls, cache_hits and hit_rate
+        """
+        runs = [value for _, value, _ in self.store.items()] if self.store is not None else []
+        paid = sum(run.get('paid_calls', 0) for run in runs)
+        hits = sum(run.get('cache_hits', 0) for run in runs)
+        return {
+            'runs': len(runs),
+            'paid_calls': paid,
+            'cache_hits': hits,
+            'hit_rate': hits / (paid + hits) if paid + hits else 0.0,
+        }
+    
+    def summary(self) -> str:
+        """One-line summary of this run's credit usage"""
+        return (
+            f"SerpAPI credits: {self.paid_calls} spent, {self.cache_hits} avoided "
+            f"({self.hit_rate:.0%} cache hit rate)"
+        )
@@ -0,0 +1,104 @@
+"""
+Shared HTTP client
+One pooled, keep-alive requests.Session for every scanner service, plus an optional DNS cache
+"""
+import socket
+import threading
+import time
+import logging
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+def build_session(pool_connections: int = 32, pool_maxsize: int = 16) -> requests.Session:
+    """
+    Create a Session with connection pools sized for concurrent scans
+    
+    requests keeps connections alive by default; the adapter decides how many
+    hosts get a pool (pool_connections) and how many idle connections each
+    pool keeps (pool_maxsize). Past pool_maxsize, extra connections are still
+    opened when needed but closed afterwards instead of blocking.
+    
+    Args:
+        pool_connections: Hosts whose pools are kept (LRU beyond that)
+        pool_maxsize: Connections kept alive per host
+    
+    Returns:
+        Configured Session (retries are left to RetryPolicy)
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class DnsCache:
+    """TTL cache in front of socket.getaddrinfo (process-wide once installed)"""
+    
+    def __init__(self, ttl: float = 300.0):
+        """
+        Initialize DNS cache
+        
+        Args:
+            ttl: Seconds a resolved address list is reused
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Tuple, Tuple[float, list]] = {}
+        self._lock = threading.Lock()
+        self._resolve = socket.getaddrinfo
+    
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """Drop-in replacement for socket.getaddrinfo; failures are never cached"""
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+        
+        result = self._resolve(host, port, family, type, proto, flags)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (now + self.ttl, result)
+        return result
+    
+    def install(self):
+        """Route every lookup in the process (requests, pytrends, translators) through the cache"""
+        socket.getaddrinfo = self.getaddrinfo
+    
+    def uninstall(self):
+        socket.getaddrinfo = self._resolve
+
+
+_shared_session: Optional[requests.Session] = None
+_shared_dns_cache: Optional[DnsCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_http_session(config) -> requests.Session:
+    """
+    Get the process-wide Session, building it (and the DNS cache) from config on first use
+    
+    Args:
+        config: Config class with HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE and DNS_CACHE_TTL
+    
+    Returns:
+        Shared Session instance
+    """
+    global _shared_session, _shared_dns_cache
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = build_session(config.HTTP_POOL_CONNECTIONS, config.HTTP_POOL_MAXSIZE)
+            if config.DNS_CACHE_TTL and _shared_dns_cache is None:
+                _shared_dns_cache = DnsCache(config.DNS_CACHE_TTL)
+                _shared_dns_cache.install()
+                logger.debug(f"DNS cache enabled ({config.DNS_CACHE_TTL:.0f}s TTL)")
+        return _shared_session
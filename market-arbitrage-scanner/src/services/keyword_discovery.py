@@ -0,0 +1,192 @@
+"""
+Keyword expansion using Google Trends related queries
+Walks top and rising related queries breadth-first from seed keywords, within depth and request budgets
+"""
+import re
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from cache.sqlite_cache import SqliteCache, make_key
+from services.search_volume import SearchVolumeService
+
+logger = logging.getLogger(__name__)
+
+# Table holding parsed related queries per (keyword, geo, timeframe)
+RELATED_CACHE_TABLE = 'trends_related'
+
+# Related query lists returned by Trends
+RELATED_KINDS = ('top', 'rising')
+
+_PUNCTUATION = re.compile(r"[^\w\s'-]+")
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    Index key for a keyword: case-folded, punctuation dropped, whitespace collapsed
+    
+    Args:
+        keyword: Raw keyword
+    
+    Returns:
+        Normalized form ('' for keywords with no words)
+    """
+    return _SPACES.sub(' ', _PUNCTUATION.sub(' ', keyword.casefold())).strip()
+
+
+@dataclass(frozen=True)
+class DiscoveredKeyword:
+    """A keyword found during expansion and how it was reached"""
+    keyword: str
+    depth: int              # 0 for seeds
+    parent: Optional[str]   # Keyword whose related queries listed it (None for seeds)
+    kind: str               # 'seed', 'top' or 'rising'
+    value: int = 0          # Trends value in the parent's list (relative interest or % growth)
+
+
+class KeywordDiscovery:
+    """Breadth-first keyword expansion over Trends related queries"""
+    
+    def __init__(
+        self,
+        search_volume: SearchVolumeService,
+        geo: str = 'US',
+        cache: Optional[SqliteCache] = None,
+        cache_ttl: Optional[float] = None,
+        max_depth: int = 2,
+        max_keywords: int = 200,
+        max_requests: int = 50,
+        per_keyword: int = 10,
+        include_rising: bool = True
+    ):
+        """
+        Initialize keyword discovery
+        
+        Args:
+            search_volume: Trends client (its session, rate limit and retry policy are reused)
+            geo: Geography whose related queries are walked
+            cache: Related-query cache, so repeated expansions are free (default: no caching)
+            cache_ttl: Seconds cached related queries stay fresh (None = never expires)
+            max_depth: Expansion levels below the seeds
+            max_keywords: Stop once this many distinct keywords (seeds included) are known
+            max_requests: Trends requests allowed for one discover() call (cache hits are free)
+            per_keyword: Related queries taken from each list of one keyword
+            include_rising: Also follow rising queries, not only top ones
+        """
+        self.search_volume = search_volume
+        self.geo = geo
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.max_depth = max_depth
+        self.max_keywords = max_keywords
+        self.max_requests = max_requests
+        self.per_keyword = per_keyword
+        self.kinds = RELATED_KINDS if include_rising else RELATED_KINDS[:1]
+        self.requests = 0
+        self.cache_hits = 0
+    
+    def related(self, keyword: str) -> Optional[List[dict]]:
+        """
+        Related queries for one keyword, from cache or Trends
+        
+        Args:
+            keyword: Keyword to expand
+        
+        Returns:
+            [{'query', 'kind', 'value'}, ...] in Trends order, or None if Trends
+            failed (failures are not cached) or the request budget is spent
+        """
+        key = make_key(normalize_keyword(keyword), self.geo.upper(), self.search_volume.timeframe)
+        if self.cache is not None:
+            cached = self.cache.get(key, max_age=self.cache_ttl)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+        
+        if self.requests >= self.max_requests:
+            return None
+        self.requests += 1
+        
+        response = self.search_volume.get_related_queries(keyword, self.geo)
+        if response is None:
+            return None
+        
+        queries = []
+        lists = response.get(keyword) or next(iter(response.values()), None) or {}
+        for kind in RELATED_KINDS:
+            frame = lists.get(kind)
+            if frame is None or frame.empty:
+                continue
+            for row in frame.itertuples(index=False):
+                queries.append({'query': str(row.query), 'kind': kind, 'value': int(row.value)})
+        
+        if self.cache is not None:
+            self.cache.set(key, queries)
+        return queries
+    
+    def discover(self, seeds: Iterable[str]) -> Iterator[DiscoveredKeyword]:
+        """
+        Expand seed keywords breadth-first
+        
+        Seeds come first, then every keyword at depth 1, and so on. Candidates
+        are deduplicated on normalize_keyword, so case, spacing and punctuation
+        variants are kept once (first spelling wins).
+        
+        Args:
+            seeds: Starting keywords
+        
+        Yields:
+            DiscoveredKeyword for every distinct keyword, as soon as it is found
+        """
+        index: Dict[str, DiscoveredKeyword] = {}
+        queue = deque()
+        self.requests = 0
+        self.cache_hits = 0
+        
+        def admit(found: DiscoveredKeyword) -> bool:
+            norm = normalize_keyword(found.keyword)
+            if not norm or norm in index or len(index) >= self.max_keywords:
+                return False
+            index[norm] = found
+            queue.append(found)
+            return True
+        
+        for seed in seeds:
+            found = DiscoveredKeyword(keyword=seed.strip(), depth=0, parent=None, kind='seed')
+            if admit(found):
+                yield found
+        
+        while queue and len(index) < self.max_keywords:
+            current = queue.popleft()
+            if current.depth >= self.max_depth:
+                continue
+            
+            # Once the request budget is spent, only cached expansions continue
+            queries = self.related(current.keyword)
+            if queries is None:
+                continue
+            
+            taken = {kind: 0 for kind in self.kinds}
+            for item in queries:
+                kind = item['kind']
+                if kind not in taken or taken[kind] >= self.per_keyword:
+                    continue
+                taken[kind] += 1
+                found = DiscoveredKeyword(
+                    keyword=item['query'],
+                    depth=current.depth + 1,
+                    parent=current.keyword,
+                    kind=kind,
+                    value=item['value']
+                )
+                if admit(found):
+                    yield found
+        
+        if self.requests >= self.max_requests:
+            logger.info(f"🧭 Trends request budget ({self.max_requests}) spent; expansion may be incomplete")
+        logger.info(
+            f"🧭 Discovered {len(index)} keywords "
+            f"({self.requests} Trends requests, {self.cache_hits} cached expansions)"
+        )
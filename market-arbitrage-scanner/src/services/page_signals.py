@@ -0,0 +1,162 @@
+"""
+Single-pass HTML signal extraction for competitor pages
+Collects only the signals QualityAnalyzer scores, without building a DOM tree
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+import re
+
+from lxml import etree
+
+# Text inside these elements is not page copy (BeautifulSoup.get_text skips it too)
+_NON_TEXT_TAGS = frozenset({'script', 'style', 'template'})
+
+COPYRIGHT_PATTERN = re.compile(r'©\s*(\d{4})|copyright\s*(\d{4})', re.IGNORECASE)
+
+
+@dataclass
+class PageSignals:
+    """Quality signals extracted from one HTML page"""
+    has_viewport: bool = False
+    title: str = ''
+    description: str = ''
+    has_file_input: bool = False
+    form_count: int = 0
+    button_count: int = 0
+    modified_time: str = ''  # article:modified_time meta content
+    copyright_years: List[int] = field(default_factory=list)
+    chars_parsed: int = 0
+    truncated: bool = False  # True when the character cap stopped parsing early
+
+
+class _SignalTarget:
+    """lxml parser target that records signals as tags stream past"""
+    
+    def __init__(self, signals: PageSignals):
+        self.signals = signals
+        self.text: List[str] = []
+        self._title_parts: Optional[List[str]] = None
+        self._title_done = False
+        self._skip_depth = 0
+    
+    def start(self, tag, attrib):
+        signals = self.signals
+        if tag == 'meta':
+            name = attrib.get('name')
+            if name == 'viewport':
+                signals.has_viewport = True
+            elif name == 'description' and not signals.description:
+                signals.description = attrib.get('content', '')
+            elif attrib.get('property') == 'article:modified_time' and not signals.modified_time:
+                signals.modified_time = attrib.get('content', '')
+        elif tag == 'input':
+            if attrib.get('type') == 'file':
+                signals.has_file_input = True
+        elif tag == 'form':
+            signals.form_count += 1
+        elif tag == 'button':
+            signals.button_count += 1
+        elif tag == 'title' and not self._title_done:
+            self._title_parts = []
+        
+        if tag in _NON_TEXT_TAGS:
+            self._skip_depth += 1
+    
+    def end(self, tag):
+        if tag == 'title' and self._title_parts is not None:
+            self.signals.title = ''.join(self._title_parts)
+            self._title_parts = None
+            self._title_done = True
+        elif tag in _NON_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+    
+    def data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        if not self._skip_depth:
+            self.text.append(data)
+    
+    def close(self):
+        return self.signals
+
+
+class SignalExtractor:
+    """Incremental extractor: feed HTML text chunks, then call close()"""
+    
+    def __init__(self, max_chars: Optional[int] = None):
+        """
+        Initialize extractor
+        
+        Args:
+            max_chars: Stop parsing after this many characters (None = no cap)
+        """
+        self.max_chars = max_chars
+        self.signals = PageSignals()
+        self._target = _SignalTarget(self.signals)
+        self._parser = etree.HTMLParser(target=self._target, recover=True, no_network=True)
+        self._seen = 0
+        self._fed = False
+    
+    @property
+    def done(self) -> bool:
+        """True once the character cap has been reached"""
+        return self.max_chars is not None and self._seen >= self.max_chars
+    
+    def feed(self, chunk: str) -> bool:
+        """
+        Parse the next chunk of HTML
+        
+        Args:
+            chunk: Decoded HTML text
+        
+        Returns:
+            True if more input is wanted, False once the cap is reached
+        """
+        if self.done or not chunk:
+            return not self.done
+        
+        if self.max_chars is not None and self._seen + len(chunk) > self.max_chars:
+            chunk = chunk[:self.max_chars - self._seen]
+            self.signals.truncated = True
+        
+        self._seen += len(chunk)
+        self._parser.feed(chunk)
+        self._fed = True
+        return not self.done
+    
+    def close(self) -> PageSignals:
+        """
+        Finish parsing and return the collected signals
+        
+        Returns:
+            PageSignals for everything fed so far
+        """
+        if self._fed:
+            try:
+                self._parser.close()
+            except etree.XMLSyntaxError:
+                pass  # Truncated or broken markup; keep what was collected
+        
+        signals = self.signals
+        signals.chars_parsed = self._seen
+        text = ''.join(self._target.text)
+        signals.copyright_years = [
+            int(match[0] or match[1]) for match in COPYRIGHT_PATTERN.findall(text)
+        ]
+        return signals
+
+
+def extract_signals(html: str, max_chars: Optional[int] = None) -> PageSignals:
+    """
+    Extract quality signals from an HTML document in one pass
+    
+    Args:
+        html: Decoded HTML text
+        max_chars: Stop parsing after this many characters (None = no cap)
+    
+    Returns:
+        PageSignals
+    """
+    extractor = SignalExtractor(max_chars=max_chars)
+    extractor.feed(html)
+    return extractor.close()
@@ -3,30 +3,83 @@ Quality analyzer for competitor websites
 Evaluates BR competitor quality to determine market gaps
 """
 import requests
-from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
-import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from collections import deque
+import threading
+import codecs
 import logging
-from typing import List
+from typing import Dict, List, Optional
 from datetime import datetime
+from urllib.parse import urlparse
 import re
 
+from services.http_client import build_session
+from services.rate_limiter import RateLimiter
+from services.page_signals import PageSignals, SignalExtractor
+from services.quality_cache import QualityCache, normalize_url
+
 logger = logging.getLogger(__name__)
 
+# Bytes requested from the socket per read while streaming a page
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Content types worth parsing; anything else (PDFs, images, archives) is not read
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
 
 class QualityAnalyzer:
     """Analyzes quality of competitor websites"""
     
-    def __init__(self, timeout: int = 10):
+    def __init__(
+        self,
+        timeout: int = 10,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_concurrency: int = 8,
+        per_domain_concurrency: int = 1,
+        deadline: Optional[float] = None,
+        max_parse_chars: Optional[int] = 500_000,
+        max_body_bytes: Optional[int] = 256 * 1024,
+        cache: Optional[QualityCache] = None,
+        session: Optional[requests.Session] = None
+    ):
         """
         Initialize quality analyzer
         
         Args:
             timeout: Request timeout in seconds
+            rate_limiter: Shared per-host limiter (default: 1s/request per competitor host)
+            max_concurrency: Maximum pages fetched at once, across all keywords
+            per_domain_concurrency: Maximum pages fetched at once from one host
+            deadline: Total seconds allowed for one analyze_competitors call (None = no limit)
+            max_parse_chars: Stop parsing a page after this many characters (None = no cap)
+            max_body_bytes: Stop downloading a page after this many bytes (None = no cap)
+            cache: Quality metrics cache shared across keywords (default: no caching)
+            session: Pooled HTTP session shared with other services (default: private session
+                with one pool slot per concurrent fetch)
         """
         self.timeout = timeout
+        self.rate_limiter = rate_limiter or RateLimiter(default_interval=1.0)
+        self.per_domain_concurrency = per_domain_concurrency
+        self.deadline = deadline
+        self.max_parse_chars = max_parse_chars
+        self.max_body_bytes = max_body_bytes
+        self.cache = cache
+        self.not_modified = 0  # Pages revalidated with a 304 instead of re-downloaded
+        self._stats_lock = threading.Lock()
+        # Fetches in progress by normalized URL, so concurrent keywords share one fetch;
+        # each entry is [future, number of analyze calls still waiting on it]
+        self._inflight: Dict[str, list] = {}
+        self._inflight_lock = threading.Lock()
+        # Shared pool: concurrent keyword scans share the same global fetch cap
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='quality')
+        # Per-host queues: a host never occupies more than per_domain_concurrency workers,
+        # so a busy host waiting on its rate limit cannot starve the others
+        self._host_queues: Dict[str, deque] = {}
+        self._host_active: Dict[str, int] = {}
+        self._domain_lock = threading.Lock()
         self.ua = UserAgent()
-        self.session = requests.Session()
+        self.session = session or build_session(pool_maxsize=max_concurrency)
         # Disable SSL warnings
         import urllib3
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -38,62 +91,71 @@ class QualityAnalyzer:
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         }
     
-    def analyze_url(self, url: str) -> dict:
+    def analyze_url(self, url: str, cached: Optional[dict] = None) -> dict:
         """
         Analyze a single URL for quality indicators
         
         Args:
             url: Website URL to analyze
+            cached: Previously stored metrics for the URL; their ETag/Last-Modified
+                are sent as validators and reused as-is on 304 Not Modified
             
         Returns:
             Dict with quality metrics
         """
-        metrics = {
-            'url': url,
-            'has_https': False,
-            'is_responsive': False,
-            'is_web_app': False,
-            'is_recent': False,
-            'page_load_success': False,
-            'quality_score': 0.0
-        }
+        metrics = self._empty_metrics(url)
         
         try:
             # Check HTTPS
             metrics['has_https'] = url.startswith('https://')
             
+            headers = self._get_headers()
+            if cached:
+                headers.update(self._conditional_headers(cached))
+            
             # Fetch page (with SSL verification disabled for macOS compatibility)
-            time.sleep(1)  # Rate limiting
-            response = self.session.get(
+            # Streamed so only the headers and the first max_body_bytes are read
+            self.rate_limiter.acquire_url(url)  # Per-host rate limiting
+            with self.session.get(
                 url,
-                headers=self._get_headers(),
+                headers=headers,
                 timeout=self.timeout,
                 allow_redirects=True,
-                verify=False  # Disable SSL verification to avoid certificate errors
-            )
-            
-            if response.status_code == 200:
-                metrics['page_load_success'] = True
-                
-                # Parse HTML
-                soup = BeautifulSoup(response.text, 'lxml')
-                
-                # Check for responsive design (viewport meta tag)
-                viewport = soup.find('meta', attrs={'name': 'viewport'})
-                metrics['is_responsive'] = viewport is not None
-                
-                # Check if it's a web app (look for app-like indicators)
-                metrics['is_web_app'] = self._is_web_app(soup, url)
-                
-                # Check recency (last modified or copyright year)
-                metrics['is_recent'] = self._is_recent(soup, response.headers)
-                
-                # Calculate quality score
-                metrics['quality_score'] = self._calculate_quality_score(metrics)
-                
-                logger.info(f"Analyzed {url}: quality={metrics['quality_score']:.1f}")
-            else:
-                logger.warning(f"Failed to load {url}: status {response.status_code}")
+                verify=False,  # Disable SSL verification to avoid certificate errors
+                stream=True
+            ) as response:
+                if response.status_code == 304 and cached:
+                    # Unchanged since the last scan: keep the stored metrics
+                    metrics = {**cached, 'url': url}
+                    metrics['etag'] = response.headers.get('ETag') or cached.get('etag')
+                    metrics['last_modified'] = response.headers.get('Last-Modified') or cached.get('last_modified')
+                    with self._stats_lock:
+                        self.not_modified += 1
+                    logger.info(f"Not modified {url}: quality={metrics['quality_score']:.1f}")
+                elif response.status_code == 200:
+                    # Parse HTML once, collecting only the signals we score
+                    signals = self._read_signals(response, url)
+                    metrics['page_load_success'] = True
+                    
+                    # Check for responsive design (viewport meta tag)
+                    metrics['is_responsive'] = signals.has_viewport
+                    
+                    # Check if it's a web app (look for app-like indicators)
+                    metrics['is_web_app'] = self._is_web_app(signals, url)
+                    
+                    # Check recency (last modified or copyright year)
+                    metrics['is_recent'] = self._is_recent(signals, response.headers)
+                    
+                    # Calculate quality score
+                    metrics['quality_score'] = self._calculate_quality_score(metrics)
+                    
+                    # Validators for conditional requests on the next scan
+                    metrics['etag'] = response.headers.get('ETag')
+                    metrics['last_modified'] = response.headers.get('Last-Modified')
+                    
+                    logger.info(f"Analyzed {url}: quality={metrics['quality_score']:.1f}")
+                else:
+                    logger.warning(f"Failed to load {url}: status {response.status_code}")
                 
         except requests.exceptions.Timeout:
             logger.error(f"Timeout loading {url}")
@@ -104,7 +166,217 @@ class QualityAnalyzer:
         
         return metrics
     
-    def _is_web_app(self, soup: BeautifulSoup, url: str) -> bool:
+    def _conditional_headers(self, cached: dict) -> dict:
+        """If-None-Match / If-Modified-Since headers from stored validators"""
+        headers = {}
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+        return headers
+    
+    def _read_signals(self, response: requests.Response, url: str) -> PageSignals:
+        """
+        Stream the response body into the signal extractor
+        
+        Reading stops at max_body_bytes or once the parse cap is reached, and
+        non-HTML responses are not read at all. Whatever was received is scored,
+        including the part of a body that was cut off by a read error.
+        
+        Args:
+            response: Streamed 200 response
+            url: Page URL (for logging)
+            
+        Returns:
+            PageSignals for the part of the page that was read
+        """
+        extractor = SignalExtractor(max_chars=self.max_parse_chars)
+        
+        content_type = response.headers.get('Content-Type', '').lower()
+        if content_type and not content_type.startswith(HTML_CONTENT_TYPES):
+            logger.info(f"Skipping body of {url}: {content_type.split(';')[0]}")
+            return extractor.close()
+        
+        # requests assumes ISO-8859-1 when no charset is declared; HTML is far more often UTF-8
+        encoding = response.encoding if 'charset=' in content_type else 'utf-8'
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        
+        received = 0
+        try:
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                if self.max_body_bytes is not None and received + len(chunk) > self.max_body_bytes:
+                    chunk = chunk[:self.max_body_bytes - received]
+                    extractor.signals.truncated = True
+                received += len(chunk)
+                
+                if not extractor.feed(decoder.decode(chunk)):
+                    break
+                if self.max_body_bytes is not None and received >= self.max_body_bytes:
+                    extractor.signals.truncated = True
+                    break
+            else:
+                extractor.feed(decoder.decode(b'', final=True))
+        except requests.exceptions.RequestException as e:
+            if not received:
+                raise  # Nothing to score: report a failed load
+            logger.warning(f"Read error after {received} bytes of {url}, scoring partial page: {e}")
+            extractor.signals.truncated = True
+        
+        signals = extractor.close()
+        if signals.truncated:
+            logger.debug(f"Read first {received} bytes of {url}")
+        return signals
+    
+    def _empty_metrics(self, url: str) -> dict:
+        """Metrics for a page that has not (or could not) been loaded"""
+        return {
+            'url': url,
+            'has_https': False,
+            'is_responsive': False,
+            'is_web_app': False,
+            'is_recent': False,
+            'page_load_success': False,
+            'quality_score': 0.0,
+            'etag': None,
+            'last_modified': None
+        }
+    
+    def _schedule(self, url: str) -> Future:
+        """
+        Queue a URL behind its host and return a future for its metrics
+        
+        A worker is only handed to a host while it has fewer than
+        per_domain_concurrency fetches running, so waiting on a host's
+        rate limit never ties up the global pool.
+        """
+        future = Future()
+        host = (urlparse(url).hostname or '').lower()
+        with self._domain_lock:
+            self._host_queues.setdefault(host, deque()).append((url, future))
+            start_worker = self._host_active.get(host, 0) < self.per_domain_concurrency
+            if start_worker:
+                self._host_active[host] = self._host_active.get(host, 0) + 1
+        if start_worker:
+            self._executor.submit(self._run_host, host)
+        return future
+    
+    def _run_host(self, host: str):
+        """
+        Analyze the next queued URL for a host, then requeue the host
+        
+        Requeueing after each page lets other hosts' work interleave in the
+        pool instead of one host draining its whole queue first.
+        """
+        with self._domain_lock:
+            queue = self._host_queues.get(host)
+            item = queue.popleft() if queue else None
+            if item is None:
+                self._host_active[host] -= 1
+                if not self._host_active[host]:
+                    del self._host_active[host]
+                    self._host_queues.pop(host, None)
+                return
+        
+        url, future = item
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(self._analyze_and_cache(url))
+            except Exception as e:
+                future.set_exception(e)
+        
+        self._executor.submit(self._run_host, host)
+    
+    def _submit(self, url: str) -> Future:
+        """
+        Get a future for a URL's metrics
+        
+        Cached metrics resolve immediately; a URL already being fetched for
+        another keyword reuses that fetch instead of starting a new one.
+        Every call must be paired with _release once the caller stops waiting.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(url)
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                return future
+        
+        key = normalize_url(url)
+        with self._inflight_lock:
+            entry = self._inflight.get(key)
+            if entry is not None:
+                entry[1] += 1
+                return entry[0]
+            future = self._schedule(url)
+            self._inflight[key] = [future, 1]
+        # Registered outside the lock: the callback runs inline if the fetch already finished
+        future.add_done_callback(lambda done, key=key: self._forget_inflight(key, done))
+        return future
+    
+    def _release(self, url: str, future: Future):
+        """
+        Stop waiting on a shared fetch
+        
+        A queued fetch is only cancelled once no other analyze call is
+        waiting on it, so one keyword's deadline never cancels another's page.
+        """
+        key = normalize_url(url)
+        with self._inflight_lock:
+            entry = self._inflight.get(key)
+            if entry is None or entry[0] is not future:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._inflight[key]
+        future.cancel()  # No-op if it already started or finished
+    
+    def _forget_inflight(self, key: str, future: Future):
+        with self._inflight_lock:
+            entry = self._inflight.get(key)
+            if entry is not None and entry[0] is future:
+                del self._inflight[key]
+    
+    def _analyze_and_cache(self, url: str) -> dict:
+        """
+        Analyze a URL and cache the metrics if the page loaded
+        
+        Expired cache entries that carry ETag/Last-Modified are revalidated
+        with a conditional request instead of being downloaded again.
+        """
+        stale = self.cache.get_stale(url) if self.cache is not None else None
+        metrics = self.analyze_url(url, cached=stale) if stale else self.analyze_url(url)
+        if self.cache is not None and metrics['page_load_success']:
+            self.cache.set(url, metrics)
+        return metrics
+    
+    def _fetch_all(self, urls: List[str], deadline: Optional[float]) -> Dict[str, dict]:
+        """
+        Analyze unique URLs concurrently within a total time budget
+        
+        URLs that have not finished when the deadline passes are reported
+        as failed page loads.
+        """
+        futures = {url: self._submit(url) for url in dict.fromkeys(urls)}
+        done, not_done = wait(futures.values(), timeout=deadline)
+        
+        results = {}
+        for url, future in futures.items():
+            if future in done and not future.cancelled():
+                metrics = future.result()
+                # A shared fetch may have been started for an equivalent URL
+                results[url] = metrics if metrics['url'] == url else {**metrics, 'url': url}
+            else:
+                logger.warning(f"Deadline exceeded before {url} was analyzed")
+                results[url] = self._empty_metrics(url)
+            self._release(url, future)
+        
+        return results
+    
+    def _is_web_app(self, signals: PageSignals, url: str) -> bool:
         """
         Determine if site is a dedicated web app vs blog/content site
         
@@ -115,11 +387,8 @@ class QualityAnalyzer:
         - Domain suggests tool (e.g., "converter", "tool", "online")
         """
         # Check title and description
-        title = soup.find('title')
-        title_text = title.get_text().lower() if title else ''
-        
-        description = soup.find('meta', attrs={'name': 'description'})
-        desc_text = description.get('content', '').lower() if description else ''
+        title_text = signals.title.lower()
+        desc_text = signals.description.lower()
         
         # Web app keywords
         app_keywords = ['tool', 'converter', 'generator', 'editor', 'maker', 'creator', 
@@ -128,9 +397,9 @@ class QualityAnalyzer:
         has_app_keywords = any(kw in title_text or kw in desc_text for kw in app_keywords)
         
         # Check for interactive elements
-        has_file_input = soup.find('input', attrs={'type': 'file'}) is not None
-        has_forms = len(soup.find_all('form')) > 0
-        has_many_buttons = len(soup.find_all('button')) >= 2
+        has_file_input = signals.has_file_input
+        has_forms = signals.form_count > 0
+        has_many_buttons = signals.button_count >= 2
         
         # Check URL
         url_suggests_tool = any(kw in url.lower() for kw in ['tool', 'convert', 'generator', 'online'])
@@ -150,7 +419,7 @@ class QualityAnalyzer:
         
         return score >= 3
     
-    def _is_recent(self, soup: BeautifulSoup, headers: dict) -> bool:
+    def _is_recent(self, signals: PageSignals, headers: dict) -> bool:
         """
         Check if content appears to be recent (within last 2 years)
         """
@@ -171,19 +440,13 @@ class QualityAnalyzer:
                 pass
         
         # Check copyright year in footer
-        text = soup.get_text()
-        copyright_pattern = r'©\s*(\d{4})|copyright\s*(\d{4})'
-        matches = re.findall(copyright_pattern, text, re.IGNORECASE)
-        
-        for match in matches:
-            year = int(match[0] or match[1])
+        for year in signals.copyright_years:
             if year >= recent_threshold:
                 return True
         
         # Check meta tags
-        date_meta = soup.find('meta', attrs={'property': 'article:modified_time'})
-        if date_meta:
-            date_str = date_meta.get('content', '')
+        if signals.modified_time:
+            date_str = signals.modified_time
             year_match = re.search(r'\b(20\d{2})\b', date_str)
             if year_match and int(year_match.group(1)) >= recent_threshold:
                 return True
@@ -216,27 +479,55 @@ class QualityAnalyzer:
         
         return score
     
-    def analyze_competitors(self, urls: List[str]) -> dict:
+    def analyze_competitors(self, urls: List[str], deadline: Optional[float] = None) -> dict:
         """
         Analyze multiple competitor URLs and return aggregate metrics
         
+        URLs are fetched concurrently, subject to the global and per-domain limits.
+        
         Args:
             urls: List of competitor URLs
+            deadline: Total seconds allowed (default: analyzer deadline)
             
         Returns:
             Dict with average quality and detailed analyses
         """
         if not urls:
+            return self._aggregate([])
+        
+        fetched = self._fetch_all(urls, deadline if deadline is not None else self.deadline)
+        return self._aggregate([fetched[url] for url in urls])
+    
+    def analyze_competitor_sets(
+        self,
+        url_sets: List[List[str]],
+        deadline: Optional[float] = None
+    ) -> List[dict]:
+        """
+        Analyze competitor URLs for several keywords at once
+        
+        All URLs across all sets are fetched concurrently under one deadline;
+        URLs shared by several keywords are only fetched once.
+        
+        Args:
+            url_sets: One list of competitor URLs per keyword
+            deadline: Total seconds allowed (default: analyzer deadline)
+            
+        Returns:
+            One analyze_competitors-shaped dict per input set, in input order
+        """
+        all_urls = [url for urls in url_sets for url in urls]
+        fetched = self._fetch_all(all_urls, deadline if deadline is not None else self.deadline)
+        return [self._aggregate([fetched[url] for url in urls]) for urls in url_sets]
+    
+    def _aggregate(self, analyses: List[dict]) -> dict:
+        """Build the aggregate competitor summary from per-URL analyses"""
+        if not analyses:
             return {
                 'average_quality': 0.0,
                 'analyses': []
             }
         
-        analyses = []
-        for url in urls:
-            analysis = self.analyze_url(url)
-            analyses.append(analysis)
-        
         # Calculate average quality
         quality_scores = [a['quality_score'] for a in analyses]
         avg_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0.0
@@ -0,0 +1,216 @@
+"""
+Competitor quality cache
+Reuses page quality metrics across keywords and runs, keyed by normalized URL
+"""
+import threading
+import time
+import logging
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from cache.sqlite_cache import SqliteCache, make_key
+from metrics import Metrics, get_shared_metrics
+
+logger = logging.getLogger(__name__)
+
+# Table holding quality metrics per normalized URL (and per host)
+QUALITY_CACHE_TABLE = 'quality_metrics'
+
+# Query parameters that never change page content
+_TRACKING_PARAMS = frozenset({'gclid', 'fbclid', 'msclkid', 'ref', 'srsltid'})
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different links share one cache entry
+    
+    Lower-cases scheme and host, drops "www.", default ports, fragments,
+    tracking parameters and trailing slashes, and sorts the query string.
+    
+    Args:
+        url: URL as returned by the SERP
+    
+    Returns:
+        Normalized URL
+    """
+    parts = urlparse(url.strip())
+    scheme = (parts.scheme or 'http').lower()
+    host = normalize_host(parts.hostname or '')
+    
+    port = parts.port
+    netloc = host if port is None or (scheme, port) in (('http', 80), ('https', 443)) else f'{host}:{port}'
+    
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in _TRACKING_PARAMS
+    ))
+    return urlunparse((scheme, netloc, path, '', query, ''))
+
+
+def normalize_host(host: str) -> str:
+    """Lower-case a hostname and drop a leading "www." """
+    host = host.lower().rstrip('.')
+    return host[4:] if host.startswith('www.') else host
+
+
+class QualityCache:
+    """Quality metrics cache shared across keywords, scans and entry points"""
+    
+    def __init__(
+        self,
+        store: Optional[SqliteCache] = None,
+        ttl: Optional[float] = None,
+        domain_fallback: bool = False,
+        metrics: Optional[Metrics] = None
+    ):
+        """
+        Initialize quality cache
+        
+        Args:
+            store: Persistent table for metrics (default: in-memory only)
+            ttl: Seconds cached metrics stay fresh (None = never expire)
+            domain_fallback: On a URL miss, reuse fresh metrics from another page on the same host
+            metrics: Registry counting hits and misses (default: the process-wide registry)
+        """
+        self.store = store
+        self.ttl = ttl
+        self.domain_fallback = domain_fallback
+        self.metrics = metrics or get_shared_metrics()
+        self.hits = 0
+        self.misses = 0
+        self._memory: Dict[str, Tuple[dict, float]] = {}
+        self._lock = threading.Lock()
+    
+    def _load(self, key: str) -> Optional[Tuple[dict, float]]:
+        """Get an entry with its timestamp from memory, then the persistent store"""
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is None and self.store is not None:
+            entry = self.store.get_entry(key)
+            if entry is not None:
+                with self._lock:
+                    self._memory[key] = entry
+        return entry
+    
+    def _fresh(self, stored_at: float) -> bool:
+        return self.ttl is None or time.time() - stored_at <= self.ttl
+    
+    def get(self, url: str) -> Optional[dict]:
+        """
+        Get fresh cached metrics for a URL
+        
+        Args:
+            url: Competitor URL
+        
+        Returns:
+            Copy of the metrics with 'url' set to the requested URL, or None
+        """
+        entry = self._load(make_key('url', normalize_url(url)))
+        if (entry is None or not self._fresh(entry[1])) and self.domain_fallback:
+            host = normalize_host(urlparse(url).hostname or '')
+            entry = self._load(make_key('host', host))
+        
+        with self._lock:
+            hit = entry is not None and self._fresh(entry[1])
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        self.metrics.incr(f"cache.{QUALITY_CACHE_TABLE}.{'hit' if hit else 'miss'}")
+        if not hit:
+            return None
+        
+        metrics = dict(entry[0]['metrics'])
+        metrics['url'] = url
+        return metrics
+    
+    def get_stale(self, url: str) -> Optional[dict]:
+        """
+        Get stored metrics for a URL that can be revalidated, fresh or not
+        
+        Args:
+            url: Competitor URL
+        
+        Returns:
+            Copy of the metrics if they carry an ETag or Last-Modified validator, else None
+        """
+        entry = self._load(make_key('url', normalize_url(url)))
+        if entry is None:
+            return None
+        metrics = entry[0]['metrics']
+        if not (metrics.get('etag') or metrics.get('last_modified')):
+            return None
+        return {**metrics, 'url': url}
+    
+    def set(self, url: str, metrics: dict):
+        """
+        Store metrics for a URL (and as its host's latest metrics)
+        
+        Args:
+            url: Competitor URL
+            metrics: Metrics dict from QualityAnalyzer.analyze_url
+        """
+        value = {'metrics': metrics}
+        stored_at = time.time()
+        keys = [make_key('url', normalize_url(url))]
+        if self.domain_fallback:
+            keys.append(make_key('host', normalize_host(urlparse(url).hostname or '')))
+        
+        for key in keys:
+            with self._lock:
+                self._memory[key] = (value, stored_at)
+            if self.store is not None:
+                self.store.set(key, value)
+    
+    def summary(self) -> str:
+        """One-line summary of this run's cache usage"""
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"Quality cache: {self.hits} pages reused, {self.misses} fetched ({rate:.0%} hit rate)"
+    
+    def count(self, kind: str = 'url') -> int:
+        """
+        Count stored entries of one kind
+        
+        Args:
+            kind: 'url' for competitor pages, 'host' for domain fallback entries
+        
+        Returns:
+            Number of entries
+        """
+        # make_key() output is a JSON list, so every key of a kind shares this prefix
+        prefix = make_key(kind)[:-1] + ','
+        if self.store is not None:
+            return self.store.count(prefix)
+        with self._lock:
+            return sum(1 for key in self._memory if key.startswith(prefix))
+    
+    def __len__(self) -> int:
+        """Number of cached competitor pages (domain fallback entries are not counted)"""
+        return self.count('url')
+
+
+_shared_cache: Optional[QualityCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_quality_cache(config) -> QualityCache:
+    """
+    Get the process-wide quality cache, opening it from config on first use
+    
+    Args:
+        config: Config class with CACHE_DB and the QUALITY_CACHE_* settings
+    
+    Returns:
+        Shared QualityCache instance
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = QualityCache(
+                store=SqliteCache(config.CACHE_DB, QUALITY_CACHE_TABLE),
+                ttl=config.QUALITY_CACHE_TTL,
+                domain_fallback=config.QUALITY_CACHE_DOMAIN_FALLBACK
+            )
+        return _shared_cache
@@ -0,0 +1,206 @@
+"""
+Per-host token-bucket rate limiting
+Replaces fixed sleeps so idle time is only spent when a host's budget is exhausted
+"""
+import threading
+import time
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from metrics import Metrics, get_shared_metrics
+
+logger = logging.getLogger(__name__)
+
+# Upstream hosts used by the scanner services
+TRENDS_HOST = 'trends.google.com'
+TRANSLATE_HOST = 'translate.google.com'
+SERPAPI_HOST = 'serpapi.com'
+# Counter label for hosts without an explicit budget (competitor pages)
+OTHER_HOSTS_LABEL = 'competitor'
+# All Google search domains are served from the same scraping IP, so they share one budget
+GOOGLE_SEARCH_HOSTS = ('www.google.com', 'www.google.com.br')
+
+
+class TokenBucket:
+    """Thread-safe token bucket that refills at a fixed rate up to a burst size"""
+    
+    def __init__(self, interval: float, burst: int = 1):
+        """
+        Initialize token bucket
+        
+        Args:
+            interval: Seconds per token (0 disables limiting)
+            burst: Maximum number of tokens that can accumulate while idle
+        """
+        self.interval = max(0.0, interval)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Take one token, returning how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.interval)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens * self.interval)
+    
+    def acquire(self) -> float:
+        """
+        Block until a token is available
+        
+        Returns:
+            Seconds spent waiting
+        """
+        if self.interval == 0:
+            return 0.0
+        
+        # Reserve under the lock, sleep outside it so other callers can queue up
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """Registry of token buckets keyed by upstream host"""
+    
+    def __init__(
+        self,
+        default_interval: float = 1.0,
+        default_burst: int = 1,
+        metrics: Optional[Metrics] = None
+    ):
+        """
+        Initialize rate limiter
+        
+        Args:
+            default_interval: Seconds per request for hosts without explicit limits
+            default_burst: Burst allowance for hosts without explicit limits
+            metrics: Registry counting network calls and rate-limit waits per upstream
+                (default: the process-wide registry)
+        """
+        self.default_interval = default_interval
+        self.default_burst = default_burst
+        self.metrics = metrics or get_shared_metrics()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._aliases: Dict[str, str] = {}
+        self._named = set()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config) -> 'RateLimiter':
+        """
+        Build a limiter with the per-upstream budgets defined in Config
+        
+        Args:
+            config: Config class (or any object with the same attributes)
+        
+        Returns:
+            Configured RateLimiter
+        """
+        limiter = cls(
+            default_interval=config.QUALITY_RATE_LIMIT,
+            default_burst=config.QUALITY_RATE_BURST
+        )
+        limiter.configure(TRENDS_HOST, config.TRENDS_RATE_LIMIT, config.TRENDS_RATE_BURST)
+        limiter.configure(TRANSLATE_HOST, config.TRANSLATE_RATE_LIMIT, config.TRANSLATE_RATE_BURST)
+        limiter.configure(SERPAPI_HOST, 0)
+        primary, *others = GOOGLE_SEARCH_HOSTS
+        limiter.configure(primary, config.SERP_RATE_LIMIT, config.SERP_RATE_BURST)
+        for host in others:
+            limiter.alias(host, primary)
+        return limiter
+    
+    def configure(self, host: str, interval: float, burst: int = 1):
+        """
+        Set the budget for a host, replacing any existing bucket
+        
+        Args:
+            host: Hostname (e.g. 'trends.google.com')
+            interval: Seconds per request
+            burst: Requests allowed back-to-back after an idle period
+        """
+        with self._lock:
+            self._buckets[host.lower()] = TokenBucket(interval, burst)
+            self._named.add(host.lower())
+    
+    def alias(self, host: str, target: str):
+        """
+        Make a host draw from another host's bucket
+        
+        Args:
+            host: Hostname to redirect (e.g. 'www.google.com.br')
+            target: Hostname whose budget it shares (e.g. 'www.google.com')
+        """
+        with self._lock:
+            self._aliases[host.lower()] = target.lower()
+            self._named.add(host.lower())
+    
+    def _bucket(self, host: str) -> TokenBucket:
+        """Get the bucket for a host, creating a default one on first use"""
+        host = host.lower()
+        with self._lock:
+            host = self._aliases.get(host, host)
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.default_interval, self.default_burst)
+                self._buckets[host] = bucket
+            return bucket
+    
+    def acquire(self, host: str) -> float:
+        """
+        Wait for the host's budget to allow one request
+        
+        Args:
+            host: Hostname being called
+        
+        Returns:
+            Seconds spent waiting
+        """
+        waited = self._bucket(host).acquire()
+        if waited > 0:
+            logger.debug(f"Rate limited {host}: waited {waited:.2f}s")
+        
+        # Every upstream request passes through here, so this counts network calls
+        label = host.lower() if host.lower() in self._named else OTHER_HOSTS_LABEL
+        self.metrics.incr(f'network.{label}')
+        if waited > 0:
+            self.metrics.observe(f'rate_wait.{label}', waited)
+        return waited
+    
+    def acquire_url(self, url: str) -> float:
+        """
+        Wait for the budget of the host a URL points to
+        
+        Args:
+            url: Full URL being requested
+        
+        Returns:
+            Seconds spent waiting
+        """
+        return self.acquire(urlparse(url).hostname or '')
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter(config) -> RateLimiter:
+    """
+    Get the process-wide limiter, building it from config on first use
+    
+    Args:
+        config: Config class used to configure the buckets
+    
+    Returns:
+        Shared RateLimiter instance
+    """
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter.from_config(config)
+        return _shared_limiter
@@ -0,0 +1,273 @@
+"""
+Retry, backoff and circuit breaking for upstream calls
+Transient failures are retried; persistent ones raise UpstreamError instead of becoming zero scores
+"""
+import random
+import threading
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, TypeVar
+
+import requests
+
+from metrics import Metrics, get_shared_metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# HTTP statuses worth retrying (rate limited or server-side trouble)
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class UpstreamError(Exception):
+    """An upstream call failed for good (retries exhausted, not retryable, or circuit open)"""
+    
+    def __init__(self, upstream: str, message: str):
+        super().__init__(f"{upstream}: {message}")
+        self.upstream = upstream
+
+
+class CircuitOpenError(UpstreamError):
+    """The upstream's circuit breaker is open, so the call was not attempted"""
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    """HTTP status attached to an exception (requests and pytrends errors carry .response)"""
+    response = getattr(exc, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Decide whether a failed call is worth repeating
+    
+    Connection errors, timeouts and 429/5xx responses are transient; anything
+    else (4xx, parse errors, bugs) would fail the same way again.
+    """
+    status = status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    return isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """
+    Seconds the upstream asked us to wait (Retry-After header), if any
+    
+    Both forms are accepted: delay-seconds and an HTTP date.
+    """
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Per-upstream breaker: opens after consecutive failures, probes again after a cool-down"""
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 120.0):
+        """
+        Initialize circuit breaker
+        
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before one trial call is let through
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+    
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return time.monotonic() < self._open_until
+    
+    def allow(self) -> bool:
+        """
+        Check whether a call may go out now
+        
+        Returns:
+            False while open; after the cool-down, True for a single trial call
+        """
+        with self._lock:
+            if self.failures < self.failure_threshold and not self._open_until:
+                return True
+            if time.monotonic() < self._open_until or self._probing:
+                return False
+            self._probing = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._open_until = 0.0
+            self._probing = False
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.failures >= self.failure_threshold:
+                self._open_until = time.monotonic() + self.reset_timeout
+    
+    def open_for(self, seconds: float):
+        """Open the circuit for at least the given time (e.g. a long Retry-After)"""
+        with self._lock:
+            self.failures = max(self.failures, self.failure_threshold)
+            self._probing = False
+            self._open_until = max(self._open_until, time.monotonic() + seconds)
+
+
+class RetryPolicy:
+    """Runs upstream calls with exponential backoff, full jitter and a breaker per upstream"""
+    
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 120.0,
+        metrics: Optional[Metrics] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialize retry policy
+        
+        Args:
+            max_retries: Retries after the first attempt (0 = fail fast)
+            base_delay: Backoff before the first retry; doubles each retry (with full jitter)
+            max_delay: Longest single wait; a longer Retry-After opens the circuit instead
+            failure_threshold: Consecutive failures that open an upstream's circuit
+            reset_timeout: Seconds an open circuit waits before a trial call
+            metrics: Registry counting retries and open circuits (default: the process-wide registry)
+            sleep: Sleep function (replaceable in tests)
+        """
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.metrics = metrics or get_shared_metrics()
+        self.sleep = sleep
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config) -> 'RetryPolicy':
+        """
+        Build a policy from Config (MAX_RETRIES, RETRY_DELAY, RETRY_MAX_DELAY, CIRCUIT_*)
+        
+        Args:
+            config: Config class (or any object with the same attributes)
+        
+        Returns:
+            Configured RetryPolicy
+        """
+        return cls(
+            max_retries=config.MAX_RETRIES,
+            base_delay=config.RETRY_DELAY,
+            max_delay=config.RETRY_MAX_DELAY,
+            failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=config.CIRCUIT_RESET_TIMEOUT
+        )
+    
+    def breaker(self, upstream: str) -> CircuitBreaker:
+        """Get the breaker for an upstream, creating it on first use"""
+        with self._lock:
+            breaker = self._breakers.get(upstream)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._breakers[upstream] = breaker
+            return breaker
+    
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number attempt + 1"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+    
+    def call(self, upstream: str, fn: Callable[[], T]) -> T:
+        """
+        Call fn, retrying transient failures
+        
+        fn should perform the whole request, including rate-limit acquisition,
+        since each retry is a new request.
+        
+        Args:
+            upstream: Upstream name (one breaker and retry counter per name)
+            fn: Zero-argument callable making the request
+        
+        Returns:
+            fn's result
+        
+        Raises:
+            CircuitOpenError: The upstream's circuit is open
+            UpstreamError: The call failed and is not retryable, or retries ran out
+        """
+        breaker = self.breaker(upstream)
+        for attempt in range(self.max_retries + 1):
+            if not breaker.allow():
+                self.metrics.incr(f'circuit_open.{upstream}')
+                raise CircuitOpenError(upstream, "circuit open after repeated failures")
+            
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_retryable(e):
+                    # The upstream answered; this request is just bad
+                    breaker.record_success()
+                    raise UpstreamError(upstream, str(e)) from e
+                
+                breaker.record_failure()
+                requested = retry_after(e)
+                if requested is not None and requested > self.max_delay:
+                    breaker.open_for(requested)
+                    logger.warning(f"⛔ {upstream} asked us to back off for {requested:.0f}s, opening circuit")
+                    raise CircuitOpenError(upstream, f"Retry-After {requested:.0f}s") from e
+                if attempt == self.max_retries:
+                    raise UpstreamError(upstream, f"failed after {attempt + 1} attempt(s): {e}") from e
+                
+                delay = requested if requested is not None else self.backoff(attempt)
+                self.metrics.incr(f'retries.{upstream}')
+                logger.warning(
+                    f"🔁 {upstream} failed ({e}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+                )
+                self.sleep(delay)
+            else:
+                breaker.record_success()
+                return result
+        raise AssertionError("unreachable")
+
+
+_shared_policy: Optional[RetryPolicy] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_retry_policy(config) -> RetryPolicy:
+    """
+    Get the process-wide retry policy (one breaker per upstream for the whole run)
+    
+    Args:
+        config: Config class with the retry settings
+    
+    Returns:
+        Shared RetryPolicy instance
+    """
+    global _shared_policy
+    with _shared_lock:
+        if _shared_policy is None:
+            _shared_policy = RetryPolicy.from_config(config)
+        return _shared_policy
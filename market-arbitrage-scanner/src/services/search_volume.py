@@ -3,35 +3,130 @@ Search volume service using Google Trends (free)
 Returns relative interest scores (0-100) instead of absolute volumes
 """
 from pytrends.request import TrendReq
-import time
+import threading
 import logging
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from cache.sqlite_cache import SqliteCache, make_key
+from services.rate_limiter import RateLimiter, TRENDS_HOST
+from services.retry import RetryPolicy, UpstreamError
 
 logger = logging.getLogger(__name__)
 
+# Table shared by every Trends interest lookup (MarketScanner and BR research)
+TRENDS_CACHE_TABLE = 'trends_interest'
+
+# Google Trends compares at most five terms per payload
+MAX_TERMS_PER_PAYLOAD = 5
+
+
+def trends_cache_key(keyword: str, geo: str, timeframe: str, anchor: Optional[str] = None) -> str:
+    """
+    Cache key for an interest score; Trends ignores keyword case
+    
+    Anchored (batched) scores live on a different scale than single-keyword
+    scores, so the anchor term is part of the key.
+    """
+    parts = [keyword.strip().lower(), geo.upper(), timeframe]
+    if anchor:
+        parts.append(f"anchor:{anchor.strip().lower()}")
+    return make_key(*parts)
+
+
+def anchor_fallback_key(anchor: str, geo: str, timeframe: str) -> str:
+    """Cache key recording which keyword replaced an anchor that had no data"""
+    return make_key('anchor_fallback', anchor.strip().lower(), geo.upper(), timeframe)
+
 
 class SearchVolumeService:
     """Free search volume estimation using Google Trends"""
     
-    def __init__(self, timeframe: str = 'today 12-m'):
+    def __init__(
+        self,
+        timeframe: str = 'today 12-m',
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[SqliteCache] = None,
+        cache_ttl: Optional[float] = None,
+        batching: bool = False,
+        anchor_terms: Optional[Dict[str, str]] = None,
+        anchor_score: Union[int, Dict[str, int]] = 50,
+        retry: Optional[RetryPolicy] = None,
+        hl: str = 'en-US',
+        tz: int = 360
+    ):
         """
         Initialize Google Trends client
         
         Args:
             timeframe: Google Trends timeframe (default: last 12 months)
+            rate_limiter: Shared per-host limiter (default: private 2s/request budget)
+            cache: Persistent interest score cache (default: no caching)
+            cache_ttl: Seconds a cached score stays fresh (None = never expires)
+            batching: Use anchored multi-keyword payloads in compare_markets
+            anchor_terms: Anchor term per geo for batched payloads
+                (default: first keyword of each batch)
+            anchor_score: Score the anchor term is pinned to after renormalization,
+                either one value or one per geo. Scores are capped at 100, so keywords
+                more than 100/anchor_score times as popular as the anchor tie at 100.
+            retry: Retry policy for Trends requests (default: private policy)
+            hl: Trends interface language, e.g. 'pt-BR'
+            tz: Timezone offset in minutes, as Trends expects it (e.g. -180 for Brasília)
         """
         self.timeframe = timeframe
+        self.hl = hl
+        self.tz = tz
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.batching = batching
+        self.anchor_terms = {geo.upper(): term for geo, term in (anchor_terms or {}).items()}
+        if isinstance(anchor_score, dict):
+            self.anchor_scores = {geo.upper(): score for geo, score in anchor_score.items()}
+            self.anchor_score = 50
+        else:
+            self.anchor_scores = {}
+            self.anchor_score = anchor_score
+        if rate_limiter is None:
+            rate_limiter = RateLimiter()
+            rate_limiter.configure(TRENDS_HOST, 2.0)
+        self.rate_limiter = rate_limiter
+        self.retry = retry or RetryPolicy()
         self.pytrends = None
+        # pytrends keeps payload state on the client, so requests must not interleave
+        self._lock = threading.Lock()
         self._init_client()
     
     def _init_client(self):
         """Initialize pytrends client"""
         try:
-            self.pytrends = TrendReq(hl='en-US', tz=360)
+            self.pytrends = TrendReq(hl=self.hl, tz=self.tz)
             logger.info("Google Trends client initialized")
         except Exception as e:
             logger.error(f"Failed to initialize Google Trends: {e}")
     
+    def _fetch(self, terms: List[str], geo: str, method: str = 'interest_over_time'):
+        """
+        Run one Trends payload with retries
+        
+        Args:
+            terms: Keywords for the payload (at most five)
+            geo: Geography code
+            method: TrendReq method to call once the payload is built
+        
+        Returns:
+            The method's result
+        
+        Raises:
+            UpstreamError: Trends failed after retries, or its circuit is open
+        """
+        def attempt():
+            with self._lock:
+                # Wait for the Trends budget (every retry is a new request)
+                self.rate_limiter.acquire(TRENDS_HOST)
+                self.pytrends.build_payload(terms, cat=0, timeframe=self.timeframe, geo=geo, gprop='')
+                return getattr(self.pytrends, method)()
+        
+        return self.retry.call(TRENDS_HOST, attempt)
+    
     def get_interest_score(self, keyword: str, geo: str) -> int:
         """
         Get relative interest score for a keyword in a specific geography
@@ -42,36 +137,234 @@ class SearchVolumeService:
             
         Returns:
             Interest score 0-100 (relative popularity)
+        
+        Raises:
+            UpstreamError: Trends could not answer; the keyword has no score, not a zero score
         """
-        try:
-            # Add delay to respect rate limits
-            time.sleep(2)
-            
-            # Build payload
-            self.pytrends.build_payload(
-                [keyword],
-                cat=0,
-                timeframe=self.timeframe,
-                geo=geo,
-                gprop=''
-            )
-            
-            # Get interest over time
-            interest_df = self.pytrends.interest_over_time()
-            
-            if interest_df.empty or keyword not in interest_df.columns:
-                logger.warning(f"No data for '{keyword}' in {geo}")
-                return 0
-            
+        cache_key = trends_cache_key(keyword, geo, self.timeframe)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key, max_age=self.cache_ttl)
+            if cached is not None:
+                logger.debug(f"Trends cache hit for '{keyword}' in {geo}")
+                return cached
+        
+        interest_df = self._fetch([keyword], geo)
+        
+        if interest_df.empty or keyword not in interest_df.columns:
+            logger.warning(f"No data for '{keyword}' in {geo}")
+            avg_score = 0
+        else:
             # Calculate average interest score
             avg_score = int(interest_df[keyword].mean())
             logger.info(f"'{keyword}' in {geo}: interest score = {avg_score}")
+        
+        # Only real answers are cached; failures raise before reaching here
+        if self.cache is not None:
+            self.cache.set(cache_key, avg_score)
+        
+        return avg_score
+    
+    def get_interest_scores(self, keywords: List[str], geo: str) -> Dict[str, int]:
+        """
+        Get interest scores for many keywords using batched Trends payloads
+        
+        Keywords are packed four per payload together with a shared anchor term.
+        Each keyword's mean is divided by the anchor's mean in the same payload
+        and rescaled so the anchor sits at `anchor_score` (capped at 100), which
+        keeps keywords from different payloads comparable. If the anchor has no
+        data in a payload, the first keyword with data takes its place (and is
+        remembered in the cache) and the call starts over on the new anchor, so
+        payloads fetched earlier are re-fetched and every returned score sits on
+        one anchored scale.
+        
+        Args:
+            keywords: Search keywords
+            geo: Geography code ('US', 'BR', etc.)
             
-            return avg_score
-            
-        except Exception as e:
-            logger.error(f"Error getting interest for '{keyword}' in {geo}: {e}")
-            return 0
+        Returns:
+            Dict mapping each input keyword to its anchored score (0-100)
+        
+        Raises:
+            UpstreamError: A payload failed (scores of earlier payloads stay cached)
+        """
+        # Trends is case-insensitive, so case variants share one slot
+        unique: Dict[str, str] = {}
+        for keyword in keywords:
+            if keyword:
+                unique.setdefault(keyword.strip().lower(), keyword.strip())
+        if not unique:
+            return {}
+        
+        anchor = self._anchor(geo, next(iter(unique.values())))
+        tried = set()
+        while True:
+            tried.add(anchor.strip().lower())
+            scores, pending, fallback = self._anchored_scores(unique, anchor, geo, tried)
+            if fallback is None:
+                break
+            anchor = fallback
+        
+        if len(unique) > len(pending):
+            logger.info(f"Trends cache served {len(unique) - len(pending)}/{len(unique)} keywords in {geo}")
+        
+        return {k: scores.get(k.strip().lower(), 0) for k in keywords if k}
+    
+    def _anchored_scores(
+        self,
+        unique: Dict[str, str],
+        anchor: str,
+        geo: str,
+        tried: Set[str]
+    ) -> Tuple[Dict[str, int], List[str], Optional[str]]:
+        """
+        Scores for every keyword on one anchor's scale, from cache or batched payloads
+        
+        Args:
+            unique: Lower-cased keyword -> keyword
+            anchor: Anchor term
+            geo: Geography code
+            tried: Lower-cased anchors already used in this call
+        
+        Returns:
+            (lower-cased keyword -> score, keywords that were not cached,
+             fallback anchor if a payload re-anchored and the caller must
+             start over on it, else None)
+        """
+        anchor_norm = anchor.strip().lower()
+        scores: Dict[str, int] = {}
+        pending = []
+        for norm, keyword in unique.items():
+            cached = self._cache_get(trends_cache_key(keyword, geo, self.timeframe, anchor))
+            if cached is not None:
+                scores[norm] = cached
+            else:
+                pending.append(keyword)
+        
+        others = [k for k in pending if k.lower() != anchor_norm]
+        step = MAX_TERMS_PER_PAYLOAD - 1
+        groups = [others[i:i + step] for i in range(0, len(others), step)]
+        if not groups and pending:
+            groups = [[]]  # Only the anchor itself was requested
+        
+        for group in groups:
+            group_scores, used_anchor = self._fetch_anchored_group(group, anchor, geo)
+            if used_anchor != anchor:
+                if used_anchor.strip().lower() not in tried:
+                    # Scores so far are on the old anchor's scale: start over on the fallback
+                    return scores, pending, used_anchor
+                logger.warning(
+                    f"Anchors '{anchor}' and '{used_anchor}' keep replacing each other in {geo}; "
+                    f"some scores are on '{used_anchor}' scale"
+                )
+            scores.update(group_scores)
+        return scores, pending, None
+    
+    def forecast_requests(self, keywords: List[str], geo: str) -> Tuple[int, int]:
+        """
+        Count cached scores and the Trends requests the rest would take, without any network call
+        
+        Args:
+            keywords: Search keywords
+            geo: Geography code ('US', 'BR', etc.)
+        
+        Returns:
+            (keywords served from the cache, Trends requests needed for the others)
+        """
+        unique: Dict[str, str] = {}
+        for keyword in keywords:
+            if keyword and keyword.strip():
+                unique.setdefault(keyword.strip().lower(), keyword.strip())
+        if not unique:
+            return 0, 0
+        
+        if not self.batching:
+            pending = [k for k in unique.values() if self._cache_get(trends_cache_key(k, geo, self.timeframe)) is None]
+            return len(unique) - len(pending), len(pending)
+        
+        anchor = self._anchor(geo, next(iter(unique.values())))
+        pending = [
+            k for k in unique.values()
+            if self._cache_get(trends_cache_key(k, geo, self.timeframe, anchor)) is None
+        ]
+        others = sum(1 for k in pending if k.lower() != anchor.strip().lower())
+        step = MAX_TERMS_PER_PAYLOAD - 1
+        requests = -(-others // step) if others else int(bool(pending))
+        return len(unique) - len(pending), requests
+    
+    def _anchor(self, geo: str, first_keyword: str) -> str:
+        """Anchor term for a geo's batched payloads (after following remembered no-data fallbacks)"""
+        anchor = self.anchor_terms.get(geo.upper()) or first_keyword
+        seen = {anchor.strip().lower()}
+        while True:
+            fallback = self._cache_get(anchor_fallback_key(anchor, geo, self.timeframe))
+            if not fallback or fallback.strip().lower() in seen:
+                return anchor
+            anchor = fallback
+            seen.add(anchor.strip().lower())
+    
+    def _fetch_anchored_group(self, group: List[str], anchor: str, geo: str) -> Tuple[Dict[str, int], str]:
+        """
+        Fetch one payload of up to four keywords plus the anchor
+        
+        Returns:
+            (dict of lower-cased keyword -> anchored score (the anchor included),
+             anchor to use for the remaining payloads)
+        
+        Raises:
+            UpstreamError: Trends could not answer this payload
+        """
+        group = [k for k in group if k.strip().lower() != anchor.strip().lower()]
+        terms = [anchor] + group
+        interest_df = self._fetch(terms, geo)
+        
+        means = {}
+        for term in terms:
+            if not interest_df.empty and term in interest_df.columns:
+                means[term] = float(interest_df[term].mean())
+            else:
+                means[term] = 0.0
+        
+        anchor_mean = means[anchor]
+        if anchor_mean <= 0:
+            # Re-anchor on a keyword from this payload so its scores stay on one scale
+            fallback = next((k for k in group if means[k] > 0), None)
+            if fallback is None:
+                # No term has data: zero on every scale, nothing to renormalize
+                return {k.lower(): 0 for k in terms}, anchor
+            logger.warning(f"Anchor '{anchor}' has no data in {geo}, re-anchoring on '{fallback}'")
+            self._cache_set(anchor_fallback_key(anchor, geo, self.timeframe), fallback)
+            anchor, anchor_mean = fallback, means[fallback]
+        
+        anchor_score = self.anchor_scores.get(geo.upper(), self.anchor_score)
+        results = {}
+        capped = []
+        for term in terms:
+            raw = int(round(means[term] / anchor_mean * anchor_score))
+            if raw > 100:
+                capped.append(term)
+            score = min(100, raw)
+            results[term.lower()] = score
+            self._cache_set(trends_cache_key(term, geo, self.timeframe, anchor), score)
+        
+        logger.info(f"Batched Trends ({geo}, anchor '{anchor}'): " +
+                    ", ".join(f"{t}={results[t.lower()]}" for t in group))
+        if capped:
+            logger.warning(
+                f"Capped at 100 in {geo} (over {100 / anchor_score:.1f}x anchor '{anchor}'): "
+                f"{', '.join(capped)}; lower the anchor score to tell them apart"
+            )
+        return results, anchor
+    
+    def _cache_get(self, key: str) -> Optional[Any]:
+        """Read a fresh value (score or fallback anchor) from the cache, if caching is enabled"""
+        if self.cache is None:
+            return None
+        return self.cache.get(key, max_age=self.cache_ttl)
+    
+    def _cache_set(self, key: str, score: int):
+        """Store a score in the cache, if caching is enabled"""
+        if self.cache is not None:
+            self.cache.set(key, score)
     
     def compare_markets(self, keyword_us: str, keyword_br: str) -> Dict[str, int]:
         """
@@ -84,6 +377,9 @@ class SearchVolumeService:
         Returns:
             Dict with 'US' and 'BR' scores
         """
+        if self.batching:
+            return self.compare_markets_batch([(keyword_us, keyword_br)])[0]
+        
         results = {
             'US': self.get_interest_score(keyword_us, 'US'),
             'BR': self.get_interest_score(keyword_br, 'BR')
@@ -92,6 +388,24 @@ class SearchVolumeService:
         logger.info(f"Market comparison: {keyword_us} (US: {results['US']}) vs {keyword_br} (BR: {results['BR']})")
         return results
     
+    def compare_markets_batch(self, pairs: List[Tuple[str, str]]) -> List[Dict[str, int]]:
+        """
+        Compare US and BR interest for many keyword pairs with batched payloads
+        
+        Args:
+            pairs: (English keyword, Portuguese keyword) tuples
+            
+        Returns:
+            One {'US': score, 'BR': score} dict per pair, in input order
+        """
+        us_scores = self.get_interest_scores([us for us, _ in pairs], 'US')
+        br_scores = self.get_interest_scores([br for _, br in pairs], 'BR')
+        
+        results = [{'US': us_scores.get(us, 0), 'BR': br_scores.get(br, 0)} for us, br in pairs]
+        for (us, br), result in zip(pairs, results):
+            logger.info(f"Market comparison: {us} (US: {result['US']}) vs {br} (BR: {result['BR']})")
+        return results
+    
     def get_related_queries(self, keyword: str, geo: str) -> Optional[Dict]:
         """
         Get related queries (bonus feature for additional insights)
@@ -104,20 +418,8 @@ class SearchVolumeService:
             Dict with related queries or None
         """
         try:
-            time.sleep(2)
-            
-            self.pytrends.build_payload(
-                [keyword],
-                cat=0,
-                timeframe=self.timeframe,
-                geo=geo,
-                gprop=''
-            )
-            
-            related = self.pytrends.related_queries()
-            return related
-            
-        except Exception as e:
+            return self._fetch([keyword], geo, method='related_queries')
+        except UpstreamError as e:
             logger.error(f"Error getting related queries for '{keyword}': {e}")
             return None
 
@@ -0,0 +1,151 @@
+"""
+Single-pass organic link extraction for Google SERP pages
+Classifies every link in one streaming parse instead of re-scanning a DOM once per selector
+"""
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+from lxml import etree
+
+# Hosts that are never organic results (matched on the hostname and its parent domains)
+BLOCKED_DOMAINS = frozenset({
+    'google.com', 'google.com.br', 'youtube.com', 'youtu.be',
+    'googleusercontent.com', 'googleadservices.com', 'gstatic.com',
+})
+
+# Link tiers, most specific first (the order SerpScraper used to try its CSS selectors)
+RESULT_LINK = 0     # div.yuRUbf > a
+RESULT_JSNAME = 1   # a[jsname="UWckNb"]
+IN_RESULT_DIV = 2   # div.g a[href^="http"]
+IN_SEARCH = 3       # div#search a[href^="http"]
+ANY_LINK = 4        # a[href^="http"]
+_TIER_COUNT = 5
+
+# Parse in chunks so extraction can stop once the most specific tier fills the answer
+_CHUNK_CHARS = 16 * 1024
+
+
+def is_blocked_host(host: str) -> bool:
+    """
+    Check a hostname against the blocklist, including subdomains
+    
+    Args:
+        host: Lower-case hostname (e.g. 'support.google.com')
+    
+    Returns:
+        True if the host or any parent domain is blocked
+    """
+    labels = host.split('.')
+    return any('.'.join(labels[i:]) in BLOCKED_DOMAINS for i in range(len(labels) - 1))
+
+
+class _LinkTarget:
+    """lxml parser target that sorts links into tiers as tags stream past"""
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.tiers: List[Dict[str, None]] = [{} for _ in range(_TIER_COUNT)]
+        self.fallback: Dict[str, None] = {}  # Any http link whose host isn't Google's
+        self._stack: List[tuple] = []  # (is div.yuRUbf, is div.g, is div#search) per open element
+        self._in_result_div = 0
+        self._in_search = 0
+    
+    @property
+    def done(self) -> bool:
+        """True once the most specific tier already holds the whole answer"""
+        return len(self.tiers[RESULT_LINK]) >= self.limit
+    
+    def start(self, tag, attrib):
+        parent_is_result = bool(self._stack) and self._stack[-1][0]
+        
+        if tag == 'div':
+            classes = attrib.get('class', '').split()
+            flags = ('yuRUbf' in classes, 'g' in classes, attrib.get('id') == 'search')
+        else:
+            flags = (False, False, False)
+        self._stack.append(flags)
+        self._in_result_div += flags[1]
+        self._in_search += flags[2]
+        
+        if tag == 'a':
+            self._link(attrib, parent_is_result)
+    
+    def _link(self, attrib, parent_is_result: bool):
+        href = attrib.get('href')
+        if not href or not href.startswith('http'):
+            return
+        host = (urlsplit(href).hostname or '').lower()
+        
+        if 'google' not in host:
+            self.fallback.setdefault(href)
+        if is_blocked_host(host):
+            return
+        
+        tiers = self.tiers
+        if parent_is_result:
+            tiers[RESULT_LINK].setdefault(href)
+        if attrib.get('jsname') == 'UWckNb':
+            tiers[RESULT_JSNAME].setdefault(href)
+        if self._in_result_div:
+            tiers[IN_RESULT_DIV].setdefault(href)
+        if self._in_search:
+            tiers[IN_SEARCH].setdefault(href)
+        tiers[ANY_LINK].setdefault(href)
+    
+    def end(self, tag):
+        if self._stack:
+            _, in_result_div, in_search = self._stack.pop()
+            self._in_result_div -= in_result_div
+            self._in_search -= in_search
+    
+    def data(self, data):
+        pass
+    
+    def close(self):
+        return self
+
+
+def extract_result_links(html: str, top_n: int = 3) -> List[str]:
+    """
+    Extract the top organic result URLs from a Google SERP in one parse
+    
+    Tiers are merged in order, as the old selector cascade did: links from
+    each tier are added (deduplicated, up to 2 × top_n) until at least top_n
+    are found. If no tier matches, any non-Google http link is used.
+    
+    Args:
+        html: Decoded SERP HTML
+        top_n: Number of URLs wanted
+    
+    Returns:
+        Up to top_n URLs in ranking order
+    """
+    target = _LinkTarget(limit=top_n)
+    parser = etree.HTMLParser(target=target, recover=True, no_network=True)
+    
+    fed = False
+    for start in range(0, len(html), _CHUNK_CHARS):
+        parser.feed(html[start:start + _CHUNK_CHARS])
+        fed = True
+        if target.done:
+            break
+    if fed:
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            pass  # Broken or truncated markup; keep what was collected
+    
+    urls: Dict[str, None] = {}
+    for tier in target.tiers:
+        for href in tier:
+            if href not in urls:
+                urls[href] = None
+                if len(urls) >= top_n * 2:
+                    break
+        if len(urls) >= top_n:
+            break
+    
+    if not urls:
+        urls = dict.fromkeys(list(target.fallback)[:top_n])
+    
+    return list(urls)[:top_n]
@@ -3,12 +3,15 @@ SERP (Search Engine Results Page) scraper
 Scrapes Google search results to get top URLs for keywords
 """
 import requests
-from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
-import time
 import logging
-from typing import List
-from urllib.parse import quote_plus
+from typing import List, Optional
+from urllib.parse import quote_plus, urlsplit
+
+from services.http_client import build_session
+from services.rate_limiter import RateLimiter, GOOGLE_SEARCH_HOSTS
+from services.retry import RetryPolicy
+from services.serp_links import extract_result_links
 
 logger = logging.getLogger(__name__)
 
@@ -16,16 +19,33 @@ logger = logging.getLogger(__name__)
 class SerpScraper:
     """Free Google SERP scraper using requests + BeautifulSoup"""
     
-    def __init__(self, rate_limit: float = 3.0):
+    def __init__(
+        self,
+        rate_limit: float = 3.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry: Optional[RetryPolicy] = None,
+        session: Optional[requests.Session] = None
+    ):
         """
         Initialize SERP scraper
         
         Args:
-            rate_limit: Delay between requests in seconds (default: 3s)
+            rate_limit: Delay between requests in seconds (default: 3s), used
+                when no shared limiter is given
+            rate_limiter: Shared per-host limiter
+            retry: Retry policy for SERP requests, one breaker per Google domain
+                (default: private policy)
+            session: Pooled HTTP session shared with other services (default: private session)
         """
         self.rate_limit = rate_limit
+        if rate_limiter is None:
+            rate_limiter = RateLimiter()
+            for host in GOOGLE_SEARCH_HOSTS:
+                rate_limiter.configure(host, rate_limit)
+        self.rate_limiter = rate_limiter
+        self.retry = retry or RetryPolicy()
         self.ua = UserAgent()
-        self.session = requests.Session()
+        self.session = session or build_session()
         # Disable SSL warnings
         import urllib3
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -80,13 +100,16 @@ class SerpScraper:
             
         Returns:
             List of top URLs
+        
+        Raises:
+            UpstreamError: Google failed after retries (or blocked us), or its circuit is open
         """
-        try:
-            # Rate limiting
-            time.sleep(self.rate_limit)
-            
-            # Build search URL
-            url = self._build_google_url(keyword, geo, num_results=top_n * 2)
+        # Build search URL
+        url = self._build_google_url(keyword, geo, num_results=top_n * 2)
+        
+        def attempt():
+            # Rate limiting (shared across threads, per Google domain; every retry waits again)
+            self.rate_limiter.acquire_url(url)
             logger.info(f"Fetching SERP for '{keyword}' in {geo}")
             
             # Make request (with SSL verification disabled for macOS compatibility)
@@ -97,65 +120,17 @@ class SerpScraper:
                 verify=False  # Disable SSL verification to avoid certificate errors
             )
             response.raise_for_status()
-            
-            # Parse HTML
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            # Extract organic result URLs
-            urls = []
-            
-            # Look for result divs (Google's structure may change)
-            # Try multiple selectors and methods
-            selectors = [
-                'div.yuRUbf > a',           # Standard result link
-                'a[jsname="UWckNb"]',       # Alternative selector
-                'div.g a[href^="http"]',    # Fallback 1
-                'div#search a[href^="http"]', # Fallback 2
-                'a[href^="http"]'           # Last resort
-            ]
-            
-            for selector in selectors:
-                links = soup.select(selector)
-                for link in links:
-                    href = link.get('href')
-                    if href and href.startswith('http'):
-                        # Filter out Google's own URLs and irrelevant ones
-                        skip_domains = ['google.com', 'google.com.br', 'youtube.com', 
-                                       'support.google', 'accounts.google', 'maps.google',
-                                       'play.google', 'policies.google']
-                        if not any(domain in href for domain in skip_domains):
-                            if href not in urls:
-                                urls.append(href)
-                                if len(urls) >= top_n * 2:  # Get extra in case some are filtered
-                                    break
-                
-                if len(urls) >= top_n:
-                    break
-            
-            # If still no results, try finding any anchor tags in main content
-            if not urls:
-                logger.warning(f"Standard selectors failed, trying alternative extraction")
-                all_links = soup.find_all('a', href=True)
-                for link in all_links:
-                    href = link['href']
-                    if href.startswith('http') and 'google' not in href:
-                        if href not in urls:
-                            urls.append(href)
-                            if len(urls) >= top_n:
-                                break
-            
-            # Return top N
-            result_urls = urls[:top_n]
-            logger.info(f"Found {len(result_urls)} URLs for '{keyword}' in {geo}")
-            
-            return result_urls
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request error for '{keyword}' in {geo}: {e}")
-            return []
-        except Exception as e:
-            logger.error(f"Parsing error for '{keyword}' in {geo}: {e}")
-            return []
+            return response.text
+        
+        html = self.retry.call(urlsplit(url).hostname or 'google', attempt)
+        
+        # Classify every link in one parse (organic result markup first)
+        result_urls = extract_result_links(html, top_n)
+        if not result_urls:
+            logger.warning(f"No result links found for '{keyword}' in {geo}")
+        logger.info(f"Found {len(result_urls)} URLs for '{keyword}' in {geo}")
+        
+        return result_urls
     
     def get_urls_for_both_markets(self, keyword_us: str, keyword_br: str, top_n: int = 3) -> dict:
         """
@@ -3,25 +3,54 @@ SerpAPI service for reliable SERP data
 Paid service but very reliable - use when free scraping fails
 """
 import requests
-import time
 import logging
 from typing import List, Optional
 import os
 
+from cache.sqlite_cache import SqliteCache, make_key
+from services.credit_ledger import CreditBudget, CreditLedger
+from services.http_client import build_session
+from services.rate_limiter import SERPAPI_HOST
+from services.retry import RetryPolicy
+
 logger = logging.getLogger(__name__)
 
+# Table holding raw organic_results per search
+SERP_CACHE_TABLE = 'serpapi_responses'
+
 
 class SerpApiService:
     """SerpAPI integration for reliable Google search results"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[SqliteCache] = None,
+        cache_ttl: Optional[float] = None,
+        ledger: Optional[CreditLedger] = None,
+        retry: Optional[RetryPolicy] = None,
+        session: Optional[requests.Session] = None,
+        budget: Optional[CreditBudget] = None
+    ):
         """
         Initialize SerpAPI service
         
         Args:
             api_key: SerpAPI key (get from https://serpapi.com)
+            cache: Response cache for organic results (default: no caching)
+            cache_ttl: Seconds a cached response stays fresh (None = never expires)
+            ledger: Credit ledger recording paid calls and cache hits
+            retry: Retry policy for SerpAPI requests (default: private policy)
+            session: Pooled HTTP session, so searches reuse one TLS connection (default: private session)
+            budget: Credit ceiling for paid searches (default: unlimited; cache hits are always free)
         """
         self.api_key = api_key or os.getenv('SERPAPI_KEY')
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.ledger = ledger or CreditLedger()
+        self.retry = retry or RetryPolicy()
+        self.session = session or build_session()
+        self.budget = budget
         self.base_url = "https://serpapi.com/search"
         self.enabled = bool(self.api_key)
         
@@ -45,61 +74,118 @@ class SerpApiService:
             
         Returns:
             List of top URLs
+        
+        Raises:
+            CreditCeilingReached: The search is not cached and the credit budget is spent
+            UpstreamError: SerpAPI failed after retries, or its circuit is open
         """
         if not self.enabled:
             logger.warning("SerpAPI not configured, returning empty results")
             return []
         
-        try:
-            # Build parameters
-            params = {
-                'q': keyword,
-                'location': self._get_location(geo),
-                'gl': geo.lower(),
-                'hl': 'en' if geo == 'US' else 'pt',
-                'num': top_n * 2,  # Get extra in case some are filtered
-                'api_key': self.api_key,
-                'engine': 'google'
-            }
-            
-            logger.info(f"📡 Fetching from SerpAPI: '{keyword}' in {geo}")
-            
-            # Make request (with SSL verification disabled for macOS compatibility)
-            response = requests.get(self.base_url, params=params, timeout=15, verify=False)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Extract organic results
-            urls = []
-            organic_results = data.get('organic_results', [])
-            
-            for result in organic_results:
-                url = result.get('link')
-                if url and url.startswith('http'):
-                    # Filter out Google's own URLs
-                    skip_domains = ['google.com', 'youtube.com', 'support.google']
-                    if not any(domain in url for domain in skip_domains):
-                        urls.append(url)
-                        if len(urls) >= top_n:
-                            break
-            
-            logger.info(f"✅ SerpAPI returned {len(urls)} URLs for '{keyword}' in {geo}")
-            
-            # Check credits remaining
-            if 'search_metadata' in data:
-                credits = data['search_metadata'].get('total_credits_used')
-                if credits:
-                    logger.debug(f"SerpAPI credits used: {credits}")
-            
+        params = self._params(keyword, geo, top_n)
+        
+        # Serve from cache when an earlier search fetched at least as many results
+        cache_key = self._cache_key(params)
+        cached = self._cached(cache_key, params['num'])
+        if cached is not None:
+            self.ledger.record_cache_hit()
+            urls = self._extract_urls(cached['organic_results'], top_n)
+            logger.info(f"💾 SerpAPI cache hit: {len(urls)} URLs for '{keyword}' in {geo}")
             return urls
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ SerpAPI request failed for '{keyword}': {e}")
-            return []
-        except Exception as e:
-            logger.error(f"❌ SerpAPI error for '{keyword}': {e}")
-            return []
+        
+        logger.info(f"📡 Fetching from SerpAPI: '{keyword}' in {geo}")
+        
+        # Make request (with SSL verification disabled for macOS compatibility)
+        def attempt():
+            response = self.session.get(self.base_url, params=params, timeout=15, verify=False)
+            response.raise_for_status()
+            return response.json()
+        
+        if self.budget is not None:
+            self.budget.reserve()
+        try:
+            data = self.retry.call(SERPAPI_HOST, attempt)
+        except Exception:
+            if self.budget is not None:
+                self.budget.release()
+            raise
+        self.ledger.record_paid_call()
+        
+        # Extract organic results
+        organic_results = data.get('organic_results', [])
+        urls = self._extract_urls(organic_results, top_n)
+        
+        if self.cache is not None:
+            self.cache.set(cache_key, {'num': params['num'], 'organic_results': organic_results})
+        
+        logger.info(f"✅ SerpAPI returned {len(urls)} URLs for '{keyword}' in {geo}")
+        
+        # Check credits remaining
+        if 'search_metadata' in data:
+            credits = data['search_metadata'].get('total_credits_used')
+            if credits:
+                logger.debug(f"SerpAPI credits used: {credits}")
+        
+        return urls
+    
+    def is_cached(self, keyword: str, geo: str, top_n: int = 3) -> bool:
+        """
+        Whether get_top_urls would be served from the cache (no credit spent)
+        
+        Args:
+            keyword: Search keyword
+            geo: Country code ('US', 'BR')
+            top_n: Number of results that will be requested
+        
+        Returns:
+            True if a fresh cached response covers the search
+        """
+        params = self._params(keyword, geo, top_n)
+        return self._cached(self._cache_key(params), params['num']) is not None
+    
+    def _params(self, keyword: str, geo: str, top_n: int) -> dict:
+        """SerpAPI search parameters for one keyword and market"""
+        return {
+            'q': keyword,
+            'location': self._get_location(geo),
+            'gl': geo.lower(),
+            'hl': 'en' if geo == 'US' else 'pt',
+            'num': top_n * 2,  # Get extra in case some are filtered
+            'api_key': self.api_key,
+            'engine': 'google'
+        }
+    
+    def _cached(self, cache_key: str, num: int) -> Optional[dict]:
+        """Fresh cached response holding at least num results, if any"""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(cache_key, max_age=self.cache_ttl)
+        return cached if cached is not None and cached['num'] >= num else None
+    
+    def _cache_key(self, params: dict) -> str:
+        """
+        Cache key covering every request parameter except the API key and
+        result count, so one cached response can serve smaller top_n values
+        """
+        return make_key(*sorted(
+            (name, value) for name, value in params.items()
+            if name not in ('api_key', 'num')
+        ))
+    
+    def _extract_urls(self, organic_results: List[dict], top_n: int) -> List[str]:
+        """Pick the top N usable URLs out of SerpAPI organic results"""
+        urls = []
+        for result in organic_results:
+            url = result.get('link')
+            if url and url.startswith('http'):
+                # Filter out Google's own URLs
+                skip_domains = ['google.com', 'youtube.com', 'support.google']
+                if not any(domain in url for domain in skip_domains):
+                    urls.append(url)
+                    if len(urls) >= top_n:
+                        break
+        return urls
     
     def get_urls_for_both_markets(self, keyword_us: str, keyword_br: str, top_n: int = 3) -> dict:
         """
@@ -142,7 +228,7 @@ class SerpApiService:
             url = "https://serpapi.com/account"
             params = {'api_key': self.api_key}
             
-            response = requests.get(url, params=params, timeout=10, verify=False)
+            response = self.session.get(url, params=params, timeout=10, verify=False)
             response.raise_for_status()
             
             data = response.json()
@@ -2,19 +2,70 @@
 Translation service using free deep-translator library
 """
 from deep_translator import GoogleTranslator
-from typing import Dict
-import time
+from typing import Dict, List, Optional
+import threading
 import logging
 
+from cache.sqlite_cache import SqliteCache, make_key
+from services.rate_limiter import RateLimiter, TRANSLATE_HOST
+
 logger = logging.getLogger(__name__)
 
+# Table holding the persistent translation memory
+TRANSLATION_CACHE_TABLE = 'translations'
+
+# Google Translate rejects requests over 5000 characters
+MAX_CHUNK_CHARS = 4500
+
 
 class TranslationService:
     """Free translation service using deep-translator"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[SqliteCache] = None,
+        chunk_size: int = 50
+    ):
+        """
+        Initialize translation service
+        
+        Args:
+            rate_limiter: Shared per-host limiter (default: private 0.5s/request budget)
+            cache: Persistent translation memory shared across runs (default: in-process only)
+            chunk_size: Maximum texts sent in one batch translation request
+        """
+        if rate_limiter is None:
+            rate_limiter = RateLimiter()
+            rate_limiter.configure(TRANSLATE_HOST, 0.5)
+        self.rate_limiter = rate_limiter
+        self.persistent_cache = cache
+        self.chunk_size = chunk_size
         self.translator = GoogleTranslator(source='en', target='pt')
         self._cache: Dict[str, str] = {}
+        # GoogleTranslator mutates request state per call; serialize access
+        self._lock = threading.Lock()
+    
+    def _lookup(self, text: str) -> Optional[str]:
+        """Find a translation in the in-process cache, then the persistent memory"""
+        if text in self._cache:
+            logger.debug(f"Cache hit for: {text}")
+            return self._cache[text]
+        
+        if self.persistent_cache is not None:
+            translation = self.persistent_cache.get(make_key('en', 'pt', text))
+            if translation is not None:
+                logger.debug(f"Translation memory hit for: {text}")
+                self._cache[text] = translation
+                return translation
+        
+        return None
+    
+    def _remember(self, text: str, translation: str):
+        """Store a translation in both cache layers"""
+        self._cache[text] = translation
+        if self.persistent_cache is not None:
+            self.persistent_cache.set(make_key('en', 'pt', text), translation)
     
     def translate_to_portuguese(self, text: str) -> str:
         """
@@ -22,53 +73,107 @@ class TranslationService:
         
         Args:
             text: English text to translate
-            
+        
         Returns:
             Portuguese translation
         """
         # Check cache first
-        if text in self._cache:
-            logger.debug(f"Cache hit for: {text}")
-            return self._cache[text]
+        cached = self._lookup(text)
+        if cached is not None:
+            return cached
         
         try:
-            # Add small delay to avoid rate limiting
-            time.sleep(0.5)
-            
-            translation = self.translator.translate(text)
+            with self._lock:
+                # Wait for the translator budget
+                self.rate_limiter.acquire(TRANSLATE_HOST)
+                
+                translation = self.translator.translate(text)
             
             # Cache the result
-            self._cache[text] = translation
+            self._remember(text, translation)
             logger.info(f"Translated: '{text}' -> '{translation}'")
             
             return translation
-            
+        
         except Exception as e:
             logger.error(f"Translation failed for '{text}': {e}")
             # Fallback: return original text
             return text
     
-    def translate_batch(self, texts: list[str]) -> Dict[str, str]:
+    def translate_batch(self, texts: List[str]) -> Dict[str, str]:
         """
         Translate multiple texts
         
+        Uncached texts are sent in chunks of newline-joined text, one request per
+        chunk. If a chunk comes back with a different number of lines, its texts
+        are translated one by one instead.
+        
         Args:
             texts: List of English texts
-            
+        
         Returns:
             Dictionary mapping original -> translated
         """
         results = {}
-        for text in texts:
-            results[text] = self.translate_to_portuguese(text)
+        pending = []
+        for text in dict.fromkeys(texts):
+            cached = self._lookup(text)
+            if cached is not None:
+                results[text] = cached
+            elif '\n' in text:
+                # Would break line-based splitting; translate on its own
+                results[text] = self.translate_to_portuguese(text)
+            else:
+                pending.append(text)
+        
+        for chunk in self._chunks(pending):
+            results.update(self._translate_chunk(chunk))
+        
+        if pending:
+            logger.info(f"Batch translated {len(pending)} texts ({len(results) - len(pending)} cached)")
+        
         return results
     
+    def _chunks(self, texts: List[str]) -> List[List[str]]:
+        """Split texts into chunks under the size and character limits"""
+        chunks, current, length = [], [], 0
+        for text in texts:
+            if current and (len(current) >= self.chunk_size or length + len(text) + 1 > MAX_CHUNK_CHARS):
+                chunks.append(current)
+                current, length = [], 0
+            current.append(text)
+            length += len(text) + 1
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _translate_chunk(self, chunk: List[str]) -> Dict[str, str]:
+        """Translate a chunk in one request, falling back to per-text calls"""
+        if len(chunk) == 1:
+            return {chunk[0]: self.translate_to_portuguese(chunk[0])}
+        
+        try:
+            with self._lock:
+                self.rate_limiter.acquire(TRANSLATE_HOST)
+                translated = self.translator.translate('\n'.join(chunk))
+            lines = [line.strip() for line in (translated or '').split('\n')]
+        except Exception as e:
+            logger.warning(f"Batch translation failed, translating {len(chunk)} texts individually: {e}")
+            lines = []
+        
+        if len(lines) != len(chunk) or not all(lines):
+            if lines:
+                logger.warning(
+                    f"Batch translation returned {len(lines)} lines for {len(chunk)} texts, "
+                    f"translating individually"
+                )
+            return {text: self.translate_to_portuguese(text) for text in chunk}
+        
+        for text, translation in zip(chunk, lines):
+            self._remember(text, translation)
+        return dict(zip(chunk, lines))
+    
     def clear_cache(self):
-        """Clear translation cache"""
+        """Clear in-process translation cache (the persistent memory is kept)"""
         self._cache.clear()
         logger.info("Translation cache cleared")
-
-
-
-
-
@@ -0,0 +1,122 @@
+"""
+Tests for the Brazil keyword research pipeline
+Run with: pytest tests/
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+from click.testing import CliRunner
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import br_keyword_research
+from config import Config
+from services.credit_ledger import CreditLedger
+from services.quality_cache import QualityCache
+from services.retry import UpstreamError
+from services import search_volume
+
+
+class FakeVolumes:
+    """Stand-in for SearchVolumeService with fixed BR interest"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def get_interest_score(self, keyword, geo):
+        self.calls.append((keyword, geo))
+        if keyword in self.failing:
+            raise UpstreamError('trends.google.com', 'circuit open')
+        return 60
+
+
+class FakeSerpApi:
+    """Stand-in for SerpApiService that records how many searches overlap"""
+
+    enabled = True
+
+    def __init__(self):
+        self.ledger = CreditLedger()
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def get_top_urls(self, keyword, geo, top_n=5):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+        return [f'https://{keyword.replace(" ", "-")}.example.com.br/']
+
+
+class FakeAnalyzer:
+    """Stand-in for QualityAnalyzer scoring every competitor 30"""
+
+    not_modified = 0
+
+    def __init__(self):
+        self.cache = QualityCache()
+
+    def analyze_competitors(self, urls):
+        analyses = [{'url': url, 'quality_score': 30.0, 'has_https': True, 'is_responsive': True,
+                     'is_web_app': False, 'is_recent': True, 'page_load_success': True} for url in urls]
+        return {'average_quality': 30.0, 'analyses': analyses}
+
+
+class TestScanKeyword:
+    """Test a single keyword scan"""
+
+    def test_uses_shared_trends_service(self):
+        """Interest comes from the injected Trends service, not a new session"""
+        volumes = FakeVolumes()
+        result = br_keyword_research.scan_keyword('calculadora shopee', FakeSerpApi(), FakeAnalyzer(), volumes)
+
+        assert volumes.calls == [('calculadora shopee', 'BR')]
+        assert result.br_interest == 60
+        assert result.opportunity_score == 90.0
+        assert len(result.competitors) == 1
+
+
+class TestBuildServices:
+    """Test the shared service setup"""
+
+    def test_trends_client_uses_brazilian_locale(self, tmp_path, monkeypatch):
+        clients = []
+        monkeypatch.setattr(Config, 'CACHE_DB', str(tmp_path / 'cache.db'))
+        monkeypatch.setattr(search_volume, 'TrendReq', lambda **kwargs: clients.append(kwargs))
+
+        volumes, _, _ = br_keyword_research.build_services()
+
+        assert clients == [{'hl': 'pt-BR', 'tz': -180}]
+        assert (volumes.hl, volumes.tz) == ('pt-BR', -180)
+
+
+class TestResearchCommand:
+    """Test the concurrent CLI run"""
+
+    def test_parallel_run_skips_failed_keywords(self, tmp_path, monkeypatch):
+        keywords = [f'calculadora {i}' for i in range(8)]
+        input_file = tmp_path / 'keywords.txt'
+        input_file.write_text('\n'.join(keywords), encoding='utf-8')
+
+        serpapi = FakeSerpApi()
+        volumes = FakeVolumes(failing={'calculadora 3'})
+        monkeypatch.setattr(br_keyword_research, 'build_services', lambda: (volumes, serpapi, FakeAnalyzer()))
+        monkeypatch.setattr(Config, 'STORE_RESULTS', False)
+        monkeypatch.setattr(Config, 'RESULTS_DIR', str(tmp_path))
+
+        output = tmp_path / 'report.md'
+        result = CliRunner().invoke(br_keyword_research.main, [str(input_file), '-o', str(output), '-w', '4'])
+
+        assert result.exit_code == 0, result.output
+        assert serpapi.peak > 1
+        assert 'Skipped 1 keyword(s)' in result.output
+        report = output.read_text(encoding='utf-8')
+        assert 'calculadora 3**' not in report
+        assert report.count('**calculadora ') == 7
@@ -0,0 +1,147 @@
+"""
+Tests for batch budget planning
+Run with: pytest tests/
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from services.budget_planner import (
+    BudgetPlanner, ROUTE_DEFER, ROUTE_SCRAPER, ROUTE_SERPAPI, ROUTE_SKIP
+)
+from services.retry import UpstreamError
+
+US_INTEREST = {'invoice generator': 80, 'qr code generator': 60, 'pdf to excel': 40, 'niche tool': 5}
+
+
+class FakeSearchVolume:
+    """Stand-in for SearchVolumeService with fixed US scores"""
+
+    batching = True
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.scored = []
+
+    def forecast_requests(self, keywords, geo):
+        return 0, len(keywords)
+
+    def get_interest_scores(self, keywords, geo):
+        if self.fail:
+            raise UpstreamError('trends.google.com', 'circuit open')
+        self.scored.extend(keywords)
+        return {keyword: US_INTEREST[keyword] for keyword in keywords}
+
+
+class UnbatchedSearchVolume(FakeSearchVolume):
+    """Stand-in that scores one keyword at a time, failing for some"""
+
+    batching = False
+
+    def __init__(self, failing=()):
+        super().__init__()
+        self.failing = set(failing)
+
+    def get_interest_score(self, keyword, geo):
+        if keyword in self.failing:
+            raise UpstreamError('trends.google.com', 'timed out')
+        return US_INTEREST[keyword]
+
+
+class FakeTranslator:
+    def translate_batch(self, texts):
+        return {text: f'{text} (pt)' for text in texts}
+
+
+class FakeSerpApi:
+    """Stand-in for SerpApiService with a fixed set of cached searches"""
+
+    enabled = True
+
+    def __init__(self, cached=(), left=100):
+        self.cached = set(cached)
+        self.left = left
+        self.account_calls = 0
+
+    def is_cached(self, keyword, geo, top_n=3):
+        return (keyword, geo) in self.cached
+
+    def get_account_info(self):
+        self.account_calls += 1
+        return {'plan': 'Free', 'total_searches_left': self.left}
+
+
+def make_planner(serpapi=None, search_volume=None, **kwargs):
+    return BudgetPlanner(search_volume or FakeSearchVolume(), FakeTranslator(), serpapi=serpapi, **kwargs)
+
+
+KEYWORDS = ['pdf to excel', 'niche tool', 'invoice generator', 'qr code generator']
+
+
+class TestBudgetPlanner:
+    """Test ordering, skipping and the credit ceiling"""
+
+    def test_orders_by_us_interest_and_skips_low_interest(self):
+        plan = make_planner(FakeSerpApi(), min_us_interest=10).plan(KEYWORDS)
+
+        assert plan.keywords == ['invoice generator', 'qr code generator', 'pdf to excel']
+        assert [item.route for item in plan.items] == [ROUTE_SERPAPI] * 3 + [ROUTE_SKIP]
+        assert plan.credits_forecast == 6
+
+    def test_cache_hits_are_free(self):
+        serpapi = FakeSerpApi(cached={('invoice generator', 'US'), ('invoice generator (pt)', 'BR')}, left=3)
+        plan = make_planner(serpapi).plan(KEYWORDS)
+
+        assert [(item.keyword, item.credits, item.route) for item in plan.items] == [
+            ('invoice generator', 0, ROUTE_SERPAPI),
+            ('qr code generator', 2, ROUTE_SERPAPI),
+            ('pdf to excel', 2, ROUTE_SCRAPER),
+            ('niche tool', 2, ROUTE_SCRAPER),
+        ]
+        assert (plan.credits_available, plan.credits_forecast, plan.cached_searches) == (3, 2, 2)
+
+    def test_set_ceiling_below_plan_and_stop_mode(self):
+        serpapi = FakeSerpApi(left=100)
+        plan = make_planner(serpapi, max_credits=4, over_budget='stop').plan(KEYWORDS)
+
+        assert plan.credits_available == 4
+        assert plan.keywords == ['invoice generator', 'qr code generator']
+        assert plan.count(ROUTE_DEFER) == 2
+        assert any('Deferred: 2' in line for line in plan.summary())
+
+    def test_account_info_is_reused(self):
+        serpapi = FakeSerpApi(left=100)
+        make_planner(serpapi, account={'total_searches_left': 1}).plan(KEYWORDS)
+        assert serpapi.account_calls == 0
+
+    def test_without_serpapi_everything_is_scraped(self):
+        plan = make_planner(None).plan(KEYWORDS)
+
+        assert plan.credits_available is None
+        assert {item.route for item in plan.items} == {ROUTE_SCRAPER}
+
+    def test_trends_outage_keeps_input_order(self):
+        plan = make_planner(FakeSerpApi(), search_volume=FakeSearchVolume(fail=True), min_us_interest=50).plan(KEYWORDS)
+
+        assert plan.keywords == KEYWORDS
+        assert plan.count(ROUTE_SKIP) == 0
+
+    def test_one_failed_keyword_keeps_the_other_scores(self, caplog):
+        search_volume = UnbatchedSearchVolume(failing={'qr code generator'})
+        plan = make_planner(FakeSerpApi(), search_volume=search_volume, min_us_interest=10).plan(KEYWORDS)
+
+        assert [(item.keyword, item.us_interest, item.route) for item in plan.items] == [
+            ('invoice generator', 80, ROUTE_SERPAPI),
+            ('pdf to excel', 40, ROUTE_SERPAPI),
+            ('niche tool', 5, ROUTE_SKIP),
+            ('qr code generator', None, ROUTE_SERPAPI),
+        ]
+        assert 'Trends failed for 1 of 4 keywords' in caplog.text
+
+    def test_rejects_unknown_over_budget_mode(self):
+        with pytest.raises(ValueError):
+            make_planner(over_budget='panic')
@@ -0,0 +1,29 @@
+"""
+Tests for persistent caches
+Run with: pytest tests/
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from cache.sqlite_cache import SqliteCache, make_key
+
+
+class TestSqliteCache:
+    """Test the SQLite key/value cache"""
+
+    def test_roundtrip_and_ttl(self, tmp_path):
+        """Values persist across instances and expire after max_age"""
+        db = str(tmp_path / 'cache.sqlite3')
+        key = make_key('pdf to excel', 'US', 'today 12-m')
+
+        SqliteCache(db, 'demo').set(key, {'score': 5})
+        cache = SqliteCache(db, 'demo')
+
+        assert cache.get(key) == {'score': 5}
+        time.sleep(0.01)
+        assert cache.get(key, max_age=0.001) is None
+        assert cache.get_entry(key)[0] == {'score': 5}
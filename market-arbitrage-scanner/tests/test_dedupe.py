@@ -0,0 +1,82 @@
+"""
+Tests for near-duplicate keyword collapsing
+Run with: pytest tests/
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from dedupe import MinHasher, cluster_keywords, jaccard, keyword_signature
+
+
+class TestSignature:
+    """Test keyword normalization"""
+
+    def test_case_accents_stopwords_plurals_and_order(self):
+        expected = keyword_signature('calculadora de lucro')
+        for variant in ('Calculadoras de Lucro', 'calculadora lucro', 'lucro calculadora', 'cálculadora  do lucro!'):
+            assert keyword_signature(variant) == expected
+
+    def test_words_ending_in_s_are_not_over_stripped(self):
+        assert keyword_signature('news') != keyword_signature('new')
+        assert keyword_signature('canvas') != keyword_signature('canva')
+        assert keyword_signature('shoes') == 'shoes'
+        assert keyword_signature('conversões') == keyword_signature('conversao')
+
+    def test_direction_is_kept(self):
+        assert keyword_signature('pdf to excel') != keyword_signature('excel to pdf')
+        assert keyword_signature('convert pdf to excel') == keyword_signature('pdf to excel convert')
+
+
+class TestMinHasher:
+    """Test MinHash similarity estimates"""
+
+    def test_estimate_tracks_jaccard(self):
+        hasher = MinHasher(num_perm=256)
+        a = frozenset(f'item{i}' for i in range(100))
+        b = frozenset(f'item{i}' for i in range(50, 150))
+        agreement = (hasher.signature(a) == hasher.signature(b)).mean()
+        assert agreement == pytest.approx(jaccard(a, b), abs=0.1)
+
+
+class TestClusterKeywords:
+    """Test grouping into scan representatives"""
+
+    def test_variants_share_one_representative(self):
+        clusters = cluster_keywords([
+            'calculadora de lucro', 'pdf to excel', 'Calculadoras de Lucro',
+            'image resizer', 'excel to pdf', 'calculadora lucro', 'image resize', 'pdf to excel',
+        ])
+
+        assert [(c.representative, c.members) for c in clusters] == [
+            ('calculadora de lucro', ('Calculadoras de Lucro', 'calculadora lucro')),
+            ('pdf to excel', ()),
+            ('image resizer', ('image resize',)),
+            ('excel to pdf', ()),
+        ]
+        assert sum(c.size for c in clusters) == 7
+
+    def test_distinct_words_ending_in_s_stay_apart(self):
+        clusters = cluster_keywords(['news', 'new', 'canvas', 'canva', 'news app', 'new app', 'calculadoras', 'calculadora'])
+
+        assert [(c.representative, c.members) for c in clusters] == [
+            ('news', ()), ('new', ()), ('canvas', ()), ('canva', ()),
+            ('news app', ()), ('new app', ()), ('calculadoras', ('calculadora',)),
+        ]
+
+    def test_threshold_controls_near_duplicates(self):
+        keywords = ['mercado livre', 'mercadolivre']
+        assert len(cluster_keywords(keywords)) == 2
+        assert len(cluster_keywords(keywords, threshold=0.6)) == 1
+
+    def test_unrelated_keywords_stay_apart(self):
+        keywords = ['json formatter', 'json validator', 'word counter', 'video compressor', 'qr code generator']
+        assert [c.representative for c in cluster_keywords(keywords)] == keywords
+
+    def test_bands_must_divide_permutations(self):
+        with pytest.raises(ValueError):
+            cluster_keywords(['a'], num_perm=64, bands=10)
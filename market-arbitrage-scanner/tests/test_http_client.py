@@ -0,0 +1,67 @@
+"""
+Tests for the shared HTTP client
+Run with: pytest tests/
+"""
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from services.http_client import DnsCache, build_session
+
+
+class TestBuildSession:
+    """Test connection pool sizing"""
+
+    def test_pools_are_sized(self):
+        session = build_session(pool_connections=5, pool_maxsize=12)
+        adapter = session.get_adapter('https://serpapi.com/search')
+
+        assert adapter is session.get_adapter('http://example.com/')
+        assert adapter._pool_connections == 5
+        assert adapter._pool_maxsize == 12
+        assert adapter.max_retries.total == 0
+
+
+class TestDnsCache:
+    """Test DNS answer reuse"""
+
+    def make_cache(self, ttl=300.0, fail=False):
+        lookups = []
+
+        def resolve(host, port, *args):
+            lookups.append(host)
+            if fail:
+                raise socket.gaierror('no such host')
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('203.0.113.7', port))]
+
+        cache = DnsCache(ttl=ttl)
+        cache._resolve = resolve
+        return cache, lookups
+
+    def test_repeat_lookup_is_cached(self):
+        cache, lookups = self.make_cache()
+
+        first = cache.getaddrinfo('serpapi.com', 443)
+        second = cache.getaddrinfo('serpapi.com', 443)
+
+        assert first == second
+        assert lookups == ['serpapi.com']
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_expired_entries_are_resolved_again(self):
+        cache, lookups = self.make_cache(ttl=0)
+        cache.getaddrinfo('serpapi.com', 443)
+        cache.getaddrinfo('serpapi.com', 443)
+        assert len(lookups) == 2
+
+    def test_failures_are_not_cached(self):
+        cache, lookups = self.make_cache(fail=True)
+        for _ in range(2):
+            with pytest.raises(socket.gaierror):
+                cache.getaddrinfo('nowhere.invalid', 443)
+        assert len(lookups) == 2
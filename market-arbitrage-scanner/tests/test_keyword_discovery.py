@@ -0,0 +1,100 @@
+"""
+Tests for Trends related-query keyword discovery
+Run with: pytest tests/
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from cache.sqlite_cache import SqliteCache
+from services.keyword_discovery import KeywordDiscovery, RELATED_CACHE_TABLE, normalize_keyword
+
+# keyword -> (top queries, rising queries)
+GRAPH = {
+    'pdf to excel': (['PDF to Excel converter', 'pdf to xlsx'], ['pdf to excel ai']),
+    'pdf to excel converter': (['pdf to excel', 'free pdf converter'], []),
+    'pdf to xlsx': (['PDF  to XLSX!'], []),
+    'pdf to excel ai': (['ai pdf tools'], []),
+    'free pdf converter': (['pdf editor'], []),
+}
+
+
+class FakeSearchVolume:
+    """Stand-in for SearchVolumeService serving related queries from GRAPH"""
+
+    timeframe = 'today 12-m'
+
+    def __init__(self):
+        self.requests = []
+
+    def get_related_queries(self, keyword, geo):
+        self.requests.append(keyword)
+        top, rising = GRAPH.get(keyword.lower(), ([], []))
+        frame = lambda queries: pd.DataFrame({'query': queries, 'value': [100 - i for i in range(len(queries))]})
+        return {keyword: {'top': frame(top), 'rising': frame(rising) if rising else None}}
+
+
+def make_discovery(tmp_path, **kwargs):
+    cache = SqliteCache(str(tmp_path / 'cache.sqlite3'), RELATED_CACHE_TABLE)
+    return KeywordDiscovery(FakeSearchVolume(), cache=cache, **kwargs)
+
+
+class TestNormalize:
+    """Test the dedupe index key"""
+
+    def test_case_spacing_and_punctuation(self):
+        assert normalize_keyword('  PDF  to XLSX! ') == 'pdf to xlsx'
+        assert normalize_keyword("what's my ip?") == "what's my ip"
+        assert normalize_keyword('???') == ''
+
+
+class TestDiscovery:
+    """Test breadth-first expansion"""
+
+    def test_breadth_first_with_dedupe(self, tmp_path):
+        """Seeds first, then depth 1, then depth 2; variants of known keywords are dropped"""
+        discovery = make_discovery(tmp_path, max_depth=2)
+        found = list(discovery.discover(['PDF to Excel']))
+
+        assert [(f.keyword, f.depth, f.kind) for f in found] == [
+            ('PDF to Excel', 0, 'seed'),
+            ('PDF to Excel converter', 1, 'top'),
+            ('pdf to xlsx', 1, 'top'),
+            ('pdf to excel ai', 1, 'rising'),
+            ('free pdf converter', 2, 'top'),
+            ('ai pdf tools', 2, 'top'),
+        ]
+        assert found[4].parent == 'PDF to Excel converter'
+
+    def test_limits(self, tmp_path):
+        """Depth, keyword and request budgets all bound the walk"""
+        assert len(list(make_discovery(tmp_path / 'depth', max_depth=0).discover(['pdf to excel']))) == 1
+        assert len(list(make_discovery(tmp_path / 'size', max_keywords=3).discover(['pdf to excel']))) == 3
+
+        discovery = make_discovery(tmp_path / 'requests', max_requests=1)
+        found = list(discovery.discover(['pdf to excel']))
+        assert discovery.search_volume.requests == ['pdf to excel']
+        assert max(f.depth for f in found) == 1
+
+    def test_repeated_expansion_is_cached(self, tmp_path):
+        """A second run over the same seeds makes no Trends requests"""
+        first = make_discovery(tmp_path)
+        expected = list(first.discover(['pdf to excel']))
+
+        second = make_discovery(tmp_path)
+        assert list(second.discover(['pdf to excel'])) == expected
+        assert second.search_volume.requests == []
+        assert second.cache_hits == first.requests
+
+    def test_failed_lookup_is_not_cached(self, tmp_path):
+        """A keyword Trends could not expand is tried again next run"""
+        discovery = make_discovery(tmp_path, max_depth=1)
+        discovery.search_volume.get_related_queries = lambda keyword, geo: None
+        assert len(list(discovery.discover(['pdf to excel']))) == 1
+
+        retry = make_discovery(tmp_path, max_depth=1)
+        assert len(list(retry.discover(['pdf to excel']))) == 4
@@ -0,0 +1,100 @@
+"""
+Tests for run instrumentation
+Run with: pytest tests/
+"""
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from cache.sqlite_cache import SqliteCache
+from metrics import Histogram, Metrics
+from output.markdown_generator import MarkdownGenerator
+from services.rate_limiter import OTHER_HOSTS_LABEL, TRENDS_HOST, RateLimiter
+
+
+class TestHistogram:
+    """Test the fixed-bucket histogram"""
+
+    def test_percentiles_from_buckets(self):
+        """p50 and p99 land in the right buckets and never exceed the maximum"""
+        histogram = Histogram()
+        for _ in range(98):
+            histogram.observe(0.003)  # 3 ms -> <=5 bucket
+        histogram.observe(0.4)
+        histogram.observe(0.45)
+
+        assert histogram.percentile(50) == 5
+        assert histogram.percentile(99) == 450
+        assert histogram.count == 100
+
+
+class TestMetrics:
+    """Test timers, counters and reporting"""
+
+    def test_timer_and_counters(self, tmp_path):
+        """Timed blocks and counters end up in the JSON snapshot"""
+        metrics = Metrics()
+        with metrics.timer('stage.serp'):
+            pass
+        metrics.incr('network.serpapi.com', 2)
+
+        path = metrics.write_json(str(tmp_path / 'run.metrics.json'))
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+        assert data['timers']['stage.serp']['count'] == 1
+        assert data['counters'] == {'network.serpapi.com': 2}
+
+    def test_stage_breakdown(self):
+        """Stages are listed in pipeline order with their share of the time"""
+        metrics = Metrics()
+        metrics.observe('stage.serp', 3.0)
+        metrics.observe('stage.translate', 1.0)
+        metrics.observe('rate_wait.www.google.com', 2.5)
+
+        breakdown = metrics.stage_breakdown(('stage.translate', 'stage.volumes', 'stage.serp'))
+        rows = [line for line in breakdown.splitlines() if line.startswith('| ') and 'Stage' not in line]
+        assert [row.split('|')[1].strip() for row in rows] == ['translate', 'serp']
+        assert '| 75% |' in rows[1]
+        assert 'www.google.com: 2.50' in breakdown
+        assert Metrics().stage_breakdown(('stage.serp',)) == ''
+
+    def test_appendix_in_report_footer(self, tmp_path):
+        """The --profile breakdown is written just before the report footer"""
+        generator = MarkdownGenerator(str(tmp_path))
+        path = generator.generate_report(
+            [{'english_keyword': 'pdf', 'gap_score': 50.0}], filename='r.md', appendix='\n## ⏱️ Stage Breakdown\n'
+        )
+        content = Path(path).read_text(encoding='utf-8')
+        assert content.index('Stage Breakdown') < content.index('*Generated by Market Arbitrage Scanner*')
+
+
+class TestServiceCounters:
+    """Test the counters services record"""
+
+    def test_rate_limiter_counts_network_calls(self):
+        """Named upstreams are counted per host; competitor pages share one label"""
+        metrics = Metrics()
+        limiter = RateLimiter(default_interval=0, metrics=metrics)
+        limiter.configure(TRENDS_HOST, 0)
+
+        limiter.acquire(TRENDS_HOST)
+        limiter.acquire_url('https://a.example.com/page')
+        limiter.acquire_url('https://b.example.com/page')
+
+        assert metrics.count(f'network.{TRENDS_HOST}') == 1
+        assert metrics.count(f'network.{OTHER_HOSTS_LABEL}') == 2
+
+    def test_sqlite_cache_counts_hits_and_misses(self, tmp_path):
+        """Fresh entries are hits; missing and expired ones are misses"""
+        metrics = Metrics()
+        cache = SqliteCache(str(tmp_path / 'cache.sqlite3'), 'things', metrics=metrics)
+        cache.set('a', 1)
+
+        cache.get('a')
+        cache.get('b')
+        cache.get('a', max_age=-1)
+
+        assert metrics.count('cache.things.hit') == 1
+        assert metrics.count('cache.things.miss') == 2
@@ -0,0 +1,230 @@
+"""
+Tests for report output and checkpointing
+Run with: pytest tests/
+"""
+import sys
+from dataclasses import FrozenInstanceError, asdict, replace
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import pytest
+
+from models import CompetitorAnalysis, GapAnalysis, SearchResult
+from output.checkpoint import CheckpointJournal, default_journal_path
+from output.markdown_generator import MarkdownGenerator
+from output.streaming_report import StreamingReport
+from output.results_store import DUCKDB_AVAILABLE, ResultsStore
+
+
+def make_result(keyword: str, gap_score: float = 50.0) -> GapAnalysis:
+    """Build a GapAnalysis with fixed inputs"""
+    return GapAnalysis(
+        english_keyword=keyword,
+        brazilian_keyword=f"{keyword} (pt)",
+        us_volume_score=60,
+        br_volume_score=20,
+        us_top_urls=['https://us.example.com/'],
+        br_top_urls=['https://br.example.com/'],
+        br_avg_quality=35.0,
+        gap_score=gap_score
+    )
+
+
+class TestCheckpointJournal:
+    """Test the append-only checkpoint journal"""
+
+    def test_roundtrip(self, tmp_path):
+        """Appended results load back unchanged"""
+        journal = CheckpointJournal(str(tmp_path / 'run.jsonl'))
+        original = make_result('invoice generator', 81.5)
+
+        journal.append(original)
+
+        assert journal.load() == [original]
+
+    def test_skips_partial_line_after_crash(self, tmp_path):
+        """A half-written last record does not break resuming"""
+        path = tmp_path / 'run.jsonl'
+        journal = CheckpointJournal(str(path))
+        journal.append(make_result('qr code generator'))
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"english_keyword": "resume bu')
+
+        journal.append(make_result('resume builder'))
+
+        assert [r.english_keyword for r in journal.load()] == ['qr code generator', 'resume builder']
+
+    def test_copied_duplicate_roundtrip(self, tmp_path):
+        """A result copied to a near-duplicate keeps its source keyword across a resume"""
+        journal = CheckpointJournal(str(tmp_path / 'run.jsonl'))
+        copy = replace(make_result('invoice generators'), duplicate_of='invoice generator')
+
+        journal.append(copy)
+
+        assert journal.load() == [copy]
+        assert '(≈ invoice generator)' in MarkdownGenerator(str(tmp_path))._table_row(1, copy.to_row())
+
+    def test_default_path_distinguishes_folders(self, tmp_path):
+        """Same-named keyword files in different folders get separate journals"""
+        first = default_journal_path('checkpoints', str(tmp_path / 'a' / 'keywords.txt'))
+        second = default_journal_path('checkpoints', str(tmp_path / 'b' / 'keywords.txt'))
+
+        assert first != second
+        assert Path(first).name.startswith('keywords-')
+
+    def test_rotate_keeps_previous_records(self, tmp_path):
+        """Starting over archives the old journal instead of truncating it"""
+        journal = CheckpointJournal(str(tmp_path / 'run.jsonl'))
+        journal.append(make_result('pdf merger'))
+
+        archived = journal.rotate()
+
+        assert not journal.exists()
+        assert CheckpointJournal(archived).load()[0].english_keyword == 'pdf merger'
+        assert journal.rotate() is None
+
+    def test_streams_records_and_completed_keywords(self, tmp_path):
+        """Records can be streamed one at a time; repeats stay in the stream"""
+        journal = CheckpointJournal(str(tmp_path / 'run.jsonl'))
+        for keyword in ['a', 'b', 'a']:
+            journal.append(make_result(keyword))
+
+        assert [r.english_keyword for r in journal.iter_results()] == ['a', 'b', 'a']
+        assert journal.completed_keywords() == {'a', 'b'}
+        assert [r.english_keyword for r in journal.load()] == ['a', 'b']
+
+
+class TestResultModels:
+    """Test the compact result models"""
+
+    def test_slotted_and_frozen(self):
+        """Results carry no per-instance __dict__ and can't be mutated"""
+        result = make_result('invoice generator')
+        assert not hasattr(result, '__dict__')
+        with pytest.raises(FrozenInstanceError):
+            result.gap_score = 10.0
+
+    def test_urls_stored_as_tuples(self):
+        """Lists passed by callers become tuples"""
+        result = make_result('invoice generator')
+        assert result.br_top_urls == ('https://br.example.com/',)
+        assert SearchResult('pdf', 'br', 40, ['https://a.com/']).top_urls == ('https://a.com/',)
+
+    def test_market_codes_interned(self):
+        """Market codes built at runtime share one string object"""
+        market = ''.join(['b', 'r'])
+        assert SearchResult('pdf', market, 40).market is SearchResult('csv', 'BR', 10).market
+
+    def test_to_row_renders_same_report_as_asdict(self, tmp_path):
+        """The shallow row path produces the same report as asdict output"""
+        results = [make_result(f'tool {i}', score) for i, score in enumerate([85.0, 40.0])]
+        generator = MarkdownGenerator(str(tmp_path))
+
+        from_rows = generator.generate_report([r.to_row() for r in results], filename='rows.md')
+        from_dicts = generator.generate_report([asdict(r) for r in results], filename='dicts.md')
+
+        assert Path(from_rows).read_text(encoding='utf-8') == Path(from_dicts).read_text(encoding='utf-8')
+        assert results[0].to_row()['br_top_urls'] is results[0].br_top_urls
+
+
+class TestStreamingReport:
+    """Test the incremental report writer"""
+
+    def test_keeps_top_k_and_all_rows(self, tmp_path):
+        """Only the best K are kept in memory, but every row reaches the report"""
+        report = StreamingReport(MarkdownGenerator(str(tmp_path)), filename='report.md', top_k=3)
+        scores = [12.0, 91.0, 55.0, 70.0, 33.0, 84.0]
+        for i, score in enumerate(scores):
+            report.add(asdict(make_result(f'tool {i}', score)))
+
+        assert [r['gap_score'] for r in report.top_results()] == [91.0, 84.0, 70.0]
+
+        path = report.close()
+        content = Path(path).read_text(encoding='utf-8')
+
+        assert not Path(report.live_path).exists()
+        assert '**Total Keywords Analyzed:** 6' in content
+        assert '**Excellent Opportunities (≥80):** 2' in content
+        assert all(f'| tool {i} |' in content for i in range(len(scores)))
+
+    def test_live_file_shows_progress(self, tmp_path):
+        """Rows are readable on disk before the report is closed"""
+        report = StreamingReport(MarkdownGenerator(str(tmp_path)), filename='report.md')
+        report.add(asdict(make_result('pdf to excel', 64.0)))
+
+        assert '| pdf to excel |' in Path(report.live_path).read_text(encoding='utf-8')
+        report.close()
+
+    def test_summary_matches_batch_report(self, tmp_path):
+        """Streaming and in-memory reports share the same summary block"""
+        generator = MarkdownGenerator(str(tmp_path))
+        results = [asdict(make_result(f'tool {i}', score)) for i, score in enumerate([85.0, 66.0, 20.0])]
+
+        report = StreamingReport(generator, filename='stream.md')
+        for result in results:
+            report.add(result)
+        streamed = Path(report.close()).read_text(encoding='utf-8')
+        batch = Path(generator.generate_report(results, filename='batch.md')).read_text(encoding='utf-8')
+
+        summary = generator._summary_section(57.0, 1, 1)
+        assert summary in streamed and summary in batch
+        assert streamed.endswith(generator._footer()) and batch.endswith(generator._footer())
+
+
+@pytest.mark.skipif(not DUCKDB_AVAILABLE, reason='duckdb not installed')
+class TestResultsStore:
+    """Test the DuckDB scan history"""
+
+    def test_records_results_with_competitor_metrics(self, tmp_path):
+        """Scores, raw inputs and per-URL metrics are queryable"""
+        store = ResultsStore(str(tmp_path / 'results.duckdb'))
+        result = replace(make_result('invoice generator', 81.5), br_competitors=[
+            CompetitorAnalysis(url='https://br.example.com/', quality_score=35.0, has_https=True),
+        ])
+        store.add_gap_result(result)
+
+        rows = store.query('SELECT us_volume_score, br_volume_score, gap_score, br_top_urls FROM gap_results')
+        assert rows == [(60, 20, 81.5, ['https://br.example.com/'])]
+        metrics = store.query('SELECT keyword, rank, url, quality_score, has_https FROM competitor_metrics')
+        assert metrics == [('invoice generator', 1, 'https://br.example.com/', 35.0, True)]
+        store.close()
+
+    def test_history_across_scans(self, tmp_path):
+        """Each run appends; latest_top ranks keywords by their most recent score"""
+        path = str(tmp_path / 'results.duckdb')
+        first = ResultsStore(path, scan_id='first')
+        first.add_gap_result(make_result('invoice generator', 40.0))
+        first.add_gap_result(make_result('pdf merger', 70.0))
+        first.close()
+
+        second = ResultsStore(path, scan_id='second')
+        second.add_gap_result(make_result('invoice generator', 90.0))
+
+        assert [row[-1] for row in second.keyword_history('Invoice Generator')] == [40.0, 90.0]
+        assert [(name, gap, scans) for name, gap, _, scans in second.latest_top()] == [
+            ('invoice generator', 90.0, 2),
+            ('pdf merger', 70.0, 1),
+        ]
+        second.close()
+
+    def test_exports_parquet_by_scan_date(self, tmp_path):
+        """Export writes one scan_date partition per day, even to a path with a quote in it"""
+        with ResultsStore(str(tmp_path / 'results.duckdb')) as store:
+            store.add_gap_result(make_result('invoice generator'))
+            store.export_parquet(str(tmp_path / "o'brien export"))
+
+        partitions = list((tmp_path / "o'brien export" / 'gap_results').glob('scan_date=*/*.parquet'))
+        assert len(partitions) == 1
+
+    def test_journal_roundtrip_keeps_competitors(self, tmp_path):
+        """Per-URL metrics survive the checkpoint journal"""
+        journal = CheckpointJournal(str(tmp_path / 'run.jsonl'))
+        result = replace(
+            make_result('invoice generator'),
+            br_competitors=[CompetitorAnalysis(url='https://br.example.com/', quality_score=35.0)]
+        )
+        journal.append(result)
+
+        assert journal.load()[0].br_competitors == result.br_competitors
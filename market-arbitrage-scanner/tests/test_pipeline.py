@@ -0,0 +1,41 @@
+"""
+Tests for the concurrent keyword pipeline
+Run with: pytest tests/
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from pipeline import iter_ordered
+
+
+class TestIterOrdered:
+    """Test ordered concurrent mapping"""
+
+    def test_preserves_input_order(self):
+        """Results come back in input order even when later items finish first"""
+        def slow_first(n):
+            time.sleep(0.05 if n == 0 else 0)
+            return n * 10
+
+        results = list(iter_ordered(slow_first, range(6), workers=4))
+
+        assert [item for item, _, _ in results] == list(range(6))
+        assert [result for _, result, _ in results] == [0, 10, 20, 30, 40, 50]
+
+    def test_captures_errors_per_item(self):
+        """A failing item is reported without aborting the rest"""
+        def fail_on_two(n):
+            if n == 2:
+                raise ValueError("boom")
+            return n
+
+        for workers in (1, 3):
+            results = list(iter_ordered(fail_on_two, range(4), workers=workers))
+
+            assert len(results) == 4
+            assert isinstance(results[2][2], ValueError)
+            assert [r for _, r, e in results if e is None] == [0, 1, 3]
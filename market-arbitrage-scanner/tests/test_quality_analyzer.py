@@ -0,0 +1,430 @@
+"""
+Tests for competitor quality analysis
+Run with: pytest tests/
+"""
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from services.quality_analyzer import QualityAnalyzer
+from services.page_signals import SignalExtractor, extract_signals
+from services.quality_cache import QualityCache, normalize_url
+
+
+def fake_analysis(url: str, score: float = 50.0) -> dict:
+    """Build a metrics dict like analyze_url returns"""
+    return {
+        'url': url,
+        'has_https': True,
+        'is_responsive': True,
+        'is_web_app': False,
+        'is_recent': False,
+        'page_load_success': True,
+        'quality_score': score
+    }
+
+
+class TestConcurrentCompetitors:
+    """Test concurrent competitor fetching"""
+
+    def test_fetches_in_parallel_and_keeps_shape(self, monkeypatch):
+        """Distinct domains are fetched concurrently with the usual result shape"""
+        analyzer = QualityAnalyzer(max_concurrency=4)
+
+        def slow_analyze(url):
+            time.sleep(0.1)
+            return fake_analysis(url)
+
+        monkeypatch.setattr(analyzer, 'analyze_url', slow_analyze)
+        urls = [f'https://site{i}.example.com/' for i in range(4)]
+
+        start = time.monotonic()
+        result = analyzer.analyze_competitors(urls)
+
+        assert time.monotonic() - start < 0.3
+        assert result['average_quality'] == 50.0
+        assert [a['url'] for a in result['analyses']] == urls
+
+    def test_deadline_marks_unfinished_urls_failed(self, monkeypatch):
+        """URLs still loading at the deadline count as failed loads"""
+        analyzer = QualityAnalyzer(max_concurrency=2)
+
+        def analyze(url):
+            if 'slow' in url:
+                time.sleep(0.5)
+            return fake_analysis(url, score=80.0)
+
+        monkeypatch.setattr(analyzer, 'analyze_url', analyze)
+        result = analyzer.analyze_competitors(
+            ['https://fast.example.com/', 'https://slow.example.com/'],
+            deadline=0.2
+        )
+
+        assert result['analyses'][0]['quality_score'] == 80.0
+        assert result['analyses'][1]['page_load_success'] is False
+        assert result['average_quality'] == 40.0
+
+    def test_busy_host_does_not_starve_others(self, monkeypatch):
+        """Queued pages on one host hold a single worker, leaving the rest free"""
+        analyzer = QualityAnalyzer(max_concurrency=2, per_domain_concurrency=1)
+
+        def analyze(url):
+            if 'busy' in url:
+                time.sleep(0.1)
+            return fake_analysis(url)
+
+        monkeypatch.setattr(analyzer, 'analyze_url', analyze)
+        busy = [f'https://busy.example.com/{i}' for i in range(6)]
+        others = [f'https://site{i}.example.com/' for i in range(4)]
+
+        start = time.monotonic()
+        result = analyzer.analyze_competitors(busy + others, deadline=0.25)
+
+        assert time.monotonic() - start < 0.4
+        assert all(a['page_load_success'] for a in result['analyses'][6:])
+
+
+SAMPLE_PAGE = """<html><head>
+<title>Online PDF Converter</title>
+<meta name="viewport" content="width=device-width">
+<meta name="description" content="Convert PDF files free">
+<meta property="article:modified_time" content="2024-05-01T10:00:00Z">
+<script>var footer = "© 1999";</script>
+</head><body>
+<form><input type="file"><button>Upload</button><button>Convert</button></form>
+<footer>© 2023 Example</footer>
+</body></html>"""
+
+
+class TestPageSignals:
+    """Test single-pass HTML signal extraction"""
+
+    def test_extracts_scored_signals(self):
+        """Every signal the analyzer scores is read in one pass"""
+        signals = extract_signals(SAMPLE_PAGE)
+
+        assert signals.has_viewport
+        assert signals.title == 'Online PDF Converter'
+        assert signals.description == 'Convert PDF files free'
+        assert signals.has_file_input
+        assert signals.form_count == 1
+        assert signals.button_count == 2
+        assert signals.modified_time.startswith('2024')
+        # Script text is not page copy
+        assert signals.copyright_years == [2023]
+        assert not signals.truncated
+
+    def test_character_cap_stops_parsing(self):
+        """Content past the cap is ignored"""
+        html = '<html><head><title>Tool</title></head><body>' + 'x' * 1000 + '<input type="file"></body></html>'
+        signals = extract_signals(html, max_chars=200)
+
+        assert signals.truncated
+        assert signals.chars_parsed == 200
+        assert signals.title == 'Tool'
+        assert not signals.has_file_input
+
+    def test_incremental_feed_matches_single_feed(self):
+        """Feeding chunks gives the same signals as one document"""
+        extractor = SignalExtractor()
+        for i in range(0, len(SAMPLE_PAGE), 17):
+            extractor.feed(SAMPLE_PAGE[i:i + 17])
+
+        assert extractor.close() == extract_signals(SAMPLE_PAGE)
+
+    def test_analyzer_classifies_from_signals(self):
+        """Web app and recency checks run on the extracted signals"""
+        analyzer = QualityAnalyzer()
+        signals = extract_signals(SAMPLE_PAGE)
+
+        assert analyzer._is_web_app(signals, 'https://example.com/')
+        assert analyzer._is_recent(signals, {})
+
+
+class FakeStreamResponse:
+    """Streamed response that records how much of the body was read"""
+
+    def __init__(self, body: bytes, content_type: str = 'text/html; charset=utf-8'):
+        self.status_code = 200
+        self.headers = {'Content-Type': content_type}
+        self.encoding = 'utf-8'
+        self.body = body
+        self.bytes_read = 0
+        self.fail_after = None  # Raise a read error once this many bytes were served
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.body), chunk_size):
+            if self.fail_after is not None and self.bytes_read >= self.fail_after:
+                raise requests.exceptions.ChunkedEncodingError('connection broken')
+            chunk = self.body[i:i + chunk_size]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.kwargs = None
+
+    def get(self, url, **kwargs):
+        self.kwargs = kwargs
+        return self.response
+
+
+class TestStreamedDownload:
+    """Test byte-capped page downloads"""
+
+    def make_analyzer(self, response, **kwargs):
+        analyzer = QualityAnalyzer(**kwargs)
+        analyzer.rate_limiter.acquire_url = lambda url: None
+        analyzer.session = FakeSession(response)
+        return analyzer
+
+    def test_stops_reading_at_byte_cap(self):
+        """Only the first max_body_bytes are downloaded and the head is still scored"""
+        body = SAMPLE_PAGE.encode('utf-8') + b'<p>' + b'x' * (2 * 1024 * 1024) + b'</p>'
+        response = FakeStreamResponse(body)
+        analyzer = self.make_analyzer(response, max_body_bytes=64 * 1024)
+
+        metrics = analyzer.analyze_url('https://example.com/')
+
+        assert analyzer.session.kwargs['stream'] is True
+        assert response.bytes_read <= 64 * 1024 + 16 * 1024
+        assert metrics['page_load_success']
+        assert metrics['is_responsive']
+        assert metrics['is_web_app']
+
+    def test_non_html_body_is_not_read(self):
+        """PDFs and other non-HTML responses are closed without reading the body"""
+        response = FakeStreamResponse(b'%PDF-1.7' + b'\0' * 100000, content_type='application/pdf')
+        analyzer = self.make_analyzer(response)
+
+        metrics = analyzer.analyze_url('https://example.com/file.pdf')
+
+        assert response.bytes_read == 0
+        assert metrics['page_load_success']
+        assert not metrics['is_responsive']
+
+    def test_defaults_to_utf8_without_charset(self):
+        """Pages without a declared charset are decoded as UTF-8"""
+        response = FakeStreamResponse('<title>Conversão</title>'.encode('utf-8'), content_type='text/html')
+        response.encoding = 'ISO-8859-1'
+        analyzer = self.make_analyzer(response)
+
+        signals = analyzer._read_signals(response, 'https://example.com/')
+
+        assert signals.title == 'Conversão'
+
+    def test_read_error_scores_partial_page(self):
+        """A body cut off mid-read is scored from the bytes that arrived"""
+        response = FakeStreamResponse(SAMPLE_PAGE.encode('utf-8') + b'<p>' + b'x' * 100000 + b'</p>')
+        response.fail_after = 16 * 1024
+        analyzer = self.make_analyzer(response)
+
+        metrics = analyzer.analyze_url('https://example.com/')
+
+        assert metrics['page_load_success']
+        assert metrics['is_responsive']
+        assert metrics['quality_score'] > 0
+
+    def test_read_error_before_any_bytes_is_a_failed_load(self):
+        """With nothing received the page counts as failed and is not cached"""
+        response = FakeStreamResponse(SAMPLE_PAGE.encode('utf-8'))
+        response.fail_after = 0
+        analyzer = self.make_analyzer(response, cache=QualityCache())
+
+        result = analyzer.analyze_competitors(['https://example.com/'])
+
+        assert not result['analyses'][0]['page_load_success']
+        assert analyzer.cache.get('https://example.com/') is None
+
+class TestQualityCache:
+    """Test cross-keyword quality caching"""
+
+    def test_normalize_url(self):
+        """Trivially different links map to one key"""
+        assert normalize_url('HTTPS://www.Example.com:443/tools/?utm_source=x&b=2&a=1#top') == \
+            normalize_url('https://example.com/tools?a=1&b=2')
+        assert normalize_url('https://example.com/a') != normalize_url('https://example.com/b')
+
+    def test_ttl_and_domain_fallback(self, monkeypatch):
+        """Entries expire after the TTL; the host fallback covers other pages"""
+        now = [1000.0]
+        monkeypatch.setattr('services.quality_cache.time.time', lambda: now[0])
+        cache = QualityCache(ttl=60, domain_fallback=True)
+        cache.set('https://example.com/a', fake_analysis('https://example.com/a', 70))
+
+        other = cache.get('https://www.example.com/b')
+        assert other['quality_score'] == 70
+        assert other['url'] == 'https://www.example.com/b'
+
+        now[0] += 61
+        assert cache.get('https://example.com/a') is None
+        assert QualityCache(ttl=None).get('https://example.com/a') is None
+
+    def test_count_excludes_host_entries(self, tmp_path):
+        """Page counts ignore the per-host fallback entries, in memory and on disk"""
+        from cache.sqlite_cache import SqliteCache
+        for store in (None, SqliteCache(str(tmp_path / 'cache.sqlite3'), 'quality_metrics')):
+            cache = QualityCache(store=store, domain_fallback=True)
+            for url in ('https://example.com/a', 'https://example.com/b', 'https://other.example/'):
+                cache.set(url, fake_analysis(url))
+
+            assert len(cache) == cache.count('url') == 3
+            assert cache.count('host') == 2
+
+    def test_shared_across_keywords_and_persisted(self, monkeypatch, tmp_path):
+        """Each page is fetched once across keywords, analyzers and runs"""
+        from cache.sqlite_cache import SqliteCache
+        store_path = str(tmp_path / 'cache.sqlite3')
+        fetched = []
+
+        def make_analyzer():
+            cache = QualityCache(store=SqliteCache(store_path, 'quality_metrics'), ttl=3600)
+            analyzer = QualityAnalyzer(cache=cache)
+
+            def analyze(url):
+                fetched.append(url)
+                return fake_analysis(url, 40)
+
+            monkeypatch.setattr(analyzer, 'analyze_url', analyze)
+            return analyzer
+
+        analyzer = make_analyzer()
+        analyzer.analyze_competitors(['https://a.example.com/', 'https://b.example.com/'])
+        result = analyzer.analyze_competitors(['https://a.example.com', 'https://c.example.com/'])
+        make_analyzer().analyze_competitors(['https://c.example.com/'])
+
+        assert sorted(fetched) == ['https://a.example.com/', 'https://b.example.com/', 'https://c.example.com/']
+        assert result['analyses'][0]['url'] == 'https://a.example.com'
+
+    def test_concurrent_callers_share_inflight_fetch(self, monkeypatch):
+        """Two keywords needing the same page at once trigger one fetch"""
+        from concurrent.futures import ThreadPoolExecutor
+        analyzer = QualityAnalyzer(max_concurrency=4)
+        fetched = []
+
+        def slow_analyze(url):
+            fetched.append(url)
+            time.sleep(0.2)
+            return fake_analysis(url)
+
+        monkeypatch.setattr(analyzer, 'analyze_url', slow_analyze)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(
+                analyzer.analyze_competitors,
+                [['https://shared.example.com/'], ['https://www.shared.example.com']]
+            ))
+
+        assert len(fetched) == 1
+        assert results[1]['analyses'][0]['url'] == 'https://www.shared.example.com'
+
+
+    def test_deadline_does_not_cancel_shared_fetch(self, monkeypatch):
+        """One keyword giving up on a queued page leaves it fetching for another"""
+        from concurrent.futures import ThreadPoolExecutor
+        analyzer = QualityAnalyzer(max_concurrency=1)
+
+        def analyze(url):
+            time.sleep(0.2)
+            return fake_analysis(url, 60)
+
+        monkeypatch.setattr(analyzer, 'analyze_url', analyze)
+        shared = 'https://shared.example.com/'
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            # The single worker is busy, so the shared URL is still queued at A's deadline
+            blocker = pool.submit(analyzer.analyze_competitors, ['https://busy.example.com/'])
+            time.sleep(0.05)
+            a = pool.submit(analyzer.analyze_competitors, [shared], 0.1)
+            time.sleep(0.02)
+            b = pool.submit(analyzer.analyze_competitors, [shared], 5)
+            blocker.result()
+
+            assert not a.result()['analyses'][0]['page_load_success']
+            assert b.result()['analyses'][0]['quality_score'] == 60
+
+
+class RecordingSession:
+    """Session returning queued responses and recording request headers"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.headers = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.headers.append(headers or {})
+        return self.responses.pop(0)
+
+
+class TestConditionalRevalidation:
+    """Test ETag/Last-Modified revalidation of expired cache entries"""
+
+    def make_analyzer(self, monkeypatch, responses):
+        now = [1000.0]
+        monkeypatch.setattr('services.quality_cache.time.time', lambda: now[0])
+        analyzer = QualityAnalyzer(cache=QualityCache(ttl=60))
+        analyzer.rate_limiter.acquire_url = lambda url: None
+        analyzer.session = RecordingSession(responses)
+        return analyzer, now
+
+    def test_304_reuses_stored_metrics(self, monkeypatch):
+        """An expired page is revalidated and its metrics reused on 304"""
+        page = FakeStreamResponse(SAMPLE_PAGE.encode('utf-8'))
+        page.headers.update({'ETag': '"v1"', 'Last-Modified': 'Wed, 15 Nov 2023 12:45:26 GMT'})
+        unchanged = FakeStreamResponse(b'')
+        unchanged.status_code = 304
+        analyzer, now = self.make_analyzer(monkeypatch, [page, unchanged])
+
+        first = analyzer.analyze_competitors(['https://example.com/'])
+        now[0] += 120
+        second = analyzer.analyze_competitors(['https://example.com/'])
+
+        sent = analyzer.session.headers[1]
+        assert sent['If-None-Match'] == '"v1"'
+        assert sent['If-Modified-Since'] == 'Wed, 15 Nov 2023 12:45:26 GMT'
+        assert unchanged.bytes_read == 0
+        assert second['analyses'] == first['analyses']
+        assert analyzer.not_modified == 1
+        # The 304 refreshed the entry, so the next lookup needs no request
+        assert analyzer.cache.get('https://example.com/') is not None
+
+    def test_changed_page_is_rescored(self, monkeypatch):
+        """A 200 on revalidation replaces the stored metrics and validators"""
+        page = FakeStreamResponse(SAMPLE_PAGE.encode('utf-8'))
+        page.headers['ETag'] = '"v1"'
+        changed = FakeStreamResponse(b'<html><title>Blog post</title></html>')
+        changed.headers['ETag'] = '"v2"'
+        analyzer, now = self.make_analyzer(monkeypatch, [page, changed])
+
+        analyzer.analyze_competitors(['https://example.com/'])
+        now[0] += 120
+        result = analyzer.analyze_competitors(['https://example.com/'])
+
+        assert not result['analyses'][0]['is_responsive']
+        assert result['analyses'][0]['etag'] == '"v2"'
+        assert analyzer.not_modified == 0
+
+    def test_no_validators_means_plain_request(self, monkeypatch):
+        """Pages served without validators are simply fetched again"""
+        analyzer, now = self.make_analyzer(monkeypatch, [
+            FakeStreamResponse(SAMPLE_PAGE.encode('utf-8')),
+            FakeStreamResponse(SAMPLE_PAGE.encode('utf-8')),
+        ])
+
+        analyzer.analyze_competitors(['https://example.com/'])
+        now[0] += 120
+        analyzer.analyze_competitors(['https://example.com/'])
+
+        assert 'If-None-Match' not in analyzer.session.headers[1]
+        assert 'If-Modified-Since' not in analyzer.session.headers[1]
@@ -0,0 +1,63 @@
+"""
+Tests for per-host rate limiting
+Run with: pytest tests/
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from services.rate_limiter import RateLimiter, TokenBucket
+
+
+class TestTokenBucket:
+    """Test token bucket pacing"""
+
+    def test_burst_is_free(self):
+        """Requests within the burst allowance never wait"""
+        bucket = TokenBucket(interval=10.0, burst=3)
+
+        assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    def test_waits_when_exhausted(self):
+        """Once the burst is spent, callers wait roughly one interval"""
+        bucket = TokenBucket(interval=0.05, burst=1)
+        bucket.acquire()
+
+        start = time.monotonic()
+        waited = bucket.acquire()
+
+        assert waited > 0
+        assert time.monotonic() - start >= 0.04
+
+
+class TestRateLimiter:
+    """Test host-keyed limiter"""
+
+    def test_hosts_have_independent_budgets(self):
+        """Exhausting one host does not slow down another"""
+        limiter = RateLimiter(default_interval=10.0)
+        limiter.acquire_url('https://a.example.com/page')
+
+        assert limiter.acquire_url('https://b.example.com/page') == 0.0
+
+    def test_zero_interval_disables_limiting(self):
+        """Hosts configured with no interval are never throttled"""
+        limiter = RateLimiter()
+        limiter.configure('serpapi.com', 0)
+
+        assert all(limiter.acquire('serpapi.com') == 0.0 for _ in range(5))
+
+    def test_google_search_domains_share_one_budget(self):
+        """US and BR Google searches are paced together, as one scraping IP"""
+        from config import Config
+
+        class FastConfig(Config):
+            SERP_RATE_LIMIT = 0.05
+
+        limiter = RateLimiter.from_config(FastConfig)
+        limiter.acquire_url('https://www.google.com/search?q=pdf')
+
+        assert limiter.acquire_url('https://www.google.com.br/search?q=pdf') > 0
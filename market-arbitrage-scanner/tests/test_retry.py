@@ -0,0 +1,152 @@
+"""
+Tests for the upstream retry policy and circuit breaker
+Run with: pytest tests/
+"""
+import sys
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+import requests
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from metrics import Metrics
+from services.retry import (
+    CircuitBreaker, CircuitOpenError, RetryPolicy, UpstreamError, is_retryable, retry_after
+)
+
+
+class FakeResponse:
+    """Minimal requests.Response stand-in carrying a status and headers"""
+
+    def __init__(self, status_code: int, headers: dict = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def http_error(status: int, **headers) -> requests.exceptions.HTTPError:
+    return requests.exceptions.HTTPError(f'{status} error', response=FakeResponse(status, headers))
+
+
+def flaky(*outcomes):
+    """Callable raising or returning each outcome in turn"""
+    calls = []
+
+    def fn():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    fn.calls = calls
+    return fn
+
+
+def make_policy(**kwargs) -> RetryPolicy:
+    sleeps = []
+    policy = RetryPolicy(base_delay=1.0, metrics=Metrics(), sleep=sleeps.append, **kwargs)
+    policy.sleeps = sleeps
+    return policy
+
+
+class TestClassification:
+    """Test which failures are worth retrying"""
+
+    def test_retryable_statuses_and_network_errors(self):
+        assert is_retryable(http_error(429))
+        assert is_retryable(http_error(503))
+        assert is_retryable(requests.exceptions.ConnectionError('reset'))
+        assert is_retryable(requests.exceptions.ReadTimeout('slow'))
+
+    def test_client_errors_and_bugs_are_not_retried(self):
+        assert not is_retryable(http_error(400))
+        assert not is_retryable(http_error(404))
+        assert not is_retryable(ValueError('bad json'))
+
+    def test_retry_after_seconds_and_date(self):
+        assert retry_after(http_error(429, **{'Retry-After': '7'})) == 7
+        when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        assert 25 <= retry_after(http_error(503, **{'Retry-After': when})) <= 30
+        assert retry_after(http_error(503)) is None
+
+
+class TestRetryPolicy:
+    """Test backoff, Retry-After and giving up"""
+
+    def test_transient_failures_are_retried(self):
+        policy = make_policy(max_retries=3)
+        fn = flaky(http_error(503), requests.exceptions.ConnectionError('reset'), 'ok')
+
+        assert policy.call('serpapi.com', fn) == 'ok'
+        assert len(fn.calls) == 3
+        assert len(policy.sleeps) == 2
+        assert policy.metrics.count('retries.serpapi.com') == 2
+
+    def test_backoff_is_capped_full_jitter(self):
+        policy = make_policy(max_retries=5, max_delay=3.0)
+        for attempt in range(6):
+            assert 0 <= policy.backoff(attempt) <= min(3.0, 2 ** attempt)
+
+    def test_retry_after_overrides_backoff(self):
+        policy = make_policy(max_retries=1)
+        fn = flaky(http_error(429, **{'Retry-After': '12'}), 'ok')
+
+        assert policy.call('trends.google.com', fn) == 'ok'
+        assert policy.sleeps == [12.0]
+
+    def test_gives_up_with_upstream_error(self):
+        policy = make_policy(max_retries=2)
+        fn = flaky(*[http_error(502)] * 3)
+
+        with pytest.raises(UpstreamError) as excinfo:
+            policy.call('serpapi.com', fn)
+        assert excinfo.value.upstream == 'serpapi.com'
+        assert len(fn.calls) == 3
+
+    def test_non_retryable_fails_immediately(self):
+        policy = make_policy(max_retries=3)
+        fn = flaky(http_error(401), 'never')
+
+        with pytest.raises(UpstreamError):
+            policy.call('serpapi.com', fn)
+        assert len(fn.calls) == 1
+        assert policy.sleeps == []
+
+
+class TestCircuitBreaker:
+    """Test per-upstream circuit breaking"""
+
+    def test_opens_after_consecutive_failures(self):
+        policy = make_policy(max_retries=0, failure_threshold=2)
+        for _ in range(2):
+            with pytest.raises(UpstreamError):
+                policy.call('trends.google.com', flaky(http_error(429)))
+
+        calls = flaky('ok')
+        with pytest.raises(CircuitOpenError):
+            policy.call('trends.google.com', calls)
+        assert calls.calls == []
+        assert policy.metrics.count('circuit_open.trends.google.com') == 1
+
+        # Other upstreams are unaffected
+        assert policy.call('serpapi.com', flaky('ok')) == 'ok'
+
+    def test_long_retry_after_opens_circuit(self):
+        policy = make_policy(max_retries=3, max_delay=60)
+        with pytest.raises(CircuitOpenError):
+            policy.call('serpapi.com', flaky(http_error(429, **{'Retry-After': '3600'})))
+        assert policy.sleeps == []
+        assert policy.breaker('serpapi.com').is_open
+
+    def test_half_open_trial_closes_on_success(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        assert breaker.allow()          # Cool-down over: one trial call
+        assert not breaker.allow()      # Others wait for the trial
+        breaker.record_success()
+        assert breaker.allow() and breaker.allow()
@@ -0,0 +1,201 @@
+"""
+Tests for the Google Trends search volume service
+Run with: pytest tests/
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import requests
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from cache.sqlite_cache import SqliteCache
+from metrics import Metrics
+from services.search_volume import SearchVolumeService, TRENDS_CACHE_TABLE
+from services.rate_limiter import RateLimiter
+from services.retry import RetryPolicy, UpstreamError
+
+
+class FakeTrends:
+    """Stand-in for TrendReq that records payloads and returns fixed levels"""
+
+    def __init__(self, levels: dict):
+        self.levels = levels
+        self.payloads = []
+
+    def build_payload(self, keywords, **kwargs):
+        self.payloads.append(list(keywords))
+
+    def interest_over_time(self):
+        keywords = self.payloads[-1]
+        # Trends scales every payload so its most popular term peaks at 100
+        peak = max(self.levels[kw] for kw in keywords) or 1
+        return pd.DataFrame({kw: [self.levels[kw] / peak * 100] * 3 for kw in keywords})
+
+
+class RoundingTrends(FakeTrends):
+    """FakeTrends that rounds like real Trends, so a small anchor reads 0 next to a huge keyword"""
+
+    def interest_over_time(self):
+        frame = super().interest_over_time()
+        return frame.round()
+
+
+class BrokenTrends:
+    """Stand-in for TrendReq whose every request times out"""
+
+    def __init__(self):
+        self.attempts = 0
+
+    def build_payload(self, keywords, **kwargs):
+        pass
+
+    def interest_over_time(self):
+        self.attempts += 1
+        raise requests.exceptions.ReadTimeout('trends timed out')
+
+
+def make_service(tmp_path, monkeypatch, levels, **kwargs) -> SearchVolumeService:
+    """Build a service backed by FakeTrends and a temporary cache"""
+    monkeypatch.setattr(SearchVolumeService, '_init_client', lambda self: None)
+    cache = SqliteCache(str(tmp_path / 'cache.sqlite3'), TRENDS_CACHE_TABLE)
+    service = SearchVolumeService(rate_limiter=RateLimiter(default_interval=0), cache=cache, **kwargs)
+    service.pytrends = FakeTrends(levels)
+    return service
+
+
+class TestTrendsCache:
+    """Test Trends interest caching"""
+
+    def test_second_lookup_skips_network(self, tmp_path, monkeypatch):
+        """A cached (keyword, geo, timeframe) never reaches pytrends again"""
+        service = make_service(tmp_path, monkeypatch, {'PDF to Excel': 42})
+
+        assert service.get_interest_score('PDF to Excel', 'US') == 100
+        assert service.get_interest_score('pdf to excel', 'US') == 100
+        assert len(service.pytrends.payloads) == 1
+
+
+class TestBatchedTrends:
+    """Test anchored multi-keyword payloads"""
+
+    def test_packs_four_keywords_per_payload(self, tmp_path, monkeypatch):
+        """Nine keywords need three payloads instead of nine"""
+        levels = {f'kw{i}': 10 for i in range(9)}
+        levels['anchor'] = 10
+        service = make_service(tmp_path, monkeypatch, levels, anchor_terms={'US': 'anchor'})
+
+        scores = service.get_interest_scores([f'kw{i}' for i in range(9)], 'US')
+
+        assert len(service.pytrends.payloads) == 3
+        assert all(payload[0] == 'anchor' and len(payload) <= 5 for payload in service.pytrends.payloads)
+        assert set(scores.values()) == {50}
+
+    def test_scores_comparable_across_payloads(self, tmp_path, monkeypatch):
+        """Keywords in different payloads keep their true ratio via the anchor"""
+        levels = {'anchor': 20, 'big': 80, 'a': 1, 'b': 1, 'c': 1, 'small': 10}
+        service = make_service(tmp_path, monkeypatch, levels, anchor_terms={'BR': 'anchor'})
+
+        scores = service.get_interest_scores(['big', 'a', 'b', 'c', 'small'], 'BR')
+
+        assert scores['small'] == 25
+        assert scores['big'] == 100  # 200 before capping
+        assert len(service.pytrends.payloads) == 2
+
+    def test_cached_batch_skips_network(self, tmp_path, monkeypatch):
+        """Re-running the same batch is served entirely from the cache"""
+        levels = {'anchor': 10, 'x': 5, 'y': 20}
+        service = make_service(tmp_path, monkeypatch, levels, anchor_terms={'US': 'anchor'})
+
+        first = service.get_interest_scores(['x', 'y'], 'US')
+        second = service.get_interest_scores(['x', 'y'], 'US')
+
+        assert first == second == {'x': 25, 'y': 100}
+        assert len(service.pytrends.payloads) == 1
+
+    def test_forecast_counts_cache_hits_and_payloads(self, tmp_path, monkeypatch):
+        """The request forecast matches what a batch would send, without sending anything"""
+        levels = {f'kw{i}': 10 for i in range(9)}
+        levels['anchor'] = 10
+        service = make_service(tmp_path, monkeypatch, levels, batching=True, anchor_terms={'US': 'anchor'})
+        keywords = [f'kw{i}' for i in range(9)]
+
+        assert service.forecast_requests(keywords, 'US') == (0, 3)
+        service.get_interest_scores(keywords[:4], 'US')
+        assert service.forecast_requests(keywords + ['KW0'], 'US') == (4, 2)
+        assert len(service.pytrends.payloads) == 1
+
+    def test_anchor_without_data_reanchors_on_keyword(self, tmp_path, monkeypatch):
+        """A dead anchor is replaced by a keyword, keeping every payload on one scale"""
+        levels = {'dead': 0, 'a': 0, 'b': 10, 'c': 5, 'd': 1, 'e': 40, 'f': 20}
+        service = make_service(tmp_path, monkeypatch, levels, anchor_terms={'BR': 'dead'})
+
+        scores = service.get_interest_scores(['a', 'b', 'c', 'd', 'e', 'f'], 'BR')
+
+        assert scores == {'a': 0, 'b': 50, 'c': 25, 'd': 5, 'e': 100, 'f': 100}
+        assert service.pytrends.payloads[1][0] == 'b'
+
+        # The replacement anchor is remembered, so a re-run hits the cache
+        service.get_interest_scores(['a', 'b', 'c', 'd', 'e', 'f'], 'BR')
+        assert len(service.pytrends.payloads) == 2
+
+    def test_anchor_lost_in_later_payload_rescales_whole_call(self, tmp_path, monkeypatch):
+        """When the anchor drops to 0 in the second payload, earlier payloads move to the new anchor too"""
+        levels = {'anchor': 1, 'a': 20, 'b': 30, 'c': 40, 'd': 50, 'huge': 300, 'e': 60}
+        service = make_service(tmp_path, monkeypatch, levels, anchor_terms={'US': 'anchor'})
+        service.pytrends = RoundingTrends(levels)
+
+        scores = service.get_interest_scores(['a', 'b', 'c', 'd', 'huge', 'e'], 'US')
+
+        # Every score is relative to 'huge' pinned at 50 (a alone would be 1000x the dead anchor)
+        assert scores == {'a': 4, 'b': 5, 'c': 6, 'd': 8, 'huge': 50, 'e': 10}
+        assert [payload[0] for payload in service.pytrends.payloads] == ['anchor', 'anchor', 'huge']
+
+        # The cached scores are all on the new scale too
+        service.get_interest_scores(['a', 'b', 'c', 'd', 'huge', 'e'], 'US')
+        assert len(service.pytrends.payloads) == 3
+
+    def test_lost_anchor_without_cache_still_finishes(self, monkeypatch):
+        """Without a cache the fallback is carried in memory, so the restart cannot loop"""
+        monkeypatch.setattr(SearchVolumeService, '_init_client', lambda self: None)
+        levels = {'anchor': 1, 'a': 20, 'b': 30, 'c': 40, 'd': 50, 'huge': 300}
+        service = SearchVolumeService(rate_limiter=RateLimiter(default_interval=0), anchor_terms={'US': 'anchor'})
+        service.pytrends = RoundingTrends(levels)
+
+        scores = service.get_interest_scores(['a', 'b', 'c', 'd', 'huge'], 'US')
+
+        assert (scores['a'], scores['huge']) == (4, 50)
+        assert [payload[0] for payload in service.pytrends.payloads] == ['anchor', 'anchor', 'huge']
+
+    def test_per_geo_anchor_score_spreads_top(self, tmp_path, monkeypatch):
+        """A lower anchor score keeps keywords far above the anchor apart"""
+        levels = {'anchor': 10, 'big': 30, 'bigger': 35}
+        service = make_service(tmp_path, monkeypatch, levels,
+                               anchor_terms={'US': 'anchor'}, anchor_score={'US': 25})
+
+        scores = service.get_interest_scores(['big', 'bigger'], 'US')
+
+        assert scores == {'big': 75, 'bigger': 88}
+
+
+class TestTrendsFailures:
+    """Test that Trends failures surface instead of becoming zero scores"""
+
+    def test_failure_raises_and_is_not_cached(self, tmp_path, monkeypatch):
+        """A keyword Trends could not answer has no score, and the next run asks again"""
+        service = make_service(
+            tmp_path, monkeypatch, {'pdf to excel': 42},
+            retry=RetryPolicy(max_retries=1, metrics=Metrics(), sleep=lambda s: None)
+        )
+        working = service.pytrends
+        service.pytrends = BrokenTrends()
+
+        with pytest.raises(UpstreamError):
+            service.get_interest_score('pdf to excel', 'US')
+        assert service.pytrends.attempts == 2
+
+        service.pytrends = working
+        assert service.get_interest_score('pdf to excel', 'US') == 100
@@ -0,0 +1,95 @@
+"""
+Tests for the free SERP scraper's link extraction
+Run with: pytest tests/
+"""
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from services.rate_limiter import RateLimiter
+from services.serp_links import extract_result_links, is_blocked_host
+from services.serp_scraper import SerpScraper
+
+SERP = """
+<html><body>
+<div id="searchform"><a href="https://www.google.com/imghp">Images</a></div>
+<div id="search">
+  <div class="uEierd"><a href="https://ads.example.com/landing">Sponsored</a></div>
+  <div class="g"><div class="yuRUbf"><a href="https://first.example.com/">First</a></div>
+    <a href="https://webcache.googleusercontent.com/search?q=cache:1">Cached</a></div>
+  <div class="g"><div class="yuRUbf"><a href="https://www.youtube.com/watch?v=1">Video</a></div></div>
+  <div class="g"><div class="yuRUbf"><a href="https://first.example.com/">First again</a></div></div>
+  <div class="g"><div class="yuRUbf"><a href="https://second.example.com/?from=google.com">Second</a></div></div>
+</div>
+<footer><a href="https://policies.google.com/privacy">Privacy</a></footer>
+</body></html>
+"""
+
+
+class FakeResponse:
+    """Minimal requests.Response stand-in"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """Session stand-in that always returns the same page"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def get(self, url, **kwargs):
+        return FakeResponse(self.text)
+
+
+class TestSerpLinks:
+    """Test single-pass SERP link extraction"""
+
+    def test_result_links_first_deduplicated(self):
+        """Organic result links win over ads; duplicates and blocked hosts are skipped"""
+        assert extract_result_links(SERP, top_n=2) == [
+            'https://first.example.com/',
+            'https://second.example.com/?from=google.com',
+        ]
+
+    def test_less_specific_tiers_fill_the_gap(self):
+        """With too few result links, links inside the results container are added"""
+        assert extract_result_links(SERP, top_n=3) == [
+            'https://first.example.com/',
+            'https://second.example.com/?from=google.com',
+            'https://ads.example.com/landing',
+        ]
+
+    def test_blocklist_matches_hostnames(self):
+        """Subdomains of blocked domains are blocked; look-alike hosts are not"""
+        assert is_blocked_host('support.google.com')
+        assert is_blocked_host('www.google.com.br')
+        assert is_blocked_host('webcache.googleusercontent.com')
+        assert not is_blocked_host('notgoogle.com')
+        assert not is_blocked_host('google.example.com')
+
+    def test_fallback_to_any_non_google_link(self):
+        """If every link is blocked, any non-Google http link is used"""
+        html = '<a href="https://www.youtube.com/x">Video</a><a href="https://www.google.com/y">G</a>'
+        assert extract_result_links(html, top_n=3) == ['https://www.youtube.com/x']
+
+    def test_no_links(self):
+        """Pages without usable links give no URLs"""
+        assert extract_result_links('', top_n=3) == []
+        assert extract_result_links('<a href="/relative">x</a>', top_n=3) == []
+
+
+class TestSerpScraper:
+    """Test SerpScraper.get_top_urls parsing"""
+
+    def test_get_top_urls_parses_response(self):
+        """The scraper returns the extracted organic links"""
+        scraper = SerpScraper(rate_limiter=RateLimiter(default_interval=0))
+        scraper.session = FakeSession(SERP)
+        assert scraper.get_top_urls('pdf to excel', 'US', top_n=1) == ['https://first.example.com/']
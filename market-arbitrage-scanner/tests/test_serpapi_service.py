@@ -0,0 +1,158 @@
+"""
+Tests for the SerpAPI service
+Run with: pytest tests/
+"""
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from cache.sqlite_cache import SqliteCache
+from metrics import Metrics
+from services.serpapi_service import SerpApiService, SERP_CACHE_TABLE
+from services.credit_ledger import CreditBudget, CreditCeilingReached, CreditLedger, LEDGER_TABLE
+from services.retry import RetryPolicy, UpstreamError
+
+
+class FakeResponse:
+    """Minimal requests.Response stand-in"""
+
+    def __init__(self, payload: dict, status_code: int = 200):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f'{self.status_code} error', response=self)
+
+    def json(self):
+        return self.payload
+
+
+ORGANIC = {'organic_results': [
+    {'link': f'https://tool{i}.example.com/'} for i in range(6)
+]}
+
+
+class TestSerpCache:
+    """Test SerpAPI response caching and credit accounting"""
+
+    def make_service(self, tmp_path, monkeypatch):
+        calls = []
+
+        def fake_get(url, params=None, **kwargs):
+            calls.append(params)
+            return FakeResponse(ORGANIC)
+
+        db = str(tmp_path / 'cache.sqlite3')
+        service = SerpApiService(
+            api_key='test-key',
+            cache=SqliteCache(db, SERP_CACHE_TABLE),
+            ledger=CreditLedger(store=SqliteCache(db, LEDGER_TABLE))
+        )
+        monkeypatch.setattr(service.session, 'get', fake_get)
+        return service, calls
+
+    def test_repeat_search_is_served_from_cache(self, tmp_path, monkeypatch):
+        """The same search twice spends one credit"""
+        service, calls = self.make_service(tmp_path, monkeypatch)
+
+        first = service.get_top_urls('gerador de fatura', 'BR', top_n=3)
+        second = service.get_top_urls('gerador de fatura', 'BR', top_n=3)
+
+        assert first == second
+        assert len(calls) == 1
+        assert (service.ledger.paid_calls, service.ledger.cache_hits) == (1, 1)
+
+    def test_smaller_top_n_reuses_larger_response(self, tmp_path, monkeypatch):
+        """A cached top-3 search can answer a top-2 request, not a top-5 one"""
+        service, calls = self.make_service(tmp_path, monkeypatch)
+
+        service.get_top_urls('invoice generator', 'US', top_n=3)
+        assert len(service.get_top_urls('invoice generator', 'US', top_n=2)) == 2
+        assert len(calls) == 1
+
+        service.get_top_urls('invoice generator', 'US', top_n=5)
+        assert len(calls) == 2
+
+    def test_history_totals_span_runs(self, tmp_path, monkeypatch):
+        """Ledger totals include earlier runs"""
+        service, _ = self.make_service(tmp_path, monkeypatch)
+        service.get_top_urls('qr code generator', 'US')
+        service.get_top_urls('qr code generator', 'US')
+
+        totals = CreditLedger(store=service.ledger.store).history_totals()
+
+        assert totals == {'runs': 1, 'paid_calls': 1, 'cache_hits': 1, 'hit_rate': 0.5}
+
+
+class TestSerpFailures:
+    """Test retries and failure reporting"""
+
+    def make_service(self, tmp_path, monkeypatch, statuses):
+        calls = []
+
+        def fake_get(url, params=None, **kwargs):
+            calls.append(params)
+            return FakeResponse(ORGANIC, status_code=statuses[min(len(calls), len(statuses)) - 1])
+
+        db = str(tmp_path / 'cache.sqlite3')
+        service = SerpApiService(
+            api_key='test-key',
+            cache=SqliteCache(db, SERP_CACHE_TABLE),
+            ledger=CreditLedger(store=SqliteCache(db, LEDGER_TABLE)),
+            retry=RetryPolicy(max_retries=2, metrics=Metrics(), sleep=lambda s: None)
+        )
+        monkeypatch.setattr(service.session, 'get', fake_get)
+        return service, calls
+
+    def test_transient_error_is_retried(self, tmp_path, monkeypatch):
+        """A 503 followed by a good answer returns URLs and charges one credit"""
+        service, calls = self.make_service(tmp_path, monkeypatch, [503, 200])
+
+        assert len(service.get_top_urls('invoice generator', 'US', top_n=3)) == 3
+        assert len(calls) == 2
+        assert service.ledger.paid_calls == 1
+
+    def test_persistent_error_raises_instead_of_empty(self, tmp_path, monkeypatch):
+        """An outage is an error, not a SERP without competitors, and is not cached"""
+        service, calls = self.make_service(tmp_path, monkeypatch, [500])
+
+        with pytest.raises(UpstreamError):
+            service.get_top_urls('invoice generator', 'BR')
+        assert len(calls) == 3
+        assert len(service.cache) == 0
+        assert service.ledger.paid_calls == 0
+
+
+class TestCreditBudget:
+    """Test the per-run credit ceiling"""
+
+    def test_ceiling_blocks_paid_searches_only(self, tmp_path, monkeypatch):
+        """Past the ceiling nothing is sent, but cached searches are still served"""
+        service, calls = TestSerpCache().make_service(tmp_path, monkeypatch)
+        service.budget = CreditBudget(1)
+
+        assert not service.is_cached('invoice generator', 'US')
+        service.get_top_urls('invoice generator', 'US')
+        assert service.is_cached('invoice generator', 'US')
+
+        with pytest.raises(CreditCeilingReached):
+            service.get_top_urls('qr code generator', 'US')
+        assert len(service.get_top_urls('invoice generator', 'US')) == 3
+        assert len(calls) == 1
+        assert service.budget.remaining == 0
+
+    def test_failed_search_returns_its_credit(self, tmp_path, monkeypatch):
+        """A search that failed for good was not billed, so it does not count"""
+        service, _ = TestSerpFailures().make_service(tmp_path, monkeypatch, [500])
+        service.budget = CreditBudget(2)
+
+        with pytest.raises(UpstreamError):
+            service.get_top_urls('invoice generator', 'BR')
+        assert service.budget.remaining == 2
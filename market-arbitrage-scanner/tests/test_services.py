@@ -6,13 +6,28 @@ import pytest
 import sys
 from pathlib import Path
 
+import numpy as np
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-from services.translator import TranslationService
+from services.translator import TranslationService, TRANSLATION_CACHE_TABLE
+from services.rate_limiter import RateLimiter
+from cache.sqlite_cache import SqliteCache
 from scoring.gap_scorer import GapScorer
 
 
+class FakeTranslator:
+    """Stand-in for GoogleTranslator that upper-cases each line"""
+    
+    def __init__(self):
+        self.requests = []
+    
+    def translate(self, text):
+        self.requests.append(text)
+        return '\n'.join(line.upper() for line in text.split('\n'))
+
+
 class TestTranslator:
     """Test translation service"""
     
@@ -36,6 +51,32 @@ class TestTranslator:
         result2 = translator.translate_to_portuguese("Hello")
         
         assert result1 == result2
+    
+    def test_translation_memory_persists(self, tmp_path):
+        """Test translations survive across service instances"""
+        db = str(tmp_path / 'cache.sqlite3')
+        limiter = RateLimiter(default_interval=0)
+        
+        first = TranslationService(rate_limiter=limiter, cache=SqliteCache(db, TRANSLATION_CACHE_TABLE))
+        first.translator = FakeTranslator()
+        first.translate_to_portuguese("invoice generator")
+        
+        second = TranslationService(rate_limiter=limiter, cache=SqliteCache(db, TRANSLATION_CACHE_TABLE))
+        second.translator = FakeTranslator()
+        
+        assert second.translate_to_portuguese("invoice generator") == "INVOICE GENERATOR"
+        assert second.translator.requests == []
+    
+    def test_batch_translation_chunks(self):
+        """Test batch translation sends one request per chunk"""
+        translator = TranslationService(rate_limiter=RateLimiter(default_interval=0), chunk_size=3)
+        translator.translator = FakeTranslator()
+        texts = [f"tool {i}" for i in range(7)]
+        
+        results = translator.translate_batch(texts)
+        
+        assert results == {text: text.upper() for text in texts}
+        assert len(translator.translator.requests) == 3
 
 
 class TestGapScorer:
@@ -107,6 +148,48 @@ class TestGapScorer:
         assert "MODERATE" in cat_moderate['category']
         assert "WEAK" in cat_weak['category']
         assert "POOR" in cat_poor['category']
+    
+    def test_batch_matches_single_scoring(self):
+        """Vectorized scores, bonuses and categories match the per-keyword path"""
+        scorer = GapScorer()
+        grid = [(us, br, q) for us in range(0, 101, 10) for br in range(0, 101, 15) for q in (0, 25, 30, 40, 55.5, 90)]
+        us, br, quality = zip(*grid)
+        
+        batch = scorer.score_batch(us, br, quality)
+        
+        for i, (u, b, q) in enumerate(grid):
+            expected = scorer.calculate_gap_score(u, b, q)
+            assert batch['gap_score'][i] == expected
+            assert batch['category'][i] == scorer.categorize_opportunity(expected)['category']
+        assert set(batch['bonus']) == {0.0, 5.0, 10.0}
+    
+    def test_category_boundaries_agree_everywhere(self):
+        """Scalar, vectorized and report categories share one set of cut-offs"""
+        from output.markdown_generator import MarkdownGenerator
+        from scoring.gap_scorer import CATEGORY_THRESHOLDS
+        scorer = GapScorer()
+        report = MarkdownGenerator.__new__(MarkdownGenerator)
+        scores = [edge + delta for edge, _ in CATEGORY_THRESHOLDS[:-1] for delta in (-0.1, 0.0)]
+        
+        vectorized = scorer._category_array(np.array(scores))
+        
+        for score, label in zip(scores, vectorized):
+            assert scorer.categorize_opportunity(score)['category'] == label == report._category(score)
+    
+    def test_reweighting_frame(self):
+        """A DataFrame can be re-scored with different weights in one call"""
+        import pandas as pd
+        frame = pd.DataFrame({
+            'us_volume_score': [80, 20],
+            'br_volume_score': [50, 50],
+            'br_avg_quality': [60, 60]
+        })
+        
+        demand_only = GapScorer(weights={'us_demand': 1.0, 'br_saturation': 0.0, 'br_quality': 0.0})
+        scored = demand_only.score_frame(frame)
+        
+        assert list(scored['gap_score']) == [80.0, 20.0]
+        assert 'gap_score' not in frame.columns
 
 
 # Run tests with: pytest tests/test_services.py -v